@@ -4,19 +4,19 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
-from app.infrastructure.core.database import Base
-from app.infrastructure.core.config import settings
-
-DATABASE_URL = f"postgresql://{settings.db_username}:{settings.db_password}@{settings.db_host}:5432/{settings.db_name}"
+from app.infrastructure.core.database import DATABASE_URL, Base
+# the models must be imported, so their tables are part of Base.metadata
+from app.infrastructure.orm import *  # noqa: F401,F403
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
-config.set_main_option("sqlalchemy.url", DATABASE_URL)
+config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+# Skipped when the app runs the migrations itself, so the app's own loggers stay untouched.
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
@@ -62,6 +62,12 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # a caller (e.g. the tests) may hand over its own connection
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_migrations(connection)
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -69,12 +75,17 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
+        _run_migrations(connection)
+
+
+def _run_migrations(connection) -> None:
+    # a transaction per migration file, the index migration commits in the middle (CREATE INDEX CONCURRENTLY)
+    context.configure(
+        connection=connection, target_metadata=target_metadata, transaction_per_migration=True
+    )
 
-        with context.begin_transaction():
-            context.run_migrations()
+    with context.begin_transaction():
+        context.run_migrations()
 
 
 if context.is_offline_mode():
@@ -0,0 +1,45 @@
+"""indexes for the repository queries
+
+Revision ID: 4e2b8c1d7a90
+Revises: 9a5610bfcf23
+Create Date: 2026-10-17 09:12:05.114329
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e2b8c1d7a90'
+down_revision: Union[str, Sequence[str], None] = '9a5610bfcf23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name, table, columns
+INDEXES = [
+    # keyset pagination of the project listing
+    ("ix_projects_created_at_id", "projects", ["created_at", "id"]),
+    # keyset pagination of a project's documents, also serves every other lookup by project_id
+    ("ix_documents_project_id_created_at_id", "documents", ["project_id", "created_at", "id"]),
+    # get_by_filename
+    ("ix_documents_project_id_file_name", "documents", ["project_id", "file_name"]),
+    # participants of a project and the role checks, answered from the index alone
+    ("ix_user_project_roles_project_id_user_id_role", "user_project_roles", ["project_id", "user_id", "role"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can't run inside a transaction, and doesn't lock the tables for writes while building.
+    # IF NOT EXISTS, because databases created by create_all may have some of them already.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,33 @@
+"""size, sha256 and the sniffed content type of the documents
+
+Revision ID: c3f9a2d6e514
+Revises: 4e2b8c1d7a90
+Create Date: 2026-10-17 14:02:37.508211
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f9a2d6e514'
+down_revision: Union[str, Sequence[str], None] = '4e2b8c1d7a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # nullable, so adding them doesn't rewrite the table, the existing documents have no such metadata
+    op.add_column("documents", sa.Column("size", sa.BigInteger(), nullable=True))
+    op.add_column("documents", sa.Column("sha256", sa.String(length=64), nullable=True))
+    op.add_column("documents", sa.Column("detected_content_type", sa.String(length=100), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("documents", "detected_content_type")
+    op.drop_column("documents", "sha256")
+    op.drop_column("documents", "size")
@@ -0,0 +1,38 @@
+"""reference counted blobs of the content addressed storage
+
+Revision ID: d8a1e6f4b293
+Revises: c3f9a2d6e514
+Create Date: 2026-10-17 16:41:12.730954
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a1e6f4b293'
+down_revision: Union[str, Sequence[str], None] = 'c3f9a2d6e514'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "blobs",
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("storage_path", sa.String(), nullable=False),
+        sa.Column("storage_backend", sa.String(length=10), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=True),
+        sa.Column("refcount", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("sha256"),
+        sa.UniqueConstraint("storage_path"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("blobs")
@@ -0,0 +1,46 @@
+"""soft deleted projects and documents, the queue of their background purge
+
+Revision ID: e5b7c9a1f3d2
+Revises: d8a1e6f4b293
+Create Date: 2026-10-17 18:05:37.214853
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b7c9a1f3d2'
+down_revision: Union[str, Sequence[str], None] = 'd8a1e6f4b293'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # nullable, so adding them doesn't rewrite the tables, no existing row is deleted
+    op.add_column("projects", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("documents", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_table(
+        "purge_jobs",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("target_id", sa.UUID(), nullable=False),
+        sa.Column("storage_paths", sa.JSON(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("available_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_purge_jobs_available_at"), "purge_jobs", ["available_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_purge_jobs_available_at"), table_name="purge_jobs")
+    op.drop_table("purge_jobs")
+    op.drop_column("documents", "deleted_at")
+    op.drop_column("projects", "deleted_at")
@@ -1,4 +1,4 @@
-from .project import Project
+from .project import Project, ProjectSummary
 from .user import User
 
-__all__ = ["User", "Project"]
+__all__ = ["User", "Project", "ProjectSummary"]
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class Blob:
+    """A stored file shared by every document with the same content, kept while it has references"""
+
+    sha256: str
+    storage_path: str
+    storage_backend: str
+    size: int | None = None
+    refcount: int = 1
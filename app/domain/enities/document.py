@@ -22,6 +22,9 @@ class Document:
     updated_at: datetime | None = None
     name: str | None = ""
     description: str | None = ""
+    size: int | None = None
+    sha256: str | None = None
+    detected_content_type: str | None = None
 
     @staticmethod
     def _validate_name(name: str):
@@ -0,0 +1,12 @@
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    """A page of a keyset paginated listing, next_cursor is None on the last page"""
+
+    items: list[T] = field(default_factory=list)
+    next_cursor: str | None = None
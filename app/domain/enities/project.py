@@ -56,3 +56,16 @@ class Project:
         if description is not None:
             self._validate_description(description=description)
             self.description = description
+
+
+@dataclass
+class ProjectSummary:
+    """A read-only projection of a project for listings, without the documents and participants"""
+
+    id: UUID
+    name: str
+    description: str
+    owner: UUID
+    created_at: datetime
+    document_count: int | None = None
+    participant_count: int | None = None
@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+from uuid import UUID
+
+
+@dataclass
+class PurgeJob:
+    """The removal of a soft deleted project or document, its rows first, then its files"""
+
+    PROJECT = "project"
+    DOCUMENT = "document"
+
+    id: UUID
+    kind: str
+    target_id: UUID
+    attempts: int = 0
+    # None until the rows are deleted, then the files left to remove
+    storage_paths: list[str] | None = None
+    last_error: str | None = None
+
+
+@dataclass
+class PurgeQueueStats:
+    """The state of the purge queue"""
+
+    # the jobs still to run, ready ones included, and those that ran out of attempts
+    depth: int
+    ready: int
+    failed: int
+    # the age of the oldest job still to run, in seconds
+    lag_seconds: float
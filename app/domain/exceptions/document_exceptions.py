@@ -77,6 +77,15 @@ class DocumentUnsupportedStorageBackendError(Exception):
         self.storage_backend = storage_backend
         super().__init__(f"Unsupported storage backend: {self.storage_backend}")
 
+
+class DocumentRangeNotSatisfiableError(Exception):
+    """Raised when none of the requested byte ranges is inside the document"""
+
+    def __init__(self, size: int):
+        self.size = size
+        super().__init__(f"Requested range not satisfiable, the document has {self.size} bytes")
+
+
 class DocumentUpdateEmptyError(Exception):
     """Raised when the document update has no changes"""
 
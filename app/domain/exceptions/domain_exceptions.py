@@ -4,3 +4,11 @@ class DomainValidationError(Exception):
     def __init__(self, message: str):
         super().__init__(message)
         self.message = message
+
+
+class InvalidCursorError(Exception):
+    """Raised when a pagination cursor can't be decoded"""
+
+    def __init__(self, cursor: str):
+        self.cursor = cursor
+        super().__init__(f"Invalid pagination cursor: '{self.cursor}'")
@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+
+from app.domain.enities.blob import Blob
+
+
+class BlobRepository(ABC):
+    """An abstract BlobRepository interface, the reference counts of the content addressed files"""
+
+    @abstractmethod
+    def acquire(self, blob: Blob) -> Blob:
+        """
+        Add a reference to the blob, inserting it if it's unknown. Returns the stored blob,
+        a refcount of 1 means it has no file yet, the caller has to write it.
+        """
+        pass
+
+    @abstractmethod
+    def release(self, storage_paths: list[str]) -> dict[str, int]:
+        """Drop a reference per listed path, returns the remaining refcounts of the known blobs by storage path"""
+        pass
+
+    @abstractmethod
+    def lock(self, storage_paths: list[str]) -> dict[str, int]:
+        """Lock the known blobs (FOR UPDATE) and return their refcounts by storage path"""
+        pass
+
+    @abstractmethod
+    def delete_unreferenced(self, storage_paths: list[str]) -> None:
+        """Delete the listed blobs that have no references left"""
+        pass
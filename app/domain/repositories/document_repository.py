@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod, abstractstaticmethod
+from datetime import datetime
 from uuid import UUID
 
 from app.domain.enities.document import Document
@@ -9,8 +10,10 @@ class DocumentRepository(ABC):
     """A DocumentRepository interface"""
 
     @abstractmethod
-    def list_by_project(self, user_id: UUID, project_id: UUID):
-        """List all documents attached to the project"""
+    def list_by_project(
+        self, user_id: UUID, project_id: UUID, limit: int | None = None, after: tuple[datetime, UUID] | None = None
+    ):
+        """List the documents attached to the project, ordered by (created_at, id), starting after the given keyset"""
         pass
 
     @abstractmethod
@@ -18,6 +21,14 @@ class DocumentRepository(ABC):
         """Get a document by its ID"""
         pass
 
+    @abstractmethod
+    def get_with_role(self, user_id: UUID, document_id: UUID) -> tuple[Document, str | None] | None:
+        """
+        Get a document together with the role the user has on its project, in one query.
+        None if there is no such document, the role is None if the user isn't a participant.
+        """
+        pass
+
     @abstractmethod
     def create(self, project_id: UUID, document: Document):
         pass
@@ -37,6 +48,31 @@ class DocumentRepository(ABC):
         """Delete a document by its ID"""
         pass
 
+    @abstractmethod
+    def soft_delete(self, document_id: UUID) -> bool:
+        """Mark a document as deleted, hiding it at once, False if it was not found"""
+        pass
+
+    @abstractmethod
+    def purge(self, document_id: UUID) -> str | None:
+        """Delete a soft deleted document, returns the storage path of its file, None if it's gone already"""
+        pass
+
+    @abstractmethod
+    def referenced_paths(self, storage_paths: list[str]) -> set[str]:
+        """The listed storage paths that a live document still points to"""
+        pass
+
+    @abstractmethod
+    def update_many(self, project_id: UUID, updates: list[dict]) -> list[UUID]:
+        """Update the name/description of many documents of a project at once, returns the updated IDs"""
+        pass
+
+    @abstractmethod
+    def delete_many(self, project_id: UUID, document_ids: list[UUID]) -> list[tuple[UUID, str]]:
+        """Delete many documents of a project at once, returns the (ID, storage path) of the deleted ones"""
+        pass
+
     @abstractstaticmethod
     def to_domain_entity(document_orm: DocumentORM):
         """Convert orm to domain"""
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
 from uuid import UUID
 
-from app.domain.enities.project import Project
+from app.domain.enities.project import Project, ProjectSummary
 
 
 class ProjectRepository(ABC):
@@ -12,11 +13,35 @@ class ProjectRepository(ABC):
         """List all projects for a given user ID"""
         pass
 
+    @abstractmethod
+    def list_summaries_by_user(
+        self,
+        user_id: UUID,
+        with_counts: bool = False,
+        limit: int | None = None,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> list[ProjectSummary]:
+        """
+        List the project summaries for a given user ID, optionally with document and participant counts.
+        Ordered by (created_at, id), starting after the given keyset.
+        """
+        pass
+
     @abstractmethod
     def get_by_id(self, project_id: UUID) -> Project | None:
         """Get a project by its ID"""
         pass
 
+    @abstractmethod
+    def get_details(self, project_id: UUID) -> Project | None:
+        """Get a project by its ID without its documents and participants"""
+        pass
+
+    @abstractmethod
+    def list_document_paths(self, project_id: UUID) -> list[str]:
+        """The storage paths of the project's documents"""
+        pass
+
     @abstractmethod
     def add(self, project: Project) -> Project:
         """Add a new project to the repository"""
@@ -28,6 +53,14 @@ class ProjectRepository(ABC):
         pass
 
     @abstractmethod
-    def delete(self, project_id: UUID) -> bool:
-        """Delete a project by its ID"""
+    def soft_delete(self, project_id: UUID) -> bool:
+        """Mark a project as deleted, hiding it with its documents, False if it was not found"""
+        pass
+
+    @abstractmethod
+    def delete(self, project_id: UUID) -> list[str] | None:
+        """
+        Delete a project by its ID, along with its documents and roles.
+        Returns the storage paths of the deleted documents, None if the project was not found.
+        """
         pass
@@ -0,0 +1,42 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from uuid import UUID
+
+from app.domain.enities.purge_job import PurgeJob, PurgeQueueStats
+
+
+class PurgeJobRepository(ABC):
+    """An abstract PurgeJobRepository interface, the queue of the background purge"""
+
+    @abstractmethod
+    def enqueue(self, kind: str, target_id: UUID) -> None:
+        """Queue the purge of a soft deleted project or document, within the caller's unit of work"""
+        pass
+
+    @abstractmethod
+    def claim(self, batch_size: int, lease_seconds: int) -> list[PurgeJob]:
+        """
+        Lease up to batch_size ready jobs, skipping those another worker holds. A job is leased till it's done,
+        retried or the lease runs out, so a crashed worker's jobs are picked up again.
+        """
+        pass
+
+    @abstractmethod
+    def set_storage_paths(self, job_id: UUID, storage_paths: list[str]) -> None:
+        """Record the files that are still to be removed"""
+        pass
+
+    @abstractmethod
+    def complete(self, job_id: UUID) -> None:
+        """Remove a finished job from the queue"""
+        pass
+
+    @abstractmethod
+    def retry(self, job_id: UUID, error: str, available_at: datetime | None) -> None:
+        """Release a failed job till available_at, None keeps it out of the queue for good"""
+        pass
+
+    @abstractmethod
+    def stats(self) -> PurgeQueueStats:
+        """The queue depth and lag"""
+        pass
@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+
+
+class UnitOfWork(ABC):
+    """
+    A request scoped unit of work interface.
+    Repositories sharing it only flush their changes, the service commits them all at once.
+    """
+
+    @abstractmethod
+    def commit(self) -> None:
+        """Commit every change made within the unit of work"""
+        pass
+
+    @abstractmethod
+    def rollback(self) -> None:
+        """Discard every change made within the unit of work"""
+        pass
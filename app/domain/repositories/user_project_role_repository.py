@@ -9,6 +9,34 @@ class UserProjectRoleRepository(ABC):
     def add(self, role_model: UserProjectRole) -> None:
         pass
 
+    @abstractmethod
+    def add_many(self, project_id: UUID, user_ids: list[UUID], role: str) -> list[UUID]:
+        """
+        Give the users a role on the project with one multi-row insert, skipping the users that already have one.
+        Returns the IDs of the users whose role was inserted.
+        """
+        pass
+
+    @abstractmethod
+    def get_project_roles(self, project_id: UUID, user_ids: list[UUID]) -> dict[UUID, str]:
+        """The roles the given users have on the project by user ID, in one query, non participants are left out"""
+        pass
+
     @abstractmethod
     def get_user_role_on_project(self, project_id: UUID, user_id: UUID) -> str:
         pass
+
+    @abstractmethod
+    def get_project_access(self, project_id: UUID, user_id: UUID) -> tuple[bool, str | None]:
+        """Whether the project exists and the role the user has on it (None for non participants), in one query"""
+        pass
+
+    @abstractmethod
+    def get_user_roles_on_projects(self, user_id: UUID, project_ids: list[UUID]) -> dict[UUID, str]:
+        """The user's roles by project ID, in one query, the projects the user doesn't participate in are left out"""
+        pass
+
+    @abstractmethod
+    def get_live_project_ids(self, project_ids: list[UUID]) -> set[UUID]:
+        """The listed projects that exist and are not soft deleted, in one primary key lookup"""
+        pass
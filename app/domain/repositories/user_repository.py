@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from uuid import UUID
 
 from app.domain.enities.user import User
 
@@ -7,13 +8,18 @@ class UserRepository(ABC):
     """An abstract UserRepository interface"""
 
     @abstractmethod
-    def get_by_id(self, user_id: str) -> User | None:
+    def get_by_id(self, user_id: UUID) -> User | None:
         pass
 
     @abstractmethod
     def get_by_username(self, username: str) -> User | None:
         pass
 
+    @abstractmethod
+    def get_by_usernames(self, usernames: list[str]) -> list[User]:
+        """The users with the given usernames, in one query, the unknown usernames are left out"""
+        pass
+
     @abstractmethod
     def get_by_email(self, email: str) -> User | None:
         pass
@@ -1,16 +1,66 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from uuid import UUID
 
 from fastapi import UploadFile
 
 
+@dataclass
+class StoredFile:
+    """The metadata of a file saved by a storage backend"""
+
+    file_name: str
+    content_type: str
+    storage_path: str
+    storage_backend: str
+    size: int | None = None
+    sha256: str | None = None
+    # the type told by the file's magic bytes, None when they are not recognized
+    detected_content_type: str | None = None
+
+
+@dataclass
+class PresignedUpload:
+    """A presigned POST: the form fields a client posts to the url, along with the file, to upload it directly"""
+
+    url: str
+    fields: dict[str, str]
+    # names the staged upload when it is completed
+    upload_id: UUID
+    file_name: str
+    storage_path: str
+    expires_in: int
+
+
 class DocumentStorage(ABC):
     """Abstract Document Storage"""
 
     @abstractmethod
-    async def save(self, project_id: UUID, uploaded_file: UploadFile):
+    async def save(self, project_id: UUID, uploaded_file: UploadFile) -> StoredFile:
+        pass
+
+    @abstractmethod
+    def blob_path(self, sha256: str) -> str:
+        """The storage path of a content addressed file"""
+        pass
+
+    @abstractmethod
+    async def save_blob(self, storage_path: str, uploaded_file: UploadFile) -> None:
+        """Write the uploaded file to the given (content addressed) storage path"""
         pass
 
     @abstractmethod
     async def remove(self, storage_path: str):
         pass
+
+    @abstractmethod
+    async def remove_many(self, storage_paths: list[str]) -> None:
+        """
+        Delete many files at once, the folders left empty are removed once each.
+        Every file is attempted, raises DocumentFileDeleteError naming the ones that could not be deleted.
+        """
+        pass
+
+    async def close(self) -> None:
+        """Release the backend's connections, on shutdown"""
+        pass
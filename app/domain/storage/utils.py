@@ -1,5 +1,23 @@
+import hashlib
 import re
 from pathlib import Path
+from uuid import uuid4
+
+from fastapi import UploadFile
+
+# file signatures (offset, magic bytes) of the content types the app deals with
+MAGIC_BYTES = [
+    (0, b"%PDF-", "application/pdf"),
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"BM", "image/bmp"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (8, b"WEBP", "image/webp"),
+    (0, b"PK\x03\x04", "application/zip"),
+]
+# the longest offset + signature
+SNIFF_LENGTH = 16
 
 
 def filename_normalizer(filename: str) -> str:
@@ -19,3 +37,51 @@ def filename_normalizer(filename: str) -> str:
     safe_name = re.sub(r"[^a-zA-Z0-9_]+", "_", file_name)
 
     return f"{safe_name}{ext}"
+
+
+def unique_storage_name(file_name: str) -> str:
+    """
+    The name a write of the file is stored under in its project folder, prefixed with an ID of its own.
+    No two uploads share a path, so a path released by a replaced or deleted document is never written again.
+    """
+    return f"{uuid4().hex}_{file_name}"
+
+
+def sniff_content_type(head: bytes) -> str | None:
+    """The content type told by the magic bytes at the start of a file, None if they are not recognized"""
+    for offset, magic, content_type in MAGIC_BYTES:
+        if head[offset : offset + len(magic)] == magic:
+            return content_type
+    return None
+
+
+class FileDigest:
+    """Computes the size, the SHA-256 and the sniffed content type of a file fed to it chunk by chunk"""
+
+    def __init__(self):
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._head = b""
+
+    def update(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        self._sha256.update(chunk)
+        if len(self._head) < SNIFF_LENGTH:
+            self._head += chunk[: SNIFF_LENGTH - len(self._head)]
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    @property
+    def detected_content_type(self) -> str | None:
+        return sniff_content_type(self._head)
+
+
+async def digest_upload(uploaded_file: UploadFile, chunk_size: int) -> FileDigest:
+    """Reads the (spooled) upload once to compute its digest, then rewinds it for the actual write"""
+    digest = FileDigest()
+    while chunk := await uploaded_file.read(chunk_size):
+        digest.update(chunk)
+    await uploaded_file.seek(0)
+    return digest
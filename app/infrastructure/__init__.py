@@ -1,6 +1,18 @@
+from app.infrastructure.async_sqlalchemy_project_repository import \
+    AsyncSQLAlchemyProjectRepository
+from app.infrastructure.async_sqlalchemy_user_project_role_repository import \
+    AsyncSQLAlchemyUserProjectRoleRepository
+from app.infrastructure.async_sqlalchemy_user_repository import \
+    AsyncSQLAlchemyUserRepository
 from app.infrastructure.sqlalchemy_project_repository import \
     SQLAlchemyProjectRepository
 from app.infrastructure.sqlalchemy_user_repository import \
     SQLAlchemyUserRepository
 
-__all__ = ["SQLAlchemyUserRepository", "SQLAlchemyProjectRepository"]
+__all__ = [
+    "SQLAlchemyUserRepository",
+    "SQLAlchemyProjectRepository",
+    "AsyncSQLAlchemyUserRepository",
+    "AsyncSQLAlchemyProjectRepository",
+    "AsyncSQLAlchemyUserProjectRoleRepository",
+]
@@ -0,0 +1,53 @@
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.enities.blob import Blob
+from app.domain.repositories.blob_repository import BlobRepository
+from app.infrastructure.core.exceptions import DatabaseError
+from app.infrastructure.sqlalchemy_blob_repository import \
+    SQLAlchemyBlobRepository
+
+
+class AsyncSQLAlchemyBlobRepository(BlobRepository):
+    """BlobRepository implementation on top of an AsyncSession"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def acquire(self, blob: Blob) -> Blob:
+        statement = SQLAlchemyBlobRepository._acquire_statement(self.db.get_bind().dialect.name, blob)
+        try:
+            result = await self.db.execute(statement)
+            return Blob(**result.one()._asdict())
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def release(self, storage_paths: list[str]) -> dict[str, int]:
+        if not storage_paths:
+            return {}
+        try:
+            rows = await self.db.execute(SQLAlchemyBlobRepository._release_statement(storage_paths))
+            return {row.storage_path: row.refcount for row in rows}
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def lock(self, storage_paths: list[str]) -> dict[str, int]:
+        if not storage_paths:
+            return {}
+        try:
+            rows = await self.db.execute(SQLAlchemyBlobRepository._lock_statement(storage_paths))
+            return {row.storage_path: row.refcount for row in rows}
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def delete_unreferenced(self, storage_paths: list[str]) -> None:
+        if not storage_paths:
+            return
+        try:
+            await self.db.execute(SQLAlchemyBlobRepository._delete_unreferenced_statement(storage_paths))
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
@@ -0,0 +1,189 @@
+from datetime import UTC, datetime
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.enities.document import Document
+from app.domain.repositories.document_repository import DocumentRepository
+from app.infrastructure.core.exceptions import DatabaseError
+from app.infrastructure.core.routing_session import stick_to_primary
+from app.infrastructure.orm import DocumentORM
+from app.infrastructure.sqlalchemy_documet_repository import \
+    SQLAlchemyDocumentRepository
+
+
+class AsyncSQLAlchemyDocumentRepository(DocumentRepository):
+    """DocumentRepository implementation on top of an AsyncSession"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def to_domain_entity(orm: DocumentORM | list[DocumentORM]) -> list[Document] | Document:
+        """Map ORM model to domain model"""
+        return SQLAlchemyDocumentRepository.to_domain_entity(orm)
+
+    async def list_by_project(
+        self, user_id: UUID, project_id: UUID, limit: int | None = None, after: tuple[datetime, UUID] | None = None
+    ) -> list[Document]:
+        """List the Documents for a given project ID"""
+        try:
+            result = await self.db.scalars(
+                SQLAlchemyDocumentRepository._list_by_project_statement(
+                    user_id=user_id, project_id=project_id, limit=limit, after=after
+                )
+            )
+            return self.to_domain_entity(list(result.all()))
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
+
+    async def create(self, project_id: UUID, document: Document):
+        """Persist the Document in the database"""
+        orm = DocumentORM(**document.__dict__)  # type: ignore
+
+        try:
+            self.db.add(orm)
+            await self.db.flush()
+            return self.to_domain_entity(orm)
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def get_by_filename(self, project_id: UUID, file_name: str) -> Document | None:
+        """Get a document by its file name within a project"""
+        try:
+            orm_document = await self.db.scalar(
+                select(DocumentORM).filter(DocumentORM.project_id == project_id, DocumentORM.file_name == file_name)
+            )
+            if orm_document:
+                return self.to_domain_entity(orm_document)
+            return None
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
+
+    async def save(self, document: Document):
+        """Save changes to an existing document"""
+        try:
+            # the row is about to change, load it from the primary
+            stick_to_primary(self.db)
+            orm = await self.db.get(DocumentORM, document.id)
+            if not orm:
+                raise DatabaseError(f"Document with ID {document.id} not found")
+
+            # dataclass
+            data = vars(document)
+
+            for key, value in data.items():
+                if hasattr(orm, key):  # only update fields that exist in ORM
+                    setattr(orm, key, value)
+
+            # set update time
+            orm.updated_at = datetime.now(UTC)
+
+            await self.db.flush()
+            return self.to_domain_entity(orm)
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def get_by_id(
+        self, user_id: UUID, document_id: UUID, to_orm=True
+    ) -> None | list[Document] | Document | DocumentORM:
+        """Get a document by its ID"""
+        try:
+            orm = await self.db.get(DocumentORM, document_id)
+
+            if orm is None:
+                # I do not throw NotFound exception here but in service instead
+                return None
+            if to_orm:
+                return self.to_domain_entity(orm)
+            return orm
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
+
+    async def get_with_role(self, user_id: UUID, document_id: UUID) -> tuple[Document, str | None] | None:
+        """Get a document and the user's role on its project"""
+        try:
+            result = await self.db.execute(
+                SQLAlchemyDocumentRepository._get_with_role_statement(user_id=user_id, document_id=document_id)
+            )
+            row = result.first()
+            if row is None:
+                return None
+            return self.to_domain_entity(row.DocumentORM), row.role
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
+
+    async def update_many(self, project_id: UUID, updates: list[dict]) -> list[UUID]:
+        """Update the name/description of many documents of a project at once"""
+        try:
+            result = await self.db.scalars(
+                SQLAlchemyDocumentRepository._update_many_statement(project_id=project_id, updates=updates)
+            )
+            return list(result.all())
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def delete_many(self, project_id: UUID, document_ids: list[UUID]) -> list[tuple[UUID, str]]:
+        """Delete many documents of a project at once"""
+        try:
+            rows = await self.db.execute(
+                SQLAlchemyDocumentRepository._delete_many_statement(project_id=project_id, document_ids=document_ids)
+            )
+            return [(row.id, row.storage_path) for row in rows]
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def soft_delete(self, document_id: UUID) -> bool:
+        """Mark a document as deleted, False if it was not found"""
+        try:
+            stick_to_primary(self.db)
+            deleted = await self.db.scalar(
+                SQLAlchemyDocumentRepository._soft_delete_statement(document_id=document_id, now=datetime.now(UTC))
+            )
+            return deleted is not None
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def purge(self, document_id: UUID) -> str | None:
+        """Delete a soft deleted document, returns the path of its file, None if it's gone already"""
+        try:
+            return await self.db.scalar(SQLAlchemyDocumentRepository._purge_statement(document_id=document_id))
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def referenced_paths(self, storage_paths: list[str]) -> set[str]:
+        """The listed paths that a live document still points to"""
+        if not storage_paths:
+            return set()
+        try:
+            result = await self.db.scalars(
+                SQLAlchemyDocumentRepository._referenced_paths_statement(storage_paths=storage_paths)
+            )
+            return set(result.all())
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
+
+    async def delete(self, document_id: UUID):
+        """Delete a document by its ID"""
+        try:
+            # the row is about to change, load it from the primary
+            stick_to_primary(self.db)
+            orm = await self.db.get(DocumentORM, document_id)
+            if orm is None:
+                raise DatabaseError(f"Document with ID {document_id} not found")
+
+            await self.db.delete(orm)
+            await self.db.flush()
+            return True
+
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
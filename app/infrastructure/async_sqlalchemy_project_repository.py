@@ -0,0 +1,140 @@
+from datetime import UTC, datetime
+from uuid import UUID
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.enities import Project
+from app.domain.enities.project import Project as DomainProject
+from app.domain.enities.project import ProjectSummary
+from app.domain.repositories.project_repository import ProjectRepository
+from app.infrastructure.core.exceptions import DatabaseError
+from app.infrastructure.core.routing_session import stick_to_primary
+from app.infrastructure.orm import ProjectORM
+from app.infrastructure.sqlalchemy_project_repository import \
+    SQLAlchemyProjectRepository
+
+
+class AsyncSQLAlchemyProjectRepository(ProjectRepository):
+    """ProjectRepository implementation on top of an AsyncSession"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_by_user(self, user_id: UUID) -> list[DomainProject]:
+        """List all projects for a given user ID"""
+        try:
+            # lazy loading is not possible with an AsyncSession, the statement loads the whole aggregate upfront
+            result = await self.db.scalars(SQLAlchemyProjectRepository._list_by_user_statement(user_id=user_id))
+            return [SQLAlchemyProjectRepository._to_domain_entity(orm) for orm in result.all()]
+
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
+
+    async def list_summaries_by_user(
+        self,
+        user_id: UUID,
+        with_counts: bool = False,
+        limit: int | None = None,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> list[ProjectSummary]:
+        """List the project summaries for a given user ID"""
+        try:
+            rows = await self.db.execute(
+                SQLAlchemyProjectRepository._list_summaries_by_user_statement(
+                    user_id=user_id, with_counts=with_counts, limit=limit, after=after
+                )
+            )
+            return [SQLAlchemyProjectRepository._to_summary(row) for row in rows]
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
+
+    async def get_by_id(self, project_id: UUID) -> DomainProject | None:
+        """Get a project by its ID"""
+        try:
+            result = await self.db.execute(SQLAlchemyProjectRepository._get_by_id_statement(project_id=project_id))
+            orm = result.unique().scalar_one_or_none()
+
+            if orm is None:
+                # I do not throw NotFound exception here but in service instead
+                return None
+            return SQLAlchemyProjectRepository._to_domain_entity(orm)
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
+
+    async def get_details(self, project_id: UUID) -> DomainProject | None:
+        """Get a project by its ID without its documents and participants"""
+        try:
+            result = await self.db.execute(SQLAlchemyProjectRepository._get_details_statement(project_id=project_id))
+            row = result.one_or_none()
+            return SQLAlchemyProjectRepository._details_to_domain_entity(row) if row else None
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
+
+    async def list_document_paths(self, project_id: UUID) -> list[str]:
+        """The storage paths of the project's documents"""
+        try:
+            result = await self.db.scalars(
+                SQLAlchemyProjectRepository._list_document_paths_statement(project_id=project_id)
+            )
+            return list(result.all())
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
+
+    async def add(self, project: DomainProject) -> DomainProject:
+        """Add a new project to the database"""
+        # a new project has no children yet, empty collections spare the lazy loads when mapping it back
+        orm = ProjectORM(
+            id=project.id,
+            name=project.name,
+            description=project.description,
+            owner_id=project.owner,
+            documents=[],
+            participants=[],
+        )
+        try:
+            self.db.add(orm)
+            await self.db.flush()
+            return SQLAlchemyProjectRepository._to_domain_entity(orm)
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def save(self, project: Project) -> Project:
+        """Persist changes to an existing project"""
+        try:
+            await self.db.execute(SQLAlchemyProjectRepository._save_statement(project=project))
+            return project
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def soft_delete(self, project_id: UUID) -> bool:
+        """Mark a project as deleted, False if it was not found"""
+        try:
+            stick_to_primary(self.db)
+            deleted = await self.db.scalar(
+                SQLAlchemyProjectRepository._soft_delete_statement(project_id=project_id, now=datetime.now(UTC))
+            )
+            return deleted is not None
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def delete(self, project_id: UUID) -> list[str] | None:
+        """
+        Delete a project by ID in two statements, whatever its size, nothing is loaded into the session.
+        Returns the storage paths of its documents, None if not found.
+        """
+        try:
+            stick_to_primary(self.db)
+            result = await self.db.scalars(
+                SQLAlchemyProjectRepository._delete_documents_statement(project_id=project_id)
+            )
+            storage_paths = list(result.all())
+            deleted = await self.db.scalar(SQLAlchemyProjectRepository._delete_statement(project_id=project_id))
+            return storage_paths if deleted is not None else None
+
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
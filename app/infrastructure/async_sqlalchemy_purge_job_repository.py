@@ -0,0 +1,73 @@
+from datetime import UTC, datetime
+from uuid import UUID
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.enities.purge_job import PurgeJob, PurgeQueueStats
+from app.domain.repositories.purge_job_repository import PurgeJobRepository
+from app.infrastructure.core.exceptions import DatabaseError
+from app.infrastructure.core.routing_session import stick_to_primary
+from app.infrastructure.orm import PurgeJobORM
+from app.infrastructure.sqlalchemy_purge_job_repository import \
+    SQLAlchemyPurgeJobRepository
+
+
+class AsyncSQLAlchemyPurgeJobRepository(PurgeJobRepository):
+    """PurgeJobRepository implementation on top of an AsyncSession"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue(self, kind: str, target_id: UUID) -> None:
+        try:
+            self.db.add(PurgeJobORM(kind=kind, target_id=target_id, available_at=datetime.now(UTC)))
+            await self.db.flush()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def claim(self, batch_size: int, lease_seconds: int) -> list[PurgeJob]:
+        try:
+            # the purge reads what it's about to delete, the replicas could be behind
+            stick_to_primary(self.db)
+            rows = await self.db.execute(
+                SQLAlchemyPurgeJobRepository._claim_statement(
+                    batch_size=batch_size, lease_seconds=lease_seconds, now=datetime.now(UTC)
+                )
+            )
+            return [PurgeJob(**row._asdict()) for row in rows]
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def set_storage_paths(self, job_id: UUID, storage_paths: list[str]) -> None:
+        try:
+            await self.db.execute(SQLAlchemyPurgeJobRepository._update_statement(job_id, storage_paths=storage_paths))
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def complete(self, job_id: UUID) -> None:
+        try:
+            await self.db.execute(SQLAlchemyPurgeJobRepository._complete_statement(job_id))
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def retry(self, job_id: UUID, error: str, available_at: datetime | None) -> None:
+        try:
+            await self.db.execute(
+                SQLAlchemyPurgeJobRepository._update_statement(job_id, last_error=error, available_at=available_at)
+            )
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def stats(self) -> PurgeQueueStats:
+        now = datetime.now(UTC)
+        try:
+            result = await self.db.execute(SQLAlchemyPurgeJobRepository._stats_statement(now))
+            return SQLAlchemyPurgeJobRepository._to_stats(result.one(), now)
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
@@ -0,0 +1,24 @@
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.repositories.unit_of_work import UnitOfWork
+from app.infrastructure.core.exceptions import DatabaseError
+
+
+class AsyncSQLAlchemyUnitOfWork(UnitOfWork):
+    """Unit of work over the request's AsyncSession, shared with the repositories"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def commit(self) -> None:
+        """Commit the request's transaction"""
+        try:
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    async def rollback(self) -> None:
+        """Roll back the request's transaction"""
+        await self.db.rollback()
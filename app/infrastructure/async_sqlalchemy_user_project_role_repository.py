@@ -0,0 +1,112 @@
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.enities.user_project_role import UserProjectRole
+from app.domain.repositories.user_project_role_repository import \
+    UserProjectRoleRepository
+from app.infrastructure.core.cache import role_cache
+from app.infrastructure.core.exceptions import DatabaseError
+from app.infrastructure.orm import UserProjectRoleORM
+from app.infrastructure.sqlalchemy_user_project_role_repository import \
+    SQLAlchemyUserProjectRoleRepository
+
+
+class AsyncSQLAlchemyUserProjectRoleRepository(UserProjectRoleRepository):
+    """UserProjectRoleRepository implementation on top of an AsyncSession"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add(self, role_model: UserProjectRole) -> None:
+        """Save the user role to the association table"""
+        orm = UserProjectRoleORM(project_id=role_model.project_id, user_id=role_model.user_id, role=role_model.role)
+        try:
+            self.db.add(orm)
+            await self.db.flush()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError from e
+        finally:
+            # a role write must not be shadowed by a cached one
+            role_cache.invalidate((role_model.user_id, role_model.project_id))
+
+    async def add_many(self, project_id: UUID, user_ids: list[UUID], role: str) -> list[UUID]:
+        """Give the users a role on the project with one insert, returns the users whose role was inserted"""
+        if not user_ids:
+            return []
+        statement = SQLAlchemyUserProjectRoleRepository._add_many_statement(
+            self.db.get_bind().dialect.name, project_id, user_ids, role
+        )
+        try:
+            return list(await self.db.scalars(statement))
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError from e
+        finally:
+            for user_id in user_ids:
+                role_cache.invalidate((user_id, project_id))
+
+    async def get_project_roles(self, project_id: UUID, user_ids: list[UUID]) -> dict[UUID, str]:
+        """The roles the given users have on the project by user ID"""
+        if not user_ids:
+            return {}
+        try:
+            rows = await self.db.execute(
+                SQLAlchemyUserProjectRoleRepository._project_roles_statement(project_id=project_id, user_ids=user_ids)
+            )
+            return {row.user_id: row.role for row in rows}
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError from e
+
+    async def get_user_role_on_project(self, project_id: UUID, user_id: UUID) -> str:
+        """Return a role, a given user has on a given project"""
+        try:
+            role = await self.db.scalar(
+                select(UserProjectRoleORM.role).filter(
+                    UserProjectRoleORM.project_id == project_id, UserProjectRoleORM.user_id == user_id
+                )
+            )
+            return role
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError from e
+
+    async def get_project_access(self, project_id: UUID, user_id: UUID) -> tuple[bool, str | None]:
+        """Whether the project exists and the role the user has on it"""
+        try:
+            result = await self.db.execute(
+                SQLAlchemyUserProjectRoleRepository._project_access_statement(project_id=project_id, user_id=user_id)
+            )
+            row = result.one()
+            return bool(row.project_exists), row.role
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError from e
+
+    async def get_user_roles_on_projects(self, user_id: UUID, project_ids: list[UUID]) -> dict[UUID, str]:
+        """The user's roles by project ID, the projects the user doesn't participate in are left out"""
+        if not project_ids:
+            return {}
+        try:
+            rows = await self.db.execute(
+                SQLAlchemyUserProjectRoleRepository._user_roles_statement(user_id=user_id, project_ids=project_ids)
+            )
+            return {row.project_id: row.role for row in rows}
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError from e
+
+    async def get_live_project_ids(self, project_ids: list[UUID]) -> set[UUID]:
+        """The listed projects that exist and are not soft deleted"""
+        if not project_ids:
+            return set()
+        statement = SQLAlchemyUserProjectRoleRepository._live_projects_statement(project_ids=project_ids)
+        try:
+            return set(await self.db.scalars(statement))
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            raise DatabaseError from e
@@ -0,0 +1,48 @@
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.enities.user import User as DomainUser
+from app.domain.repositories.user_repository import UserRepository
+from app.infrastructure.orm.user_model import UserORM
+from app.infrastructure.sqlalchemy_user_repository import \
+    SQLAlchemyUserRepository
+
+
+class AsyncSQLAlchemyUserRepository(UserRepository):
+    """UserRepository implementation on top of an AsyncSession"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, user_id: UUID) -> DomainUser | None:
+        orm = await self.db.scalar(select(UserORM).filter(UserORM.id == user_id))
+        if not orm:
+            return None
+        return SQLAlchemyUserRepository._to_domain_entity(orm)
+
+    async def get_by_username(self, username: str) -> DomainUser | None:
+        orm = await self.db.scalar(select(UserORM).filter(UserORM.username == username))
+        if not orm:
+            return None
+        return SQLAlchemyUserRepository._to_domain_entity(orm)
+
+    async def get_by_usernames(self, usernames: list[str]) -> list[DomainUser]:
+        if not usernames:
+            return []
+        orms = await self.db.scalars(select(UserORM).filter(UserORM.username.in_(usernames)))
+        return [SQLAlchemyUserRepository._to_domain_entity(orm) for orm in orms]
+
+    async def get_by_email(self, email: str) -> DomainUser | None:
+        orm = await self.db.scalar(select(UserORM).filter(UserORM.email == email))
+        if not orm:
+            return None
+        return SQLAlchemyUserRepository._to_domain_entity(orm)
+
+    async def create(self, user: DomainUser) -> DomainUser:
+        orm = UserORM(id=user.id, username=user.username, email=user.email, password_hash=user.password_hash)
+
+        self.db.add(orm)
+        await self.db.flush()
+        return SQLAlchemyUserRepository._to_domain_entity(orm)
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from app.infrastructure.core.config import settings
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    A bounded in-process LRU cache whose entries expire after `ttl` seconds.
+    Thread safe, the sync database stack calls it from worker threads.
+    Every process has its own copy, so the TTL bounds how stale an entry can get on the other workers.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the cached value, or the default if it's missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING or entry[0] < time.monotonic():
+                if entry is not _MISSING:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            # evict the least recently used
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Drops every entry whose key matches, a scan of the whole cache, meant for the rare bulk invalidation"""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Hit and miss counters and the current number of entries, served by GET /metrics/cache"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+# the authenticated users (UserOut) by user ID, spares get_current_user a query per request
+user_cache = TTLCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl)
+
+# the roles by (user ID, project ID), only the participants' roles are cached, so adding a role needs no re-check
+role_cache = TTLCache(maxsize=settings.role_cache_size, ttl=settings.role_cache_ttl)
+
+# the presigned S3 download URLs by (storage key, file name, content type), dropped before the URL expires
+presigned_url_cache = TTLCache(
+    maxsize=settings.presigned_url_cache_size,
+    ttl=max(settings.s3_presigned_url_ttl - settings.s3_presigned_url_refresh_margin, 0),
+)
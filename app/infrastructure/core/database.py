@@ -1,17 +1,48 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from app.infrastructure.core.config import Settings
+from app.infrastructure.core.routing_session import RoutingSession
 
 settings = Settings()
 
 DATABASE_URL = f"postgresql://{settings.db_username}:{settings.db_password}@{settings.db_host}:{settings.db_port}/{settings.db_name}"
 
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{settings.db_username}:{settings.db_password}@{settings.db_host}:{settings.db_port}/{settings.db_name}"
+
+
+def async_url(url: str) -> str:
+    """The asyncpg flavour of a postgres URL, other URLs are returned unchanged"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "postgresql":
+        return url
+    return parsed.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
 # Create the SQLAlchemy engine
 engine = create_engine(DATABASE_URL)
 
-# Create a SessionLocal class to manage database sessions
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create the async SQLAlchemy engine (asyncpg driver)
+async_engine = create_async_engine(ASYNC_DATABASE_URL)
+
+# read replicas, each with its own connection pool
+replica_engines = [create_engine(url) for url in settings.db_replica_urls]
+async_replica_engines = [create_async_engine(async_url(url)) for url in settings.db_replica_urls]
+
+# Create a SessionLocal class to manage database sessions, the reads are routed to a replica (if configured)
+SessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, primary=engine, replicas=replica_engines
+)
+
+# Async sessions must not expire on commit, otherwise attribute access after a commit would need implicit IO
+AsyncSessionLocal = async_sessionmaker(
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False,
+    primary=async_engine.sync_engine,
+    replicas=[replica.sync_engine for replica in async_replica_engines],
+)
 
 # Create a declarative base class for model definitions
 Base = declarative_base()
@@ -24,3 +55,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Yields an async database session and ensures it is closed after use."""
+    async with AsyncSessionLocal() as db:
+        yield db
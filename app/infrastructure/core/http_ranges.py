@@ -0,0 +1,108 @@
+import re
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import aclosing
+
+# one "start-end", "start-" or "-suffix" spec of a Range header
+RANGE_SPEC = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+# an inclusive byte range
+ByteRange = tuple[int, int]
+
+
+def parse_range_header(header: str | None, size: int, max_ranges: int | None = None) -> list[ByteRange] | None:
+    """
+    The satisfiable byte ranges of a Range header, as inclusive (start, end) pairs, sorted and with the
+    overlapping or adjacent ones merged. None for a missing or malformed header, or one asking for more than
+    max_ranges ranges, which is ignored (RFC 9110), an empty list if nothing is satisfiable.
+    """
+    if not header:
+        return None
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs:
+        return None
+
+    ranges = []
+    for spec in specs.split(","):
+        match = RANGE_SPEC.match(spec)
+        if not match or match.groups() == ("", ""):
+            return None
+        start, end = match.groups()
+        if not start:
+            # the last N bytes
+            if int(end) == 0:
+                continue
+            ranges.append((max(size - int(end), 0), size - 1))
+        elif int(start) < size:
+            if end and int(end) < int(start):
+                return None
+            ranges.append((int(start), min(int(end), size - 1) if end else size - 1))
+
+    merged = coalesce_ranges(ranges)
+    if max_ranges is not None and len(merged) > max_ranges:
+        return None
+    return merged
+
+
+def coalesce_ranges(ranges: list[ByteRange]) -> list[ByteRange]:
+    """The ranges in order, the overlapping or adjacent ones merged, so no byte is fetched twice"""
+    merged: list[ByteRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def strong_etag(checksum: str | None) -> str | None:
+    """A strong ETag from the stored checksum of the file"""
+    return f'"{checksum}"' if checksum else None
+
+
+def etag_matches(header: str | None, etag: str | None) -> bool:
+    """The weak comparison of If-None-Match, a list of ETags or *"""
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def multipart_byteranges(
+    ranges: list[ByteRange],
+    size: int,
+    content_type: str,
+    boundary: str,
+    read_range: Callable[[int, int], Awaitable[AsyncIterator[bytes]]],
+) -> tuple[int, AsyncIterator[bytes]]:
+    """
+    The content length and the body of a multipart/byteranges response, every part is fetched with read_range.
+    """
+    part_headers = [
+        (
+            f"--{boundary}\r\nContent-Type: {content_type}\r\nContent-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        ).encode()
+        for start, end in ranges
+    ]
+    closing = f"\r\n--{boundary}--\r\n".encode()
+    content_length = (
+        sum(len(headers) for headers in part_headers)
+        + sum(end - start + 1 for start, end in ranges)
+        # the CRLF ending every part but the last, whose CRLF is part of the closing delimiter
+        + 2 * (len(ranges) - 1)
+        + len(closing)
+    )
+
+    async def body() -> AsyncIterator[bytes]:
+        for index, ((start, end), headers) in enumerate(zip(ranges, part_headers)):
+            if index:
+                yield b"\r\n"
+            yield headers
+            # a part abandoned midway, e.g. on a client disconnect, is closed too
+            async with aclosing(await read_range(start, end)) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+        yield closing
+
+    return content_length, body()
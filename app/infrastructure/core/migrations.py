@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from sqlalchemy import Connection, inspect
+
+from alembic import command
+from alembic.config import Config
+from app.infrastructure.core.database import engine
+
+ALEMBIC_INI = Path(__file__).resolve().parents[3] / "alembic.ini"
+# the first revision, it creates the tables older versions of the app built with create_all
+BASELINE_REVISION = "9a5610bfcf23"
+
+
+def alembic_config(connection: Connection | None = None) -> Config:
+    """Alembic config for running the migrations from code, optionally on a given connection"""
+    config = Config(str(ALEMBIC_INI))
+    # keep the app's logging setup, alembic.ini would replace it
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def upgrade_database(connection: Connection | None = None) -> None:
+    """Bring the database schema up to the latest migration
+
+    A database built by create_all has the initial tables but no alembic_version, it is stamped
+    with the baseline revision first, so the initial migration doesn't try to create them again.
+    Runs as a deploy step (make migrate), never from the app's workers, so they can't race on the DDL.
+    """
+    config = alembic_config(connection)
+    if _built_by_create_all(connection):
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+
+def _built_by_create_all(connection: Connection | None) -> bool:
+    if connection is None:
+        with engine.connect() as own_connection:
+            return _built_by_create_all(own_connection)
+    in_transaction = connection.in_transaction()
+    tables = inspect(connection).get_table_names()
+    if not in_transaction:
+        # end the transaction the inspection began, alembic begins its own per migration
+        connection.rollback()
+    return "users" in tables and "alembic_version" not in tables
+
+
+if __name__ == "__main__":
+    upgrade_database()
+    print("Database migrations applied successfully!")
@@ -0,0 +1,40 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from uuid import UUID
+
+from app.domain.enities.page import Page
+from app.domain.exceptions.domain_exceptions import InvalidCursorError
+
+# a keyset is the (created_at, id) pair of the last item on a page, listings are ordered by it
+Keyset = tuple[datetime, UUID]
+
+
+def encode_cursor(created_at: datetime, item_id: UUID) -> str:
+    """Encode a keyset into an opaque url-safe cursor"""
+    payload = json.dumps([created_at.isoformat(), str(item_id)]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Keyset:
+    """Decode an opaque cursor back into a keyset"""
+    try:
+        # restore the stripped padding
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, item_id = json.loads(payload)
+        return datetime.fromisoformat(created_at), UUID(item_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursorError(cursor) from e
+
+
+def build_page(items: list, limit: int) -> Page:
+    """
+    Build a page from items fetched with limit + 1.
+    The extra item only tells that there is a next page, it's not returned.
+    """
+    if len(items) <= limit:
+        return Page(items=items)
+    items = items[:limit]
+    last = items[-1]
+    return Page(items=items, next_cursor=encode_cursor(created_at=last.created_at, item_id=last.id))
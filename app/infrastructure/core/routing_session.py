@@ -0,0 +1,38 @@
+import random
+from collections.abc import Sequence
+
+from sqlalchemy import Engine, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+# session.info key, set once the session has written (or is about to) to the primary
+STICK_TO_PRIMARY = "stick_to_primary"
+
+
+class RoutingSession(Session):
+    """
+    Sends plain SELECTs to a read replica and everything else (flushes, DML, SELECT ... FOR UPDATE) to the primary.
+    After the first write the session sticks to the primary, so the rest of the request reads its own writes.
+    Without replicas every statement goes to the primary.
+    """
+
+    def __init__(self, primary: Engine, replicas: Sequence[Engine] = (), **kwargs):
+        super().__init__(**kwargs)
+        self.primary = primary
+        # one replica per session, so the reads of a request see a single, monotonic snapshot
+        self.replica = random.choice(replicas) if replicas else None
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs) -> Engine:
+        if self.replica is None or self.info.get(STICK_TO_PRIMARY):
+            return self.primary
+
+        if self._flushing or not isinstance(clause, Select) or clause._for_update_arg is not None:
+            self.info[STICK_TO_PRIMARY] = True
+            return self.primary
+
+        return self.replica
+
+
+def stick_to_primary(db: Session | AsyncSession) -> None:
+    """Route the rest of the session to the primary, e.g. before loading the rows a write is about to change"""
+    db.info[STICK_TO_PRIMARY] = True
@@ -1,4 +1,9 @@
+import asyncio
+import multiprocessing
 import re
+from collections.abc import Callable
+from concurrent.futures import (Executor, ProcessPoolExecutor,
+                                ThreadPoolExecutor)
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
@@ -21,6 +26,66 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+class PasswordHasher:
+    """
+    Runs the CPU bound bcrypt calls in a worker pool, so a login doesn't block the event loop.
+    The thread pool scales across cores as bcrypt releases the GIL, the process pool sidesteps the GIL entirely.
+    At most `max_pending` calls are submitted at once, the rest wait for a free slot instead of piling up in the pool.
+    """
+
+    def __init__(self, executor: str = "thread", workers: int | None = None, max_pending: int = 64):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash executor: {executor}")
+        self.executor_type = executor
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_executor(self) -> Executor:
+        # created lazily, on the first call, so importing the module doesn't start the workers
+        if self._executor is None:
+            if self.executor_type == "process":
+                # spawned, forking a process that runs an event loop and threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hasher")
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # an asyncio semaphore belongs to a single event loop
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+            self._loop = loop
+        return self._semaphore
+
+    async def _run(self, func: Callable, *args):
+        async with self._get_semaphore():
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor=settings.password_hash_executor,
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
+
+
 def create_access_token(user_id: str, secret_key: str = settings.token_secret_key) -> str:
     """Creates an access token based on user_id"""
     expire = datetime.now(UTC) + timedelta(minutes=float(settings.token_expire_minutes))
@@ -0,0 +1,65 @@
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import suppress
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+_END = object()
+
+
+async def stream_body(
+    read: Callable[[int], Awaitable[bytes]],
+    close: Callable[[], Awaitable[None]],
+    chunk_size: int,
+    read_ahead: int,
+) -> AsyncIterator[bytes]:
+    """
+    Streams a body in reads of chunk_size bytes. A producer task reads at most read_ahead chunks ahead
+    of the consumer, so a slow client holds a bounded buffer while the next chunks are already on their way.
+    The body is closed when the stream ends, fails or is abandoned, e.g. when the client disconnects.
+    """
+    buffer: asyncio.Queue = asyncio.Queue(maxsize=max(read_ahead, 1))
+    pending_read: asyncio.Future | None = None
+
+    async def produce():
+        nonlocal pending_read
+        try:
+            while True:
+                # shielded, cancelling the producer doesn't stop a read running in a worker thread anyway
+                pending_read = asyncio.ensure_future(read(chunk_size))
+                if not (chunk := await asyncio.shield(pending_read)):
+                    break
+                await buffer.put(chunk)
+            await buffer.put(_END)
+        except Exception as e:
+            await buffer.put(e)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (item := await buffer.get()) is not _END:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
+        with suppress(asyncio.CancelledError):
+            await producer
+        # the body is not closed under a read still in flight, the read ends within a chunk
+        if pending_read is not None:
+            with suppress(Exception):
+                await pending_read
+        # the rest of the body is never read, closing drops its connection instead of draining it
+        await close()
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """A StreamingResponse that closes its body iterator, even when the client disconnected mid-stream"""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            aclose = getattr(self.body_iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
@@ -1,6 +1,8 @@
+from .blob_model import BlobORM
 from .document_model import DocumentORM
 from .project_model import ProjectORM
+from .purge_job_model import PurgeJobORM
 from .user_model import UserORM
 from .user_project_role_model import UserProjectRoleORM
 
-__all__ = ["UserORM", "ProjectORM", "UserProjectRoleORM", "DocumentORM"]
+__all__ = ["UserORM", "ProjectORM", "UserProjectRoleORM", "DocumentORM", "BlobORM", "PurgeJobORM"]
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.infrastructure.core.database import Base
+
+
+class BlobORM(Base):
+    """A content addressed file and the number of documents referencing it"""
+
+    __tablename__ = "blobs"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    storage_path: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+
+    storage_backend: Mapped[str] = mapped_column(String(10), nullable=False)
+
+    size: Mapped[int] = mapped_column(BigInteger, nullable=True)
+
+    refcount: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<BlobORM(sha256={self.sha256}, refcount={self.refcount})>"
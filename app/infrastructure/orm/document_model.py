@@ -1,14 +1,15 @@
 from datetime import UTC, datetime
 from uuid import uuid4
 
-from sqlalchemy import DateTime, ForeignKey, String, func
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, String, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.infrastructure.core.database import Base
+from app.infrastructure.orm.soft_delete import SoftDeleteMixin
 
 
-class DocumentORM(Base):
+class DocumentORM(SoftDeleteMixin, Base):
     __tablename__ = "documents"
 
     id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
@@ -29,8 +30,15 @@ class DocumentORM(Base):
 
     storage_backend: Mapped[str] = mapped_column(String(10), nullable=False, default="local")
 
+    # computed while the upload is streamed to the storage, unknown for the documents uploaded before
+    size: Mapped[int] = mapped_column(BigInteger, nullable=True)
+
+    sha256: Mapped[str] = mapped_column(String(64), nullable=True)
+
+    detected_content_type: Mapped[str] = mapped_column(String(100), nullable=True)
+
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), default=datetime.now(UTC), nullable=False
+        DateTime(timezone=True), server_default=func.now(), default=lambda: datetime.now(UTC), nullable=False
     )
 
     updated_at: Mapped[datetime] = mapped_column(
@@ -39,5 +47,15 @@ class DocumentORM(Base):
 
     project = relationship("ProjectORM", back_populates="documents")
 
+    __table_args__ = (
+        # keyset pagination order of a project's documents, also serves every other lookup by project_id
+        Index("ix_documents_project_id_created_at_id", "project_id", "created_at", "id"),
+        # get_by_filename
+        Index("ix_documents_project_id_file_name", "project_id", "file_name"),
+    )
+
+    # fetch the server generated updated_at within the INSERT/UPDATE itself (RETURNING), not with a refresh
+    __mapper_args__ = {"eager_defaults": True}
+
     def __repr__(self):
         return f"<DocumentORM(id={self.id}, file_name={self.file_name}, content_type={self.content_type})>"
@@ -2,11 +2,12 @@ import uuid
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, String, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.infrastructure.core.database import Base
+from app.infrastructure.orm.soft_delete import SoftDeleteMixin
 
 if TYPE_CHECKING:
     from app.infrastructure.orm.user_model import UserORM
@@ -14,7 +15,7 @@ if TYPE_CHECKING:
         UserProjectRoleORM
 
 
-class ProjectORM(Base):
+class ProjectORM(SoftDeleteMixin, Base):
     """ORM model for Project entity."""
 
     __tablename__ = "projects"
@@ -29,19 +30,25 @@ class ProjectORM(Base):
     )
 
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), default=datetime.now(UTC), nullable=False
+        DateTime(timezone=True), server_default=func.now(), default=lambda: datetime.now(UTC), nullable=False
     )
 
     # owner relationship
     owner: Mapped["UserORM"] = relationship("UserORM", back_populates="projects")  # noqa: F405
 
     # one-to-many relationship with documents
-    documents = relationship("DocumentORM", back_populates="project", cascade="all, delete-orphan")
+    # passive deletes: the database's ON DELETE CASCADE removes the children, they are never loaded to be deleted
+    documents = relationship(
+        "DocumentORM", back_populates="project", cascade="all, delete-orphan", passive_deletes=True
+    )
 
     # association with roles
     participants: Mapped[list["UserProjectRoleORM"]] = relationship(
-        "UserProjectRoleORM", back_populates="project", cascade="all, delete-orphan"
+        "UserProjectRoleORM", back_populates="project", cascade="all, delete-orphan", passive_deletes=True
     )
 
+    # keyset pagination order of the project listing
+    __table_args__ = (Index("ix_projects_created_at_id", "created_at", "id"),)
+
     def __repr__(self):
         return f"<ProjectORM(id={self.id}, name={self.name}, description={self.description})>"
@@ -0,0 +1,38 @@
+from datetime import UTC, datetime
+from uuid import uuid4
+
+from sqlalchemy import JSON, DateTime, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.infrastructure.core.database import Base
+
+
+class PurgeJobORM(Base):
+    """A queued purge of a soft deleted project or document, claimed by the workers with FOR UPDATE SKIP LOCKED"""
+
+    __tablename__ = "purge_jobs"
+
+    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+
+    # "project" or "document"
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+
+    target_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+
+    # NULL until the rows are deleted, then the files that are still to be removed
+    storage_paths: Mapped[list[str] | None] = mapped_column(JSON, nullable=True)
+
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    # when the job can be claimed (again), past a lease or a backoff. NULL once it has run out of attempts
+    available_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), index=True, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False
+    )
+
+    def __repr__(self):
+        return f"<PurgeJobORM(id={self.id}, kind={self.kind}, target_id={self.target_id}, attempts={self.attempts})>"
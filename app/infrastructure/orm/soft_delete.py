@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, event
+from sqlalchemy.orm import (Mapped, ORMExecuteState, Session, mapped_column,
+                            with_loader_criteria)
+
+# execution option that lets a SELECT see the soft deleted rows, e.g. the purge worker's
+INCLUDE_DELETED = "include_deleted"
+
+
+class SoftDeleteMixin:
+    """A row that is soft deleted: hidden at once, removed later by the purge worker"""
+
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, default=None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _hide_soft_deleted(execute_state: ORMExecuteState) -> None:
+    """
+    Leaves the soft deleted rows out of every ORM SELECT, joins, subqueries and relationship loads included,
+    so no query has to remember the deleted_at filter. The UPDATE and DELETE statements are not filtered.
+    """
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get(INCLUDE_DELETED, False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(SoftDeleteMixin, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+        )
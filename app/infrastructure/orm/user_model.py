@@ -28,7 +28,7 @@ class UserORM(Base):
     password_hash: Mapped[str] = mapped_column(String, nullable=False)
 
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), default=datetime.now(UTC), nullable=False
+        DateTime(timezone=True), server_default=func.now(), default=lambda: datetime.now(UTC), nullable=False
     )
 
     projects: Mapped[list["ProjectORM"]] = relationship(  # noqa: F405
@@ -2,8 +2,8 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import (UUID, DateTime, ForeignKey, String, UniqueConstraint,
-                        func)
+from sqlalchemy import (UUID, DateTime, ForeignKey, Index, String,
+                        UniqueConstraint, func)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.infrastructure.core.database import Base
@@ -36,7 +36,12 @@ class UserProjectRoleORM(Base):
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
-    __table_args__ = (UniqueConstraint("user_id", "project_id", name="unique_user_project"),)
+    __table_args__ = (
+        # also serves the "projects of a user" lookups
+        UniqueConstraint("user_id", "project_id", name="unique_user_project"),
+        # the participants of a project and the role checks, role included so they are answered from the index
+        Index("ix_user_project_roles_project_id_user_id_role", "project_id", "user_id", "role"),
+    )
 
     user = relationship("UserORM", back_populates="project_roles")
     project = relationship("ProjectORM", back_populates="participants")
@@ -0,0 +1,110 @@
+from sqlalchemy import (Delete, Insert, Select, Update, case, delete, select,
+                        update)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.domain.enities.blob import Blob
+from app.domain.repositories.blob_repository import BlobRepository
+from app.infrastructure.core.exceptions import DatabaseError
+from app.infrastructure.orm import BlobORM
+
+
+class SQLAlchemyBlobRepository(BlobRepository):
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def _acquire_statement(dialect_name: str, blob: Blob) -> Insert:
+        """
+        An upsert that increments the refcount of a known blob. A blob without references (its file may be
+        already deleted) is taken over as a new one, with a refcount of 1 and this storage's path.
+        On postgres the row stays locked till the commit, so a concurrent upload of the same content waits
+        until this one has written the file.
+        """
+        insert = postgresql_insert if dialect_name == "postgresql" else sqlite_insert
+        statement = insert(BlobORM).values(
+            sha256=blob.sha256,
+            storage_path=blob.storage_path,
+            storage_backend=blob.storage_backend,
+            size=blob.size,
+            refcount=1,
+        )
+        referenced = BlobORM.refcount > 0
+        return statement.on_conflict_do_update(
+            index_elements=["sha256"],
+            set_={
+                "refcount": case((referenced, BlobORM.refcount + 1), else_=1),
+                "storage_path": case((referenced, BlobORM.storage_path), else_=statement.excluded.storage_path),
+                "storage_backend": case((referenced, BlobORM.storage_backend), else_=statement.excluded.storage_backend),
+                "size": case((referenced, BlobORM.size), else_=statement.excluded.size),
+            },
+        ).returning(BlobORM.sha256, BlobORM.storage_path, BlobORM.storage_backend, BlobORM.size, BlobORM.refcount)
+
+    @staticmethod
+    def _release_statement(storage_paths: list[str]) -> Update:
+        # a path listed twice (two documents of a batch sharing the content) drops two references
+        counts: dict[str, int] = {}
+        for path in storage_paths:
+            counts[path] = counts.get(path, 0) + 1
+        return (
+            update(BlobORM)
+            .where(BlobORM.storage_path.in_(counts))
+            .values(refcount=BlobORM.refcount - case(counts, value=BlobORM.storage_path))
+            .returning(BlobORM.storage_path, BlobORM.refcount)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _lock_statement(storage_paths: list[str]) -> Select:
+        return (
+            select(BlobORM.storage_path, BlobORM.refcount)
+            .where(BlobORM.storage_path.in_(storage_paths))
+            .with_for_update()
+        )
+
+    @staticmethod
+    def _delete_unreferenced_statement(storage_paths: list[str]) -> Delete:
+        return (
+            delete(BlobORM)
+            .where(BlobORM.storage_path.in_(storage_paths), BlobORM.refcount <= 0)
+            .execution_options(synchronize_session=False)
+        )
+
+    def acquire(self, blob: Blob) -> Blob:
+        statement = self._acquire_statement(self.db.get_bind().dialect.name, blob)
+        try:
+            return Blob(**self.db.execute(statement).one()._asdict())
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    def release(self, storage_paths: list[str]) -> dict[str, int]:
+        if not storage_paths:
+            return {}
+        try:
+            rows = self.db.execute(self._release_statement(storage_paths))
+            return {row.storage_path: row.refcount for row in rows}
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    def lock(self, storage_paths: list[str]) -> dict[str, int]:
+        if not storage_paths:
+            return {}
+        try:
+            rows = self.db.execute(self._lock_statement(storage_paths))
+            return {row.storage_path: row.refcount for row in rows}
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    def delete_unreferenced(self, storage_paths: list[str]) -> None:
+        if not storage_paths:
+            return
+        try:
+            self.db.execute(self._delete_unreferenced_statement(storage_paths))
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError(str(e)) from e
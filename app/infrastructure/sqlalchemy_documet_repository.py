@@ -1,12 +1,15 @@
 from datetime import UTC, datetime
 from uuid import UUID
 
+from sqlalchemy import (Delete, Select, String, Update, Uuid, and_, column,
+                        delete, func, select, tuple_, update, values)
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.domain.enities.document import Document
 from app.domain.repositories.document_repository import DocumentRepository
 from app.infrastructure.core.exceptions import DatabaseError
+from app.infrastructure.core.routing_session import stick_to_primary
 from app.infrastructure.orm import DocumentORM, ProjectORM, UserProjectRoleORM
 
 
@@ -31,6 +34,9 @@ class SQLAlchemyDocumentRepository(DocumentRepository):
                     created_at=doc.created_at,
                     updated_at=doc.updated_at,
                     storage_backend=doc.storage_backend,
+                    size=doc.size,
+                    sha256=doc.sha256,
+                    detected_content_type=doc.detected_content_type,
                 )
                 for doc in orm
             ]
@@ -46,21 +52,115 @@ class SQLAlchemyDocumentRepository(DocumentRepository):
                 created_at=orm.created_at,
                 updated_at=orm.updated_at,
                 storage_backend=orm.storage_backend,
+                size=orm.size,
+                sha256=orm.sha256,
+                detected_content_type=orm.detected_content_type,
             )
 
-    def list_by_project(self, user_id: UUID, project_id: UUID) -> list[Document]:
-        """List all Documents for a given project ID"""
-        try:
-            # show only if the current user is a participant of the project
-            orm_documents = (
-                self.db.query(DocumentORM)
-                .join(DocumentORM.project)
-                .filter(
-                    DocumentORM.project_id == project_id,
-                    ProjectORM.participants.any(UserProjectRoleORM.user_id == user_id),
-                )
-                .all()
+    @staticmethod
+    def _list_by_project_statement(
+        user_id: UUID, project_id: UUID, limit: int | None = None, after: tuple[datetime, UUID] | None = None
+    ) -> Select:
+        """A page of the project's documents, ordered by (created_at, id)"""
+        # show only if the current user is a participant of the project
+        statement = (
+            select(DocumentORM)
+            .join(DocumentORM.project)
+            .filter(
+                DocumentORM.project_id == project_id,
+                ProjectORM.participants.any(UserProjectRoleORM.user_id == user_id),
+            )
+            .order_by(DocumentORM.created_at, DocumentORM.id)
+            .limit(limit)
+        )
+        if after is not None:
+            # keyset pagination: seek past the last row of the previous page instead of OFFSET
+            statement = statement.where(tuple_(DocumentORM.created_at, DocumentORM.id) > tuple_(*after))
+        return statement
+
+    @staticmethod
+    def _get_with_role_statement(user_id: UUID, document_id: UUID) -> Select:
+        """The document and the user's role on its project, the role is NULL for non participants"""
+        return (
+            select(DocumentORM, UserProjectRoleORM.role)
+            # the project is joined so a document of a soft deleted project is hidden too
+            .join(DocumentORM.project)
+            .outerjoin(
+                UserProjectRoleORM,
+                and_(UserProjectRoleORM.project_id == DocumentORM.project_id, UserProjectRoleORM.user_id == user_id),
+            )
+            .filter(DocumentORM.id == document_id)
+        )
+
+    @staticmethod
+    def _update_many_statement(project_id: UUID, updates: list[dict]) -> Update:
+        """
+        A single UPDATE ... FROM (VALUES ...) for the whole batch.
+        A None name or description keeps the current value.
+        """
+        batch = (
+            values(column("id", Uuid), column("name", String), column("description", String), name="batch")
+            .data([(item["id"], item.get("name"), item.get("description")) for item in updates])
+            .cte("batch")
+        )
+        return (
+            update(DocumentORM)
+            .where(
+                DocumentORM.id == batch.c.id, DocumentORM.project_id == project_id, DocumentORM.deleted_at.is_(None)
+            )
+            .values(
+                name=func.coalesce(batch.c.name, DocumentORM.name),
+                description=func.coalesce(batch.c.description, DocumentORM.description),
+            )
+            .returning(DocumentORM.id)
+            # the batch rows are not loaded in the session, nothing to synchronize
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _delete_many_statement(project_id: UUID, document_ids: list[UUID]) -> Delete:
+        """A single DELETE for the whole batch, returning what the storage cleanup needs"""
+        return (
+            delete(DocumentORM)
+            .where(
+                DocumentORM.id.in_(document_ids), DocumentORM.project_id == project_id, DocumentORM.deleted_at.is_(None)
             )
+            .returning(DocumentORM.id, DocumentORM.storage_path)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _soft_delete_statement(document_id: UUID, now: datetime) -> Update:
+        """Hides the document at once, the row and the file are removed later by the purge worker"""
+        return (
+            update(DocumentORM)
+            .where(DocumentORM.id == document_id, DocumentORM.deleted_at.is_(None))
+            .values(deleted_at=now)
+            .returning(DocumentORM.id)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _purge_statement(document_id: UUID) -> Delete:
+        """Deletes a soft deleted document, returning the path of its file"""
+        return (
+            delete(DocumentORM)
+            .where(DocumentORM.id == document_id, DocumentORM.deleted_at.is_not(None))
+            .returning(DocumentORM.storage_path)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _referenced_paths_statement(storage_paths: list[str]) -> Select:
+        return select(DocumentORM.storage_path).where(DocumentORM.storage_path.in_(storage_paths)).distinct()
+
+    def list_by_project(
+        self, user_id: UUID, project_id: UUID, limit: int | None = None, after: tuple[datetime, UUID] | None = None
+    ) -> list[Document]:
+        """List the Documents for a given project ID"""
+        try:
+            statement = self._list_by_project_statement(user_id=user_id, project_id=project_id, limit=limit, after=after)
+            orm_documents = list(self.db.scalars(statement).all())
 
             return self.to_domain_entity(orm_documents)
         except SQLAlchemyError as e:
@@ -72,8 +172,7 @@ class SQLAlchemyDocumentRepository(DocumentRepository):
 
         try:
             self.db.add(orm)
-            self.db.commit()
-            self.db.refresh(orm)
+            self.db.flush()
             return self.to_domain_entity(orm)
         except SQLAlchemyError as e:
             self.db.rollback()
@@ -96,6 +195,8 @@ class SQLAlchemyDocumentRepository(DocumentRepository):
     def save(self, document: Document):
         """Save changes to an existing document"""
         try:
+            # the row is about to change, load it from the primary
+            stick_to_primary(self.db)
             orm = self.db.query(DocumentORM).filter(DocumentORM.id == document.id).first()
             if not orm:
                 raise DatabaseError(f"Document with ID {document.id} not found")
@@ -110,8 +211,7 @@ class SQLAlchemyDocumentRepository(DocumentRepository):
             # set update time
             orm.updated_at = datetime.now(UTC)
 
-            self.db.commit()
-            self.db.refresh(orm)
+            self.db.flush()
             return self.to_domain_entity(orm)
         except SQLAlchemyError as e:
             self.db.rollback()
@@ -122,7 +222,7 @@ class SQLAlchemyDocumentRepository(DocumentRepository):
     ) -> None | list[Document] | Document | type[DocumentORM]:
         """Get a document by its ID"""
         try:
-            orm = self.db.query(DocumentORM).filter(DocumentORM.id == document_id).first()
+            orm = self.db.get(entity=DocumentORM, ident=document_id)
 
             if orm is None:
                 # I do not throw NotFound exception here but in service instead
@@ -133,15 +233,71 @@ class SQLAlchemyDocumentRepository(DocumentRepository):
         except SQLAlchemyError as e:
             raise DatabaseError(str(e)) from e
 
+    def get_with_role(self, user_id: UUID, document_id: UUID) -> tuple[Document, str | None] | None:
+        """Get a document and the user's role on its project"""
+        try:
+            row = self.db.execute(self._get_with_role_statement(user_id=user_id, document_id=document_id)).first()
+            if row is None:
+                return None
+            return self.to_domain_entity(row.DocumentORM), row.role
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
+
+    def update_many(self, project_id: UUID, updates: list[dict]) -> list[UUID]:
+        """Update the name/description of many documents of a project at once"""
+        try:
+            return list(self.db.scalars(self._update_many_statement(project_id=project_id, updates=updates)).all())
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    def delete_many(self, project_id: UUID, document_ids: list[UUID]) -> list[tuple[UUID, str]]:
+        """Delete many documents of a project at once"""
+        try:
+            rows = self.db.execute(self._delete_many_statement(project_id=project_id, document_ids=document_ids))
+            return [(row.id, row.storage_path) for row in rows]
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    def soft_delete(self, document_id: UUID) -> bool:
+        """Mark a document as deleted, False if it was not found"""
+        try:
+            stick_to_primary(self.db)
+            deleted = self.db.scalar(self._soft_delete_statement(document_id=document_id, now=datetime.now(UTC)))
+            return deleted is not None
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    def purge(self, document_id: UUID) -> str | None:
+        """Delete a soft deleted document, returns the path of its file, None if it's gone already"""
+        try:
+            return self.db.scalar(self._purge_statement(document_id=document_id))
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    def referenced_paths(self, storage_paths: list[str]) -> set[str]:
+        """The listed paths that a live document still points to"""
+        if not storage_paths:
+            return set()
+        try:
+            return set(self.db.scalars(self._referenced_paths_statement(storage_paths=storage_paths)).all())
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
+
     def delete(self, document_id: UUID):
         """Delete a document by its ID"""
         try:
+            # the row is about to change, load it from the primary
+            stick_to_primary(self.db)
             orm = self.db.get(entity=DocumentORM, ident=document_id)
             if orm is None:
                 raise DatabaseError(f"Document with ID {document_id} not found")
 
             self.db.delete(orm)
-            self.db.commit()
+            self.db.flush()
             return True
 
         except SQLAlchemyError as e:
@@ -1,23 +1,165 @@
 import uuid
+from datetime import UTC, datetime
 from typing import cast
 from uuid import UUID
 
+from sqlalchemy import (Delete, Row, Select, Update, and_, delete, func,
+                        select, tuple_, update)
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.domain.enities import Project
 from app.domain.enities.document import Document
 from app.domain.enities.project import Project as DomainProject
+from app.domain.enities.project import ProjectSummary
 from app.domain.enities.user_project_role import UserProjectRole
 from app.domain.repositories.project_repository import ProjectRepository
 from app.infrastructure.core.exceptions import DatabaseError
-from app.infrastructure.orm import ProjectORM, UserProjectRoleORM
+from app.infrastructure.core.routing_session import stick_to_primary
+from app.infrastructure.orm import DocumentORM, ProjectORM, UserProjectRoleORM
 
 
 class SQLAlchemyProjectRepository(ProjectRepository):
+    # Loader plans, picked per call site, so mapping to the domain never falls back to lazy loading (N+1).
+    # list: many parent rows - one SELECT IN per collection keeps it at 3 queries for any number of projects
+    LIST_LOADER_OPTIONS = (
+        selectinload(ProjectORM.documents),
+        selectinload(ProjectORM.participants).joinedload(UserProjectRoleORM.user),
+    )
+    # detail: a single parent row - participants (and their usernames) are joined in, documents take one SELECT IN
+    DETAIL_LOADER_OPTIONS = (
+        joinedload(ProjectORM.participants).joinedload(UserProjectRoleORM.user),
+        selectinload(ProjectORM.documents),
+    )
+
     def __init__(self, db: Session):
         self.db = db
 
+    @classmethod
+    def _list_by_user_statement(cls, user_id: UUID) -> Select:
+        """All projects the user participates in, with the whole aggregate loaded"""
+        # filter by the participants to include all participants, not only the project owner.
+        # A join rather than EXISTS, so the planner starts from the user's roles (unique per project)
+        # instead of scanning all projects.
+        return (
+            select(ProjectORM)
+            .join(
+                UserProjectRoleORM,
+                and_(UserProjectRoleORM.project_id == ProjectORM.id, UserProjectRoleORM.user_id == user_id),
+            )
+            .options(*cls.LIST_LOADER_OPTIONS)
+        )
+
+    @staticmethod
+    def _list_summaries_by_user_statement(
+        user_id: UUID,
+        with_counts: bool = False,
+        limit: int | None = None,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> Select:
+        """Only the project columns a listing needs, the children are never loaded"""
+        columns = [ProjectORM.id, ProjectORM.name, ProjectORM.description, ProjectORM.owner_id, ProjectORM.created_at]
+        if with_counts:
+            # counted by the database in correlated subqueries, one row per project either way
+            document_count = (
+                select(func.count(DocumentORM.id))
+                .where(DocumentORM.project_id == ProjectORM.id)
+                .correlate(ProjectORM)
+                .scalar_subquery()
+            )
+            participant_count = (
+                select(func.count(UserProjectRoleORM.id))
+                .where(UserProjectRoleORM.project_id == ProjectORM.id)
+                .correlate(ProjectORM)
+                .scalar_subquery()
+            )
+            columns += [document_count.label("document_count"), participant_count.label("participant_count")]
+
+        # (user_id, project_id) is unique, so joining the user's own role can't duplicate a project
+        statement = (
+            select(*columns)
+            .join(
+                UserProjectRoleORM,
+                and_(UserProjectRoleORM.project_id == ProjectORM.id, UserProjectRoleORM.user_id == user_id),
+            )
+            .order_by(ProjectORM.created_at, ProjectORM.id)
+            .limit(limit)
+        )
+        if after is not None:
+            # keyset pagination: seek past the last row of the previous page instead of OFFSET
+            statement = statement.where(tuple_(ProjectORM.created_at, ProjectORM.id) > tuple_(*after))
+        return statement
+
+    @staticmethod
+    def _to_summary(row: Row) -> ProjectSummary:
+        """Map a summary row to the domain projection"""
+        return ProjectSummary(
+            id=row.id,
+            name=row.name,
+            description=row.description,
+            owner=row.owner_id,
+            created_at=row.created_at,
+            document_count=getattr(row, "document_count", None),
+            participant_count=getattr(row, "participant_count", None),
+        )
+
+    @classmethod
+    def _get_by_id_statement(cls, project_id: UUID) -> Select:
+        """A single project with the whole aggregate loaded"""
+        return select(ProjectORM).options(*cls.DETAIL_LOADER_OPTIONS).filter(ProjectORM.id == project_id)
+
+    @staticmethod
+    def _get_details_statement(project_id: UUID) -> Select:
+        """The project columns only, the children are never loaded"""
+        return select(
+            ProjectORM.id, ProjectORM.name, ProjectORM.description, ProjectORM.owner_id, ProjectORM.created_at
+        ).filter(ProjectORM.id == project_id)
+
+    @staticmethod
+    def _list_document_paths_statement(project_id: UUID) -> Select:
+        return select(DocumentORM.storage_path).filter(DocumentORM.project_id == project_id)
+
+    @staticmethod
+    def _delete_documents_statement(project_id: UUID) -> Delete:
+        """Deletes the project's documents in one statement, returning their storage paths for the file cleanup"""
+        return delete(DocumentORM).where(DocumentORM.project_id == project_id).returning(DocumentORM.storage_path)
+
+    @staticmethod
+    def _delete_statement(project_id: UUID) -> Delete:
+        """Deletes the project row, ON DELETE CASCADE takes its roles along in the database"""
+        return delete(ProjectORM).where(ProjectORM.id == project_id).returning(ProjectORM.id)
+
+    @staticmethod
+    def _soft_delete_statement(project_id: UUID, now: datetime) -> Update:
+        """
+        Hides the project, and through it its documents and roles, by stamping a single row.
+        The rows and the files are removed later by the purge worker.
+        """
+        return (
+            update(ProjectORM)
+            .where(ProjectORM.id == project_id, ProjectORM.deleted_at.is_(None))
+            .values(deleted_at=now)
+            .returning(ProjectORM.id)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _save_statement(project: Project) -> Update:
+        """An UPDATE of the project's own columns, nothing has to be loaded first"""
+        return (
+            update(ProjectORM)
+            .where(ProjectORM.id == project.id)
+            .values(name=project.name, description=project.description, owner_id=project.owner)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _details_to_domain_entity(row: Row) -> DomainProject:
+        """Map a row of the details statement to a domain model without documents and participants"""
+        return DomainProject(
+            id=row.id, name=row.name, description=row.description, owner=row.owner_id, created_at=row.created_at
+        )
+
     @staticmethod
     def _to_domain_entity(orm: ProjectORM) -> DomainProject:
         """Map ORM model to domain model"""
@@ -59,26 +201,10 @@ class SQLAlchemyProjectRepository(ProjectRepository):
             participants=participants,
         )
 
-    @staticmethod
-    def _to_orm(entity: Project) -> ProjectORM:
-        """Map from domain model to ORM model"""
-        return ProjectORM(
-            id=entity.id,
-            name=entity.name,
-            description=entity.description,
-            owner_id=entity.owner,
-            created_at=entity.created_at,
-        )
-
     def list_by_user(self, user_id: UUID) -> list[DomainProject]:
         """List all projects for a given user ID"""
         try:
-            # filter by the participants to include all participants, not only the project owner
-            orm_projects = (
-                self.db.query(ProjectORM)
-                .filter(ProjectORM.participants.any(UserProjectRoleORM.user_id == user_id))
-                .all()
-            )
+            orm_projects = self.db.scalars(self._list_by_user_statement(user_id=user_id)).all()
 
             # converts an orm object with the list of attached documents into domain objects
             return [self._to_domain_entity(orm) for orm in orm_projects]
@@ -86,16 +212,27 @@ class SQLAlchemyProjectRepository(ProjectRepository):
         except SQLAlchemyError as e:
             raise DatabaseError(str(e)) from e
 
+    def list_summaries_by_user(
+        self,
+        user_id: UUID,
+        with_counts: bool = False,
+        limit: int | None = None,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> list[ProjectSummary]:
+        """List the project summaries for a given user ID"""
+        try:
+            rows = self.db.execute(
+                self._list_summaries_by_user_statement(user_id=user_id, with_counts=with_counts, limit=limit, after=after)
+            )
+            return [self._to_summary(row) for row in rows]
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
+
     def get_by_id(self, project_id: UUID) -> DomainProject | None:
         """Get a project by its ID"""
         try:
-            orm = self.db.get(entity=ProjectORM, ident=project_id)
-            # orm = (self.db.query(ProjectORM)
-            #        .filter(ProjectORM.id == project_id,
-            #                ProjectORM.participants.any(UserProjectRoleORM.user_id == user_id))
-            #        .first()
-            # )
-            # project = self.db.query(ProjectORM).filter(ProjectORM.id == project_id).first()
+            # joined collections repeat the parent row, so the result has to be uniqued
+            orm = self.db.execute(self._get_by_id_statement(project_id=project_id)).unique().scalar_one_or_none()
 
             if orm is None:
                 # I do not throw NotFound exception here but in service instead
@@ -104,13 +241,35 @@ class SQLAlchemyProjectRepository(ProjectRepository):
         except SQLAlchemyError as e:
             raise DatabaseError(str(e)) from e
 
+    def get_details(self, project_id: UUID) -> DomainProject | None:
+        """Get a project by its ID without its documents and participants"""
+        try:
+            row = self.db.execute(self._get_details_statement(project_id=project_id)).one_or_none()
+            return self._details_to_domain_entity(row) if row else None
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
+
+    def list_document_paths(self, project_id: UUID) -> list[str]:
+        """The storage paths of the project's documents"""
+        try:
+            return list(self.db.scalars(self._list_document_paths_statement(project_id=project_id)).all())
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
+
     def add(self, project: DomainProject) -> DomainProject:
         """Add a new project to the database"""
-        orm = ProjectORM(id=project.id, name=project.name, description=project.description, owner_id=project.owner)
+        # a new project has no children yet, empty collections spare the lazy loads when mapping it back
+        orm = ProjectORM(
+            id=project.id,
+            name=project.name,
+            description=project.description,
+            owner_id=project.owner,
+            documents=[],
+            participants=[],
+        )
         try:
             self.db.add(orm)
-            self.db.commit()
-            self.db.refresh(orm)
+            self.db.flush()
             return self._to_domain_entity(orm)
         except SQLAlchemyError as e:
             self.db.rollback()
@@ -119,24 +278,33 @@ class SQLAlchemyProjectRepository(ProjectRepository):
     def save(self, project: Project) -> Project:
         """Persist changes to an existing project"""
         try:
-            orm = self._to_orm(entity=project)
-            self.db.merge(orm)
-            self.db.commit()
+            self.db.execute(self._save_statement(project=project))
             return project
         except SQLAlchemyError as e:
             self.db.rollback()
             raise DatabaseError(str(e)) from e
 
-    def delete(self, project_id: UUID) -> bool:
-        """Delete a project by ID. Returns True if deleted, False if not found."""
+    def soft_delete(self, project_id: UUID) -> bool:
+        """Mark a project as deleted, False if it was not found"""
         try:
-            orm = self.db.get(entity=ProjectORM, ident=project_id)
-            if orm is None:
-                return False
+            stick_to_primary(self.db)
+            deleted = self.db.scalar(self._soft_delete_statement(project_id=project_id, now=datetime.now(UTC)))
+            return deleted is not None
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError(str(e)) from e
 
-            self.db.delete(orm)
-            self.db.commit()
-            return True
+    def delete(self, project_id: UUID) -> list[str] | None:
+        """
+        Delete a project by ID in two statements, whatever its size, nothing is loaded into the session.
+        Returns the storage paths of its documents, None if not found.
+        """
+        try:
+            stick_to_primary(self.db)
+            # the documents are deleted explicitly, a cascaded delete couldn't return their paths
+            storage_paths = list(self.db.scalars(self._delete_documents_statement(project_id=project_id)).all())
+            deleted = self.db.scalar(self._delete_statement(project_id=project_id))
+            return storage_paths if deleted is not None else None
 
         except SQLAlchemyError as e:
             self.db.rollback()
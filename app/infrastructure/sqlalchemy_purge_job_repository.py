@@ -0,0 +1,130 @@
+from datetime import UTC, datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import (Delete, Row, Select, Update, delete, func, select,
+                        update)
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.domain.enities.purge_job import PurgeJob, PurgeQueueStats
+from app.domain.repositories.purge_job_repository import PurgeJobRepository
+from app.infrastructure.core.exceptions import DatabaseError
+from app.infrastructure.core.routing_session import stick_to_primary
+from app.infrastructure.orm import PurgeJobORM
+
+
+class SQLAlchemyPurgeJobRepository(PurgeJobRepository):
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def _claim_statement(batch_size: int, lease_seconds: int, now: datetime) -> Update:
+        """
+        Leases the oldest ready jobs in one statement. The rows locked by another worker's claim are skipped
+        (FOR UPDATE SKIP LOCKED), so the workers never wait for each other nor claim the same job.
+        """
+        ready = (
+            select(PurgeJobORM.id)
+            .where(PurgeJobORM.available_at <= now)
+            .order_by(PurgeJobORM.available_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        return (
+            update(PurgeJobORM)
+            .where(PurgeJobORM.id.in_(ready))
+            .values(available_at=now + timedelta(seconds=lease_seconds), attempts=PurgeJobORM.attempts + 1)
+            .returning(
+                PurgeJobORM.id,
+                PurgeJobORM.kind,
+                PurgeJobORM.target_id,
+                PurgeJobORM.attempts,
+                PurgeJobORM.storage_paths,
+                PurgeJobORM.last_error,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _update_statement(job_id: UUID, **values) -> Update:
+        return (
+            update(PurgeJobORM)
+            .where(PurgeJobORM.id == job_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _complete_statement(job_id: UUID) -> Delete:
+        return delete(PurgeJobORM).where(PurgeJobORM.id == job_id).execution_options(synchronize_session=False)
+
+    @staticmethod
+    def _stats_statement(now: datetime) -> Select:
+        pending = PurgeJobORM.available_at.is_not(None)
+        return select(
+            func.count(PurgeJobORM.id).filter(pending).label("depth"),
+            func.count(PurgeJobORM.id).filter(PurgeJobORM.available_at <= now).label("ready"),
+            func.count(PurgeJobORM.id).filter(PurgeJobORM.available_at.is_(None)).label("failed"),
+            func.min(PurgeJobORM.created_at).filter(pending).label("oldest"),
+        )
+
+    @staticmethod
+    def _to_stats(row: Row, now: datetime) -> PurgeQueueStats:
+        oldest = row.oldest
+        if oldest is not None and oldest.tzinfo is None:
+            # SQLite doesn't keep the time zone
+            oldest = oldest.replace(tzinfo=UTC)
+        return PurgeQueueStats(
+            depth=row.depth,
+            ready=row.ready,
+            failed=row.failed,
+            lag_seconds=(now - oldest).total_seconds() if oldest is not None else 0.0,
+        )
+
+    def enqueue(self, kind: str, target_id: UUID) -> None:
+        try:
+            self.db.add(PurgeJobORM(kind=kind, target_id=target_id, available_at=datetime.now(UTC)))
+            self.db.flush()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    def claim(self, batch_size: int, lease_seconds: int) -> list[PurgeJob]:
+        try:
+            # the purge reads what it's about to delete, the replicas could be behind
+            stick_to_primary(self.db)
+            rows = self.db.execute(
+                self._claim_statement(batch_size=batch_size, lease_seconds=lease_seconds, now=datetime.now(UTC))
+            )
+            return [PurgeJob(**row._asdict()) for row in rows]
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    def set_storage_paths(self, job_id: UUID, storage_paths: list[str]) -> None:
+        try:
+            self.db.execute(self._update_statement(job_id, storage_paths=storage_paths))
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    def complete(self, job_id: UUID) -> None:
+        try:
+            self.db.execute(self._complete_statement(job_id))
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    def retry(self, job_id: UUID, error: str, available_at: datetime | None) -> None:
+        try:
+            self.db.execute(self._update_statement(job_id, last_error=error, available_at=available_at))
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    def stats(self) -> PurgeQueueStats:
+        now = datetime.now(UTC)
+        try:
+            return self._to_stats(self.db.execute(self._stats_statement(now)).one(), now)
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e)) from e
@@ -0,0 +1,24 @@
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.domain.repositories.unit_of_work import UnitOfWork
+from app.infrastructure.core.exceptions import DatabaseError
+
+
+class SQLAlchemyUnitOfWork(UnitOfWork):
+    """Unit of work over the request's Session, shared with the repositories"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def commit(self) -> None:
+        """Commit the request's transaction"""
+        try:
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError(str(e)) from e
+
+    def rollback(self) -> None:
+        """Roll back the request's transaction"""
+        self.db.rollback()
@@ -1,26 +1,99 @@
-from uuid import UUID
+from uuid import UUID, uuid4
 
+from sqlalchemy import Insert, Select, exists, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.domain.enities.user_project_role import UserProjectRole
 from app.domain.repositories.user_project_role_repository import \
     UserProjectRoleRepository
+from app.infrastructure.core.cache import role_cache
 from app.infrastructure.core.exceptions import DatabaseError
-from app.infrastructure.orm import UserProjectRoleORM
+from app.infrastructure.orm import ProjectORM, UserProjectRoleORM
 
 
 class SQLAlchemyUserProjectRoleRepository(UserProjectRoleRepository):
     def __init__(self, db: Session):
         self.db = db
 
+    @staticmethod
+    def _project_access_statement(project_id: UUID, user_id: UUID) -> Select:
+        """A primary key lookup and a covering index lookup, answered in a single round trip"""
+        role = (
+            select(UserProjectRoleORM.role)
+            .filter(UserProjectRoleORM.project_id == project_id, UserProjectRoleORM.user_id == user_id)
+            .scalar_subquery()
+        )
+        # a bare EXISTS has no entity for the soft delete criteria to attach to, so it filters on its own
+        project_exists = exists().where(ProjectORM.id == project_id, ProjectORM.deleted_at.is_(None))
+        return select(project_exists.label("project_exists"), role.label("role"))
+
+    @staticmethod
+    def _user_roles_statement(user_id: UUID, project_ids: list[UUID]) -> Select:
+        # the roles of a soft deleted project stay until it is purged, they grant nothing meanwhile
+        project_live = exists().where(ProjectORM.id == UserProjectRoleORM.project_id, ProjectORM.deleted_at.is_(None))
+        return select(UserProjectRoleORM.project_id, UserProjectRoleORM.role).filter(
+            UserProjectRoleORM.user_id == user_id, UserProjectRoleORM.project_id.in_(project_ids), project_live
+        )
+
+    @staticmethod
+    def _live_projects_statement(project_ids: list[UUID]) -> Select:
+        return select(ProjectORM.id).filter(ProjectORM.id.in_(project_ids), ProjectORM.deleted_at.is_(None))
+
+    @staticmethod
+    def _project_roles_statement(project_id: UUID, user_ids: list[UUID]) -> Select:
+        return select(UserProjectRoleORM.user_id, UserProjectRoleORM.role).filter(
+            UserProjectRoleORM.project_id == project_id, UserProjectRoleORM.user_id.in_(user_ids)
+        )
+
+    @staticmethod
+    def _add_many_statement(dialect_name: str, project_id: UUID, user_ids: list[UUID], role: str) -> Insert:
+        """INSERT ... ON CONFLICT DO NOTHING on the (user_id, project_id) unique constraint, returning the inserted"""
+        insert = postgresql_insert if dialect_name == "postgresql" else sqlite_insert
+        rows = [{"id": uuid4(), "project_id": project_id, "user_id": user_id, "role": role} for user_id in user_ids]
+        return (
+            insert(UserProjectRoleORM)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["user_id", "project_id"])
+            .returning(UserProjectRoleORM.user_id)
+        )
+
     def add(self, role_model: UserProjectRole) -> None:
         """Save the user role to the association table"""
         orm = UserProjectRoleORM(project_id=role_model.project_id, user_id=role_model.user_id, role=role_model.role)
         try:
             self.db.add(orm)
-            self.db.commit()
-            self.db.refresh(orm)
+            self.db.flush()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError from e
+        finally:
+            # a role write must not be shadowed by a cached one
+            role_cache.invalidate((role_model.user_id, role_model.project_id))
+
+    def add_many(self, project_id: UUID, user_ids: list[UUID], role: str) -> list[UUID]:
+        """Give the users a role on the project with one insert, returns the users whose role was inserted"""
+        if not user_ids:
+            return []
+        statement = self._add_many_statement(self.db.get_bind().dialect.name, project_id, user_ids, role)
+        try:
+            return list(self.db.scalars(statement))
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError from e
+        finally:
+            for user_id in user_ids:
+                role_cache.invalidate((user_id, project_id))
+
+    def get_project_roles(self, project_id: UUID, user_ids: list[UUID]) -> dict[UUID, str]:
+        """The roles the given users have on the project by user ID"""
+        if not user_ids:
+            return {}
+        try:
+            rows = self.db.execute(self._project_roles_statement(project_id=project_id, user_ids=user_ids))
+            return {row.user_id: row.role for row in rows}
         except SQLAlchemyError as e:
             self.db.rollback()
             raise DatabaseError from e
@@ -37,3 +110,33 @@ class SQLAlchemyUserProjectRoleRepository(UserProjectRoleRepository):
         except SQLAlchemyError as e:
             self.db.rollback()
             raise DatabaseError from e
+
+    def get_project_access(self, project_id: UUID, user_id: UUID) -> tuple[bool, str | None]:
+        """Whether the project exists and the role the user has on it"""
+        try:
+            row = self.db.execute(self._project_access_statement(project_id=project_id, user_id=user_id)).one()
+            return bool(row.project_exists), row.role
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError from e
+
+    def get_user_roles_on_projects(self, user_id: UUID, project_ids: list[UUID]) -> dict[UUID, str]:
+        """The user's roles by project ID, the projects the user doesn't participate in are left out"""
+        if not project_ids:
+            return {}
+        try:
+            rows = self.db.execute(self._user_roles_statement(user_id=user_id, project_ids=project_ids))
+            return {row.project_id: row.role for row in rows}
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError from e
+
+    def get_live_project_ids(self, project_ids: list[UUID]) -> set[UUID]:
+        """The listed projects that exist and are not soft deleted"""
+        if not project_ids:
+            return set()
+        try:
+            return set(self.db.scalars(self._live_projects_statement(project_ids=project_ids)))
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise DatabaseError from e
@@ -1,3 +1,5 @@
+from uuid import UUID
+
 from sqlalchemy.orm import Session
 
 from app.domain.enities.user import User as DomainUser
@@ -14,7 +16,7 @@ class SQLAlchemyUserRepository(UserRepository):
         """a mapping between orm and a domain model"""
         return DomainUser(id=orm.id, username=orm.username, email=orm.email, password_hash=orm.password_hash)
 
-    def get_by_id(self, user_id: str) -> DomainUser | None:
+    def get_by_id(self, user_id: UUID) -> DomainUser | None:
         orm = self.db.query(UserORM).filter(UserORM.id == user_id).first()
         if not orm:
             return None
@@ -26,6 +28,12 @@ class SQLAlchemyUserRepository(UserRepository):
             return None
         return self._to_domain_entity(orm)
 
+    def get_by_usernames(self, usernames: list[str]) -> list[DomainUser]:
+        if not usernames:
+            return []
+        orms = self.db.query(UserORM).filter(UserORM.username.in_(usernames)).all()
+        return [self._to_domain_entity(orm) for orm in orms]
+
     def get_by_email(self, email: str) -> DomainUser | None:
         orm = self.db.query(UserORM).filter(UserORM.email == email).first()
         if not orm:
@@ -36,6 +44,5 @@ class SQLAlchemyUserRepository(UserRepository):
         orm = UserORM(id=user.id, username=user.username, email=user.email, password_hash=user.password_hash)
 
         self.db.add(orm)
-        self.db.commit()
-        self.db.refresh(orm)
+        self.db.flush()
         return self._to_domain_entity(orm)
@@ -0,0 +1,74 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+
+from app.infrastructure.core.config import settings
+from app.infrastructure.core.streaming import stream_body
+from app.infrastructure.storage.s3_document_storage import (S3DocumentStorage,
+                                                            s3_client_options)
+
+
+class AsyncS3DocumentStorage(S3DocumentStorage):
+    """
+    AWS S3 storage on a native async client (aiobotocore), the requests wait on a pool of sockets
+    instead of each holding a thread of the default executor.
+    The boto3 client of the parent is kept for the local work, presigning URLs and the bucket check at start up.
+    """
+
+    def __init__(
+        self,
+        part_size: int = settings.s3_part_size,
+        part_concurrency: int = settings.s3_part_concurrency,
+        max_pool_connections: int = settings.s3_max_pool_connections,
+    ):
+        super().__init__(part_size=part_size, part_concurrency=part_concurrency)
+        self.max_pool_connections = max_pool_connections
+        self._client_context = None
+        self._async_client = None
+        self._client_lock = asyncio.Lock()
+
+    async def _get_client(self):
+        """The async client, created on first use, its connection pool lives on the running event loop"""
+        if self._async_client is None:
+            async with self._client_lock:
+                if self._async_client is None:
+                    context = get_session().create_client(
+                        "s3",
+                        region_name=self.region,
+                        endpoint_url=settings.aws_endpoint_url,
+                        config=AioConfig(**s3_client_options(self.max_pool_connections)),
+                    )
+                    self._async_client = await context.__aenter__()
+                    self._client_context = context
+        return self._async_client
+
+    async def _call(self, operation: str, **params):
+        client = await self._get_client()
+        return await getattr(client, operation)(**params)
+
+    def iter_body(self, s3_object) -> AsyncIterator[bytes]:
+        body = s3_object["Body"]
+
+        async def close():
+            # sync on every aiobotocore release, aclose only exists from 3.x on
+            body.close()
+
+        return stream_body(
+            read=body.read,
+            close=close,
+            chunk_size=settings.s3_download_chunk_size,
+            read_ahead=settings.s3_download_read_ahead,
+        )
+
+    async def read_body(self, s3_object) -> bytes:
+        async with s3_object["Body"] as body:
+            return await body.read()
+
+    async def close(self) -> None:
+        """Closes the connection pool"""
+        if self._client_context is not None:
+            await self._client_context.__aexit__(None, None, None)
+            self._client_context = self._async_client = None
+        await super().close()
@@ -1,22 +1,38 @@
+import asyncio
+import os
 from pathlib import Path
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import aiofiles
+import aiofiles.os
 from fastapi import UploadFile
 
-from app.domain.storage.document_storage import DocumentStorage
-from app.domain.storage.utils import filename_normalizer
+from app.domain.exceptions.document_exceptions import DocumentFileDeleteError
+from app.domain.storage.document_storage import DocumentStorage, StoredFile
+from app.domain.storage.utils import (FileDigest, filename_normalizer,
+                                      unique_storage_name)
+from app.infrastructure.core.config import settings
 
 
 class FileSystemDocumentStorage(DocumentStorage):
     """A local file system storage implementation"""
 
-    def __init__(self, upload_dir: str = "documents"):
+    def __init__(
+        self,
+        upload_dir: str = "documents",
+        chunk_size: int = settings.upload_chunk_size,
+        delete_concurrency: int = settings.storage_delete_concurrency,
+    ):
         self.upload_dir = Path(upload_dir)
         self.storage_backend = "local"
+        self.chunk_size = chunk_size
+        self.delete_concurrency = delete_concurrency
 
-    async def save(self, project_id: UUID, uploaded_file: UploadFile) -> tuple:
-        """Save the uploaded file to the filesystem and return its metadata"""
+    async def save(self, project_id: UUID, uploaded_file: UploadFile) -> StoredFile:
+        """
+        Save the uploaded file to the filesystem and return its metadata.
+        The file is streamed in fixed size chunks, hashed and sniffed on the way, so the memory used stays constant.
+        """
 
         content_type = uploaded_file.content_type
 
@@ -26,18 +42,50 @@ class FileSystemDocumentStorage(DocumentStorage):
         # sanitize the file name
         normalized_file_name = filename_normalizer(uploaded_file.filename)
 
-        # full path to save the file
-        storage_path = self.upload_dir.joinpath(project_folder, normalized_file_name)
+        # full path to save the file, a new one for every upload
+        storage_path = self.upload_dir.joinpath(project_folder, unique_storage_name(normalized_file_name))
 
         # ensure the directories exists
         storage_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # write the file
-        async with aiofiles.open(storage_path, "wb") as file_object:
-            content = uploaded_file.file.read()
-            await file_object.write(content)
-
-        return normalized_file_name, content_type, str(storage_path), self.storage_backend
+        digest = await self._write(storage_path, uploaded_file)
+
+        return StoredFile(
+            file_name=normalized_file_name,
+            content_type=content_type,
+            storage_path=str(storage_path),
+            storage_backend=self.storage_backend,
+            size=digest.size,
+            sha256=digest.sha256,
+            detected_content_type=digest.detected_content_type,
+        )
+
+    def blob_path(self, sha256: str) -> str:
+        # fanned out by the first two hex digits, so no directory grows too large
+        return str(self.upload_dir.joinpath("blobs", sha256[:2], sha256))
+
+    async def save_blob(self, storage_path: str, uploaded_file: UploadFile) -> None:
+        path = Path(storage_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        await self._write(path, uploaded_file)
+
+    async def _write(self, storage_path: Path, uploaded_file: UploadFile) -> FileDigest:
+        """Streams the upload to the path in chunks, computing its digest on the way"""
+        # written next to the target and moved over it once complete, a failed upload leaves an existing file intact,
+        # the temp name is unique per write, two uploads of the same blob can be streaming to one path at once
+        partial_path = storage_path.with_name(f"{storage_path.name}.{uuid4().hex}.part")
+        digest = FileDigest()
+        try:
+            async with aiofiles.open(partial_path, "wb") as file_object:
+                while chunk := await uploaded_file.read(self.chunk_size):
+                    digest.update(chunk)
+                    await file_object.write(chunk)
+            await aiofiles.os.replace(partial_path, storage_path)
+        except BaseException:
+            if partial_path.exists():
+                os.unlink(partial_path)
+            raise
+        return digest
 
     async def remove(self, storage_path: str) -> None:
         """Delete a file from the filesystem given its storage path"""
@@ -52,3 +100,29 @@ class FileSystemDocumentStorage(DocumentStorage):
         project_dir_is_empty = not any(file_path.parent.iterdir())
         if project_dir_is_empty:
             file_path.parent.rmdir()
+
+    async def remove_many(self, storage_paths: list[str]) -> None:
+        """Delete the files in worker threads, delete_concurrency at a time, then each emptied directory once"""
+        slots = asyncio.Semaphore(self.delete_concurrency)
+
+        async def unlink(storage_path: str) -> str | None:
+            async with slots:
+                try:
+                    await aiofiles.os.remove(storage_path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    return f"{storage_path} ({e.strerror})"
+            return None
+
+        failed = [error for error in await asyncio.gather(*map(unlink, storage_paths)) if error]
+
+        for directory in dict.fromkeys(Path(storage_path).parent for storage_path in storage_paths):
+            try:
+                # fails unless the directory is empty
+                await aiofiles.os.rmdir(directory)
+            except OSError:
+                pass
+
+        if failed:
+            raise DocumentFileDeleteError(f"{len(failed)} of {len(storage_paths)} files: {', '.join(failed[:10])}")
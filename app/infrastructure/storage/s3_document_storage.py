@@ -1,15 +1,34 @@
 import asyncio
-from uuid import UUID
+from collections.abc import AsyncIterator
+from dataclasses import replace
+from uuid import UUID, uuid4
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from fastapi import UploadFile
 from mypy_boto3_s3.client import S3Client
 
-from app.domain.storage.document_storage import DocumentStorage
-from app.domain.storage.utils import filename_normalizer
+from app.domain.exceptions.document_exceptions import DocumentFileDeleteError
+from app.domain.storage.document_storage import (DocumentStorage,
+                                                 PresignedUpload, StoredFile)
+from app.domain.storage.utils import (SNIFF_LENGTH, FileDigest,
+                                      filename_normalizer, sniff_content_type,
+                                      unique_storage_name)
+from app.infrastructure.core.cache import presigned_url_cache
 from app.infrastructure.core.config import settings
 from app.infrastructure.core.logger import logger
+from app.infrastructure.core.streaming import stream_body
+
+
+def s3_client_options(max_pool_connections: int = settings.s3_max_pool_connections) -> dict:
+    """The pool size, timeouts and retry policy of the S3 clients, the botocore Config arguments"""
+    return {
+        "max_pool_connections": max_pool_connections,
+        "connect_timeout": settings.s3_connect_timeout,
+        "read_timeout": settings.s3_read_timeout,
+        "retries": {"max_attempts": settings.s3_max_attempts, "mode": settings.s3_retry_mode},
+    }
 
 
 class S3DocumentStorage(DocumentStorage):
@@ -17,15 +36,31 @@ class S3DocumentStorage(DocumentStorage):
 
     # TODO Add custom exceptions
 
-    def __init__(self):
+    # S3 rejects the parts (but the last) smaller than 5 MiB
+    MIN_PART_SIZE = 5 * 1024 * 1024
+    # the most keys a delete_objects call takes
+    DELETE_BATCH_SIZE = 1000
+    # direct uploads are posted under this prefix, their file name goes in the object's metadata
+    STAGING_PREFIX = "uploads"
+    FILE_NAME_FIELD = "x-amz-meta-file-name"
+
+    def __init__(
+        self, part_size: int = settings.s3_part_size, part_concurrency: int = settings.s3_part_concurrency
+    ):
         self.bucket_name: str = settings.aws_s3_bucket_name
         # Create a session object to get the resolved region
         self.region: str = settings.aws_region
+        self.part_size = max(part_size, self.MIN_PART_SIZE)
+        self.part_concurrency = part_concurrency
+        self.delete_concurrency = settings.storage_delete_concurrency
         self.client: S3Client = boto3.client(
             "s3",
             # aws_access_key_id=settings.aws_access_key_id,
             # aws_secret_access_key=settings.aws_secret_access_key,
-            region_name=self.region
+            region_name=self.region,
+            # e.g. a local moto server
+            endpoint_url=settings.aws_endpoint_url,
+            config=Config(**s3_client_options()),
         )
         # Ensure bucket exists at initialization if not will call create bucket method
         self._ensure_bucket_exists()
@@ -65,57 +100,318 @@ class S3DocumentStorage(DocumentStorage):
                 except Exception as e:
                     logger.error(f"bucket is not created {e}")
 
-    async def save(self, project_id: UUID, uploaded_file: UploadFile) -> tuple:
+    async def _call(self, operation: str, **params):
+        """Runs a client operation, the blocking boto3 call in a worker thread of the default executor"""
+        return await asyncio.to_thread(getattr(self.client, operation), **params)
+
+    def iter_body(self, s3_object) -> AsyncIterator[bytes]:
+        """The chunks of a downloaded object's body, read in worker threads, a thread hop per large chunk"""
+        body = s3_object["Body"]
+        return stream_body(
+            read=lambda size: asyncio.to_thread(body.read, size),
+            close=lambda: asyncio.to_thread(body.close),
+            chunk_size=settings.s3_download_chunk_size,
+            read_ahead=settings.s3_download_read_ahead,
+        )
+
+    async def read_body(self, s3_object) -> bytes:
+        return await asyncio.to_thread(s3_object["Body"].read)
+
+    async def close(self) -> None:
+        self.client.close()
+
+    async def save(self, project_id: UUID, uploaded_file: UploadFile) -> StoredFile:
         """
-        Uploads the file to S3 under a project folder.
-        Returns a tuple of file_name, content_type and S3 storage_key (prefix)
+        Uploads the file to S3 under a project folder, without blocking the event loop.
+        A file larger than a part is sent as a multipart upload, its parts in parallel.
+        Returns the file_name, content_type and S3 storage_key (prefix) and the size, sha256 and sniffed type
         """
 
         content_type = uploaded_file.content_type
 
+        normalized_file_name, storage_key = self._project_key(project_id, uploaded_file.filename)
+
+        digest = await self._write(storage_key, content_type, uploaded_file)
+
+        return StoredFile(
+            file_name=normalized_file_name,
+            content_type=content_type,
+            storage_path=storage_key,
+            storage_backend=self.storage_backend,
+            size=digest.size,
+            sha256=digest.sha256,
+            detected_content_type=digest.detected_content_type,
+        )
+
+    @staticmethod
+    def _project_key(project_id: UUID, file_name: str) -> tuple[str, str]:
+        """The sanitized file name and a new S3 key for it under the project folder"""
         # a folder that will be used to store all documents uploaded to project (from project_id uuid)
         project_folder = project_id.hex
 
         # sanitize the file name
-        normalized_file_name = filename_normalizer(uploaded_file.filename)
+        normalized_file_name = filename_normalizer(file_name)
+
+        # s3 key, (s3 prefix), a new one for every upload
+        return normalized_file_name, f"{project_folder}/{unique_storage_name(normalized_file_name)}"
+
+    def _staging_key(self, project_id: UUID, upload_id: UUID) -> str:
+        """The key a direct upload is posted to, apart from the project's live files until it is completed"""
+        return f"{self.STAGING_PREFIX}/{project_id.hex}/{upload_id.hex}"
+
+    def create_presigned_upload(
+        self, project_id: UUID, file_name: str, content_type: str, max_size: int, expires_in: int
+    ) -> PresignedUpload:
+        """
+        A presigned POST for a browser to upload the file to a staging key of its own.
+        S3 enforces the key, the content type, the file name (kept in the object's metadata) and the size,
+        the API never sees the bytes. An existing document is only replaced once the upload is completed.
+        """
+        normalized_file_name, _ = self._project_key(project_id, file_name)
+        upload_id = uuid4()
+        staging_key = self._staging_key(project_id, upload_id)
+        post = self.client.generate_presigned_post(
+            Bucket=self.bucket_name,
+            Key=staging_key,
+            Fields={"Content-Type": content_type, self.FILE_NAME_FIELD: normalized_file_name},
+            Conditions=[
+                {"Content-Type": content_type},
+                {self.FILE_NAME_FIELD: normalized_file_name},
+                ["content-length-range", 1, max_size],
+            ],
+            ExpiresIn=expires_in,
+        )
+        return PresignedUpload(
+            url=post["url"],
+            fields=post["fields"],
+            upload_id=upload_id,
+            file_name=normalized_file_name,
+            storage_path=staging_key,
+            expires_in=expires_in,
+        )
+
+    async def stat_upload(self, project_id: UUID, upload_id: UUID) -> StoredFile | None:
+        """
+        The metadata of a file staged with a presigned POST, None if there is no such upload in the project.
+        Only its first bytes are read, for the sniffed type, the SHA-256 stays unknown.
+        """
+        staging_key = self._staging_key(project_id, upload_id)
+        try:
+            head = await self._call("head_object", Bucket=self.bucket_name, Key=staging_key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return None
+            raise
+        # the POST policy requires the file name, an object put there by other means is not a staged upload
+        file_name = head.get("Metadata", {}).get(self.FILE_NAME_FIELD.removeprefix("x-amz-meta-"))
+        if not file_name:
+            return None
+
+        first_bytes = b""
+        if head["ContentLength"]:
+            s3_object = await self.download(staging_key, byte_range=(0, SNIFF_LENGTH - 1))
+            first_bytes = await self.read_body(s3_object)
+
+        return StoredFile(
+            file_name=file_name,
+            content_type=head.get("ContentType"),
+            storage_path=staging_key,
+            storage_backend=self.storage_backend,
+            size=head["ContentLength"],
+            detected_content_type=sniff_content_type(first_bytes),
+        )
+
+    async def promote_upload(self, project_id: UUID, staged: StoredFile) -> StoredFile:
+        """Copies a checked staged upload to its key under the project folder, then deletes the staged object"""
+        _, storage_key = self._project_key(project_id, staged.file_name)
+        await self._call(
+            "copy_object",
+            Bucket=self.bucket_name,
+            Key=storage_key,
+            CopySource={"Bucket": self.bucket_name, "Key": staged.storage_path},
+        )
+        await self.discard_upload(staged.storage_path)
+        return replace(staged, storage_path=storage_key)
+
+    async def discard_upload(self, staging_key: str) -> None:
+        await self._call("delete_object", Bucket=self.bucket_name, Key=staging_key)
 
-        # s3 key, (s3 prefix)
-        storage_key = f"{project_folder}/{normalized_file_name}"
+    def blob_path(self, sha256: str) -> str:
+        return f"blobs/{sha256[:2]}/{sha256}"
 
-        # upload file-like object to s3 directly
-        self.client.upload_fileobj(uploaded_file.file, self.bucket_name, storage_key)
+    async def save_blob(self, storage_path: str, uploaded_file: UploadFile) -> None:
+        await self._write(storage_path, uploaded_file.content_type, uploaded_file)
 
-        return normalized_file_name, content_type, storage_key, self.storage_backend
+    async def _write(self, storage_key: str, content_type: str, uploaded_file: UploadFile) -> FileDigest:
+        """Uploads the file under the key, as a single object or a multipart upload, computing its digest on the way"""
+        digest = FileDigest()
+        first_part = await uploaded_file.read(self.part_size)
+        digest.update(first_part)
 
-    def get_signed_url(self, storage_key: str, expires_in: int = 3600) -> str:
-        """Generate a presigned URL to download a file from S3"""
+        if len(first_part) < self.part_size:
+            # the whole file fits in a single part
+            await self._call(
+                "put_object",
+                Bucket=self.bucket_name,
+                Key=storage_key,
+                Body=first_part,
+                ContentType=content_type,
+            )
+        else:
+            await self._multipart_upload(storage_key, content_type, uploaded_file, first_part, digest)
+        return digest
+
+    async def _multipart_upload(
+        self, storage_key: str, content_type: str, uploaded_file: UploadFile, first_part: bytes, digest: FileDigest
+    ) -> None:
+        """
+        Uploads up to part_concurrency parts at once, the next part is read only once a slot is free,
+        so at most that many parts are held in memory. A failed (or cancelled) upload is aborted,
+        otherwise its parts would stay in the bucket, and be billed, until a lifecycle rule removes them.
+        """
+        upload = await self._call(
+            "create_multipart_upload", Bucket=self.bucket_name, Key=storage_key, ContentType=content_type
+        )
+        upload_id = upload["UploadId"]
+        slots = asyncio.Semaphore(self.part_concurrency)
+
+        async def upload_part(part_number: int, body: bytes) -> dict:
+            try:
+                response = await self._call(
+                    "upload_part",
+                    Bucket=self.bucket_name,
+                    Key=storage_key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=body,
+                )
+                return {"PartNumber": part_number, "ETag": response["ETag"]}
+            finally:
+                slots.release()
+
+        try:
+            parts = []
+            async with asyncio.TaskGroup() as group:
+                part_number, body = 1, first_part
+                while body:
+                    await slots.acquire()
+                    parts.append(group.create_task(upload_part(part_number, body)))
+                    body = await uploaded_file.read(self.part_size)
+                    digest.update(body)
+                    part_number += 1
+
+            await self._call(
+                "complete_multipart_upload",
+                Bucket=self.bucket_name,
+                Key=storage_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": [part.result() for part in parts]},
+            )
+        except BaseException as e:
+            try:
+                await self._call(
+                    "abort_multipart_upload", Bucket=self.bucket_name, Key=storage_key, UploadId=upload_id
+                )
+            except ClientError as abort_error:
+                logger.error(f"Couldn't abort the multipart upload {upload_id} of {storage_key}: {abort_error}")
+            # the first failed part, rather than the task group's wrapper
+            if isinstance(e, ExceptionGroup):
+                raise e.exceptions[0] from e
+            raise
+
+    def get_signed_url(
+        self, storage_key: str, expires_in: int = 3600, file_name: str | None = None, content_type: str | None = None
+    ) -> str:
+        """
+        Generate a presigned URL to download a file from S3.
+        With a file name S3 serves it as an attachment of that name, as the proxied download does.
+        """
+        params = {"Bucket": self.bucket_name, "Key": storage_key}
+        if file_name is not None:
+            params["ResponseContentDisposition"] = f'attachment; filename="{file_name}"'
+        if content_type is not None:
+            params["ResponseContentType"] = content_type
 
         url = self.client.generate_presigned_url(
             "get_object",
-            Params={"Bucket": self.bucket_name, "Key": storage_key},
+            Params=params,
             ExpiresIn=expires_in,  # time in seconds (default 1 hour)
         )
         return url
 
-    async def download(self, storage_key: str):
-        """Downloads a file-like object from S3 and returns it to be used in a StreamingResponse"""
-        s3_object = await asyncio.to_thread(self.client.get_object, Bucket=self.bucket_name, Key=storage_key)
+    def get_download_url(self, storage_key: str, file_name: str, content_type: str) -> str:
+        """A short-lived presigned download URL, reused from the cache until shortly before it expires"""
+        cache_key = (storage_key, file_name, content_type)
+        url = presigned_url_cache.get(cache_key)
+        if url is None:
+            url = self.get_signed_url(
+                storage_key, expires_in=settings.s3_presigned_url_ttl, file_name=file_name, content_type=content_type
+            )
+            presigned_url_cache.set(cache_key, url)
+        return url
+
+    async def download(self, storage_key: str, byte_range: tuple[int, int] | None = None):
+        """
+        Downloads a file-like object from S3 and returns it to be used in a StreamingResponse.
+        With an inclusive byte_range only those bytes are fetched, S3 answers with a ContentRange.
+        """
+        params = {"Bucket": self.bucket_name, "Key": storage_key}
+        if byte_range is not None:
+            params["Range"] = f"bytes={byte_range[0]}-{byte_range[1]}"
+        s3_object = await self._call("get_object", **params)
         return s3_object
 
+    async def head(self, storage_key: str):
+        """The object's metadata (ContentLength, ETag, LastModified), without its body"""
+        return await self._call("head_object", Bucket=self.bucket_name, Key=storage_key)
+
     async def remove(self, storage_path: str) -> None:
-        # run synchronous boto3 call in a separate thread
-        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket_name, Key=storage_path)
+        await self._call("delete_object", Bucket=self.bucket_name, Key=storage_path)
+        await self._remove_empty_prefix(storage_path.split("/")[0])
+
+    async def remove_many(self, storage_paths: list[str]) -> None:
+        """
+        Deletes the objects with delete_objects, up to 1000 keys a call, delete_concurrency calls at once,
+        then cleans up each project prefix once, rather than three round trips per file.
+        """
+        keys = list(dict.fromkeys(storage_paths))
+        size = self.DELETE_BATCH_SIZE
+        batches = [keys[start : start + size] for start in range(0, len(keys), size)]
+        slots = asyncio.Semaphore(self.delete_concurrency)
+
+        async def delete_batch(batch: list[str]) -> list[str]:
+            """The keys S3 failed to delete"""
+            async with slots:
+                try:
+                    response = await self._call(
+                        "delete_objects",
+                        Bucket=self.bucket_name,
+                        # quiet, only the errors are reported back
+                        Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+                    )
+                except ClientError as e:
+                    logger.error(f"Couldn't delete a batch of {len(batch)} objects: {e}")
+                    return batch
+            return [error["Key"] for error in response.get("Errors", [])]
 
-        parent_prefix = storage_path.split("/")[0]
+        failed = [key for keys_failed in await asyncio.gather(*map(delete_batch, batches)) for key in keys_failed]
 
+        for prefix in dict.fromkeys(key.split("/")[0] for key in keys):
+            await self._remove_empty_prefix(prefix)
+
+        if failed:
+            raise DocumentFileDeleteError(f"{len(failed)} of {len(keys)} objects: {', '.join(failed[:10])}")
+
+    async def _remove_empty_prefix(self, parent_prefix: str) -> None:
+        """Deletes the "folder" once no objects are left under it"""
         # Check if any objects are left in this "directory"
-        response = await asyncio.to_thread(
-            self.client.list_objects_v2, Bucket=self.bucket_name, Prefix=parent_prefix, MaxKeys=1
-        )
+        response = await self._call("list_objects_v2", Bucket=self.bucket_name, Prefix=parent_prefix, MaxKeys=1)
 
         if "Contents" not in response:
             # no files in "folder"
             try:
-                await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket_name, Key=parent_prefix)
-            except self.client.exceptions.NoSuchKey:
-                pass
+                await self._call("delete_object", Bucket=self.bucket_name, Key=parent_prefix)
+            except ClientError as e:
+                # the client's own NoSuchKey class differs between boto3 and aiobotocore, the code doesn't
+                if e.response.get("Error", {}).get("Code") != "NoSuchKey":
+                    raise
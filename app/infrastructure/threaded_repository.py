@@ -0,0 +1,26 @@
+import asyncio
+import inspect
+from functools import wraps
+from typing import Any
+
+
+class ThreadedRepository:
+    """
+    Wraps a synchronous repository (or unit of work) so the async services can await its methods.
+    Every bound method call runs in a worker thread, so a blocking query doesn't stall the event loop.
+    Static methods (e.g. to_domain_entity) are pure mappers and are returned untouched.
+    """
+
+    def __init__(self, repo: Any):
+        self._repo = repo
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._repo, name)
+        if not inspect.ismethod(attribute):
+            return attribute
+
+        @wraps(attribute)
+        async def run_in_thread(*args, **kwargs):
+            return await asyncio.to_thread(attribute, *args, **kwargs)
+
+        return run_in_thread
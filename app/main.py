@@ -1,24 +1,47 @@
 import os
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict
 from functools import lru_cache
 
 import uvicorn
 from fastapi import Depends, FastAPI
 
 from app.domain.storage.document_storage import DocumentStorage
-from app.infrastructure import (SQLAlchemyProjectRepository,
+from app.infrastructure import (AsyncSQLAlchemyProjectRepository,
+                                AsyncSQLAlchemyUserProjectRoleRepository,
+                                AsyncSQLAlchemyUserRepository,
+                                SQLAlchemyProjectRepository,
                                 SQLAlchemyUserRepository)
-from app.infrastructure.core.database import Base, engine, get_db, settings
+from app.infrastructure.async_sqlalchemy_blob_repository import \
+    AsyncSQLAlchemyBlobRepository
+from app.infrastructure.async_sqlalchemy_document_repository import \
+    AsyncSQLAlchemyDocumentRepository
+from app.infrastructure.async_sqlalchemy_purge_job_repository import \
+    AsyncSQLAlchemyPurgeJobRepository
+from app.infrastructure.async_sqlalchemy_unit_of_work import \
+    AsyncSQLAlchemyUnitOfWork
+from app.infrastructure.core.cache import (presigned_url_cache, role_cache,
+                                           user_cache)
+from app.infrastructure.core.database import get_async_db, get_db, settings
 from app.infrastructure.core.logger import logger
+from app.infrastructure.core.security import password_hasher
+from app.infrastructure.sqlalchemy_blob_repository import \
+    SQLAlchemyBlobRepository
 from app.infrastructure.sqlalchemy_documet_repository import \
     SQLAlchemyDocumentRepository
+from app.infrastructure.sqlalchemy_purge_job_repository import \
+    SQLAlchemyPurgeJobRepository
+from app.infrastructure.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
 from app.infrastructure.sqlalchemy_user_project_role_repository import \
     SQLAlchemyUserProjectRoleRepository
+from app.infrastructure.storage.async_s3_document_storage import \
+    AsyncS3DocumentStorage
 from app.infrastructure.storage.file_system_document_storage import \
     FileSystemDocumentStorage
 from app.infrastructure.storage.s3_document_storage import S3DocumentStorage
+from app.infrastructure.threaded_repository import ThreadedRepository
 from app.routers.api import auth_router, document_router, project_router
-from app.routers.dependencies import (get_auth_service,
+from app.routers.dependencies import (get_auth_service, get_current_user,
                                       get_document_repository,
                                       get_document_service,
                                       get_project_repository,
@@ -26,15 +49,23 @@ from app.routers.dependencies import (get_auth_service,
                                       get_role_repository_provider,
                                       get_role_service_provider,
                                       get_user_repository)
-from app.services import (AuthService, DocumentService, ProjectService,
+from app.services import (AuthService, BlobService, DocumentService,
+                          ProjectService, PurgeService, PurgeWorker,
                           UserProjectRoleService)
 
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: create tables
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully!")
+    # Startup: the schema is migrated by the deploy step (make migrate), not by every worker
+    if settings.purge_worker_enabled:
+        purge_worker.start()
     yield
+    # Shutdown: let the purge finish its batch, stop the bcrypt workers and close the storage's connections
+    if purge_worker.running:
+        await purge_worker.stop()
+    password_hasher.shutdown()
+    if document_storage_provider.cache_info().currsize:
+        await document_storage_provider().close()
 
 
 app = FastAPI(title="FastAPI Project Management App", version="1.0.0", lifespan=lifespan)
@@ -48,66 +79,153 @@ app.include_router(document_router)
 
 # TODO put in a livespan event or move to a dependency container
 # Dependency injection wiring:
-def user_repository_provider(db=Depends(get_db)):
+
+# the database stack is picked once, by the DATABASE_MODE setting: "async" or "sync"
+use_async_database = settings.database_mode == "async"
+session_provider = get_async_db if use_async_database else get_db
+
+
+def _repository(sync_repository: type, async_repository: type, db):
+    """Build the repository (or unit of work) for the configured database stack"""
+    if use_async_database:
+        return async_repository(db)
+    # sync repositories run in a worker thread, so they don't block the event loop
+    return ThreadedRepository(sync_repository(db))
+
+
+def unit_of_work_provider(db=Depends(session_provider)):
+    """Dependency provider for the request's UnitOfWork, it shares the session with the repositories"""
+    return _repository(SQLAlchemyUnitOfWork, AsyncSQLAlchemyUnitOfWork, db)
+
+
+def user_repository_provider(db=Depends(session_provider)):
     """Dependency provider for UserRepository"""
-    return SQLAlchemyUserRepository(db)
+    return _repository(SQLAlchemyUserRepository, AsyncSQLAlchemyUserRepository, db)
 
 
-def project_repository_provider(db=Depends(get_db)):
+def project_repository_provider(db=Depends(session_provider)):
     """Dependency provider for ProjectRepository"""
-    return SQLAlchemyProjectRepository(db)
+    return _repository(SQLAlchemyProjectRepository, AsyncSQLAlchemyProjectRepository, db)
 
 
-def document_repository_provider(db=Depends(get_db)):
+def document_repository_provider(db=Depends(session_provider)):
     """Dependency provider for DocumentRepository"""
-    return SQLAlchemyDocumentRepository(db)
+    return _repository(SQLAlchemyDocumentRepository, AsyncSQLAlchemyDocumentRepository, db)
 
 
-def user_project_role_repository_provider(db=Depends(get_db)):
+def user_project_role_repository_provider(db=Depends(session_provider)):
     """Dependency provider for SQLAlchemyUserProjectRoleRepository"""
-    return SQLAlchemyUserProjectRoleRepository(db)
+    return _repository(SQLAlchemyUserProjectRoleRepository, AsyncSQLAlchemyUserProjectRoleRepository, db)
+
+
+def purge_job_repository_provider(db=Depends(session_provider)):
+    """Dependency provider for PurgeJobRepository"""
+    return _repository(SQLAlchemyPurgeJobRepository, AsyncSQLAlchemyPurgeJobRepository, db)
 
 
 @lru_cache
 def document_storage_provider() -> DocumentStorage:
     """Dependency provider for Storage"""
-    storage_backends = {"local": FileSystemDocumentStorage(), "s3": S3DocumentStorage()}
-    storage = storage_backends.get(settings.storage_backend)
-    if not storage:
-        return storage_backends["local"]
-    return storage
+    if settings.storage_backend != "s3":
+        return FileSystemDocumentStorage()
+    # the S3 storage is built once, it holds the connection pool
+    if settings.s3_client == "async":
+        return AsyncS3DocumentStorage()
+    return S3DocumentStorage()
 
 
-def auth_service_provider(user_repo=Depends(user_repository_provider)):
+def blob_service_provider(
+    storage=Depends(document_storage_provider),
+    db=Depends(session_provider),
+    uow=Depends(unit_of_work_provider),
+):
+    """Dependency provider for BlobService, reference counted only with the content addressed storage layout"""
+    return _blob_service(storage, db=db, uow=uow)
+
+
+def _blob_service(storage: DocumentStorage, db, uow) -> BlobService:
+    if settings.storage_layout != "content":
+        return BlobService(storage)
+    return BlobService(storage, repo=_repository(SQLAlchemyBlobRepository, AsyncSQLAlchemyBlobRepository, db), uow=uow)
+
+
+def auth_service_provider(user_repo=Depends(user_repository_provider), uow=Depends(unit_of_work_provider)):
     """Dependency provider for AuthService"""
-    return AuthService(user_repo)
+    return AuthService(user_repo, uow=uow)
 
 
 def role_service_provider(
     role_repo=Depends(user_project_role_repository_provider),
     user_repo=Depends(user_repository_provider),
     project_repo=Depends(project_repository_provider),
+    uow=Depends(unit_of_work_provider),
 ):
     """Dependency provider for UserProjectRoleService"""
-    return UserProjectRoleService(role_repo, user_repo=user_repo, project_repo=project_repo)
+    return UserProjectRoleService(role_repo, user_repo=user_repo, uow=uow, project_repo=project_repo)
 
 
 def project_service_provider(
     project_repo=Depends(project_repository_provider),
     storage=Depends(document_storage_provider),
     role_service=Depends(role_service_provider),
+    uow=Depends(unit_of_work_provider),
+    blob_service=Depends(blob_service_provider),
+    purge_jobs=Depends(purge_job_repository_provider),
 ):
     """Dependency provider for ProjectService"""
-    return ProjectService(project_repo, storage=storage, role_service=role_service)
+    return ProjectService(
+        project_repo,
+        storage=storage,
+        role_service=role_service,
+        uow=uow,
+        blob_service=blob_service,
+        purge_jobs=purge_jobs,
+    )
 
 
 def document_service_provider(
     document_repo=Depends(document_repository_provider),
     storage=Depends(document_storage_provider),
     project_service=Depends(project_service_provider),
+    uow=Depends(unit_of_work_provider),
+    blob_service=Depends(blob_service_provider),
+    purge_jobs=Depends(purge_job_repository_provider),
 ):
     """Dependency provider for DocumentService"""
-    return DocumentService(document_repo, storage=storage, project_service=project_service)
+    return DocumentService(
+        document_repo,
+        storage=storage,
+        project_service=project_service,
+        uow=uow,
+        blob_service=blob_service,
+        purge_jobs=purge_jobs,
+    )
+
+
+@asynccontextmanager
+async def purge_service_scope():
+    """A PurgeService on a session of its own, the purge worker runs outside of any request"""
+    if use_async_database:
+        async with asynccontextmanager(get_async_db)() as db:
+            yield _purge_service(db)
+    else:
+        with contextmanager(get_db)() as db:
+            yield _purge_service(db)
+
+
+def _purge_service(db) -> PurgeService:
+    uow = _repository(SQLAlchemyUnitOfWork, AsyncSQLAlchemyUnitOfWork, db)
+    return PurgeService(
+        jobs=_repository(SQLAlchemyPurgeJobRepository, AsyncSQLAlchemyPurgeJobRepository, db),
+        project_repo=_repository(SQLAlchemyProjectRepository, AsyncSQLAlchemyProjectRepository, db),
+        document_repo=_repository(SQLAlchemyDocumentRepository, AsyncSQLAlchemyDocumentRepository, db),
+        blob_service=_blob_service(document_storage_provider(), db=db, uow=uow),
+        uow=uow,
+    )
+
+
+# purges the soft deleted projects and documents in the background, started with the app
+purge_worker = PurgeWorker(purge_service_scope)
 
 
 # auth dependencies
@@ -131,5 +249,42 @@ async def root() -> dict[str, str]:
     return {"status": "healthy", "message": "server is up"}
 
 
+# the operational metrics are not for the public, only signed in users get them
+@app.get(
+    "/metrics/purge",
+    summary="Purge queue metrics",
+    tags=["Health"],
+    response_model=dict,
+    dependencies=[Depends(get_current_user)],
+)
+async def purge_metrics(purge_jobs=Depends(purge_job_repository_provider)) -> dict:
+    """The depth and lag of the purge queue, and what this instance's purge worker has done since it started"""
+    stats = await purge_jobs.stats()
+    return {
+        **asdict(stats),
+        "worker": {
+            "running": purge_worker.running,
+            "last_run_at": purge_worker.last_run_at,
+            **{key: purge_worker.totals[key] for key in ("claimed", "purged", "retried", "failed")},
+        },
+    }
+
+
+@app.get(
+    "/metrics/cache",
+    summary="In-process cache metrics",
+    tags=["Health"],
+    response_model=dict,
+    dependencies=[Depends(get_current_user)],
+)
+async def cache_metrics() -> dict:
+    """The hits, misses and size of this instance's caches, every worker process has its own"""
+    return {
+        "users": user_cache.stats(),
+        "roles": role_cache.stats(),
+        "presigned_urls": presigned_url_cache.stats(),
+    }
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", port=8000, log_level="info", reload=True)
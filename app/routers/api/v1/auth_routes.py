@@ -16,7 +16,7 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 async def register(registration_data: RegisterRequest, auth_service=Depends(get_auth_service)):
     """Register a new user"""
     try:
-        user = auth_service.register_user(
+        user = await auth_service.register_user(
             username=registration_data.username, email=registration_data.email, password=registration_data.password
         )
         return UserResponse(id=user.id, username=user.username)
@@ -40,7 +40,7 @@ async def login(
 ) -> TokenResponse:
     try:
         # the user service will generate a token on authentication success
-        token = auth_service.authenticate(username=login_data.username, password=login_data.password)
+        token = await auth_service.authenticate(username=login_data.username, password=login_data.password)
         return TokenResponse(access_token=token)  # nosec B106
     except ValueError as e:
         logger.error(f"Failed authentication attempt for {login_data.username}: {str(e)}")
@@ -1,33 +1,42 @@
 from uuid import UUID
 
-from fastapi import (APIRouter, Depends, File, Form, HTTPException, UploadFile,
-                     status)
+from fastapi import (APIRouter, Depends, File, Form, HTTPException, Query,
+                     Request, UploadFile, status)
 
 from app.domain.exceptions.document_exceptions import (
-    DocumentAccessError, DocumentCreateError, DocumentFileSaveError,
+    DocumentAccessError, DocumentCreateError, DocumentDeleteRightsError,
+    DocumentFileSaveError, DocumentRangeNotSatisfiableError,
     DocumentRetrieveError, DocumentUnsupportedStorageBackendError,
     DocumentUpdateEmptyError)
-from app.domain.exceptions.project_exceptions import ProjectPermissionError
+from app.domain.exceptions.domain_exceptions import InvalidCursorError
+from app.domain.exceptions.project_exceptions import (ProjectNotFoundError,
+                                                      ProjectPermissionError)
 from app.infrastructure.core.config import settings
 from app.infrastructure.core.logger import logger
 from app.routers.dependencies import get_current_user, get_document_service
 from app.routers.schemas.auth_schemas import UserOut
-from app.routers.schemas.document_schemas import (DocumentDetailSchema,
-                                                  DocumentSchema)
+from app.routers.schemas.document_schemas import (
+    DocumentBatchRequest, DocumentBatchResponse, DocumentDetailSchema,
+    DocumentPage, DocumentSchema, DocumentUploadCompleteRequest,
+    DocumentUploadPolicy, DocumentUploadRequest)
 from app.services import DocumentService
 
 router = APIRouter(prefix="/projects/{project_id}/documents", tags=["documents"])
 
 
-@router.get("/", response_model=list[DocumentSchema], status_code=status.HTTP_200_OK)
+@router.get("/", response_model=DocumentPage, status_code=status.HTTP_200_OK)
 async def list_documents(
     project_id: UUID,
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size, description="Page size"),
+    cursor: str | None = Query(None, description="The next_cursor of the previous page"),
     current_user: UserOut = Depends(get_current_user),
     service: DocumentService = Depends(get_document_service),
 ):
-    """Show all documents that belong to the project of an authenticated user"""
+    """Show a page of the documents that belong to the project of an authenticated user"""
     try:
-        return service.list_documents(user_id=current_user.id, project_id=project_id)
+        return await service.list_documents(user_id=current_user.id, project_id=project_id, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
     except DocumentRetrieveError as e:
         logger.error(e)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
@@ -82,16 +91,115 @@ async def upload_document(
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
 
 
+@router.post("/uploads", response_model=DocumentUploadPolicy, status_code=status.HTTP_201_CREATED)
+async def create_upload(
+    project_id: UUID,
+    upload: DocumentUploadRequest,
+    current_user: UserOut = Depends(get_current_user),
+    service: DocumentService = Depends(get_document_service),
+):
+    """Get a presigned POST to upload a file straight to S3, then call /uploads/complete"""
+    # restrict allowed content types, S3 enforces it and the size
+    if upload.content_type not in settings.allowed_types:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File type not allowed")
+
+    try:
+        return await service.create_upload(
+            project_id=project_id, user_id=current_user.id, file_name=upload.file_name, content_type=upload.content_type
+        )
+    except ProjectNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except ProjectPermissionError as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e)) from e
+    except (DocumentUnsupportedStorageBackendError, DocumentCreateError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    except Exception as e:
+        logger.error(e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+
+@router.post("/uploads/complete", response_model=DocumentSchema, status_code=status.HTTP_201_CREATED)
+async def complete_upload(
+    project_id: UUID,
+    upload: DocumentUploadCompleteRequest,
+    current_user: UserOut = Depends(get_current_user),
+    service: DocumentService = Depends(get_document_service),
+):
+    """Create the document of a file uploaded with a presigned POST"""
+    details = {"name": upload.name or None, "description": upload.description or None}
+    try:
+        return await service.complete_upload(
+            project_id=project_id, user_id=current_user.id, upload_id=upload.upload_id, details=details
+        )
+    except ProjectNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except ProjectPermissionError as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e)) from e
+    except DocumentFileSaveError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+    except (DocumentUnsupportedStorageBackendError, DocumentCreateError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    except Exception as e:
+        logger.error(e)
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+
+
+@router.post("/batch", response_model=DocumentBatchResponse, status_code=status.HTTP_200_OK)
+async def batch_documents(
+    project_id: UUID,
+    batch: DocumentBatchRequest,
+    current_user: UserOut = Depends(get_current_user),
+    service: DocumentService = Depends(get_document_service),
+):
+    """Update the name/description of and delete many documents of the project at once"""
+    if len(batch.updates) + len(batch.deletes) > settings.max_batch_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may hold at most {settings.max_batch_size} items",
+        )
+
+    try:
+        results = await service.batch_documents(
+            user_id=current_user.id,
+            project_id=project_id,
+            updates=[item.model_dump() for item in batch.updates],
+            deletes=batch.deletes,
+        )
+        return {"results": results}
+    except ProjectNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except (ProjectPermissionError, DocumentDeleteRightsError) as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e)) from e
+    except DocumentCreateError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    except Exception as e:
+        logger.error(e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+
 @router.get("/{document_id}", status_code=status.HTTP_200_OK)
 async def download_document(
     document_id: UUID,
+    request: Request,
     current_user: UserOut = Depends(get_current_user),
     service: DocumentService = Depends(get_document_service),
 ):
-    """Get a single document by its ID and return the file"""
+    """Get a single document by its ID and return the file, or the byte ranges asked for with a Range header"""
     try:
         # depending on storage will return a FileResponse or a StreamingResponse
-        return await service.download_document(user_id=current_user.id, document_id=document_id)
+        return await service.download_document(
+            user_id=current_user.id,
+            document_id=document_id,
+            range_header=request.headers.get("range"),
+            if_none_match=request.headers.get("if-none-match"),
+            if_range=request.headers.get("if-range"),
+        )
+    except DocumentRangeNotSatisfiableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+            detail=str(e),
+            headers={"Content-Range": f"bytes */{e.size}"},
+        ) from e
     except DocumentRetrieveError as e:
         logger.warning(f"Document not found: {e}")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
@@ -136,17 +244,17 @@ async def update_document(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
 
 
-@router.delete("/{document_id}", status_code=status.HTTP_200_OK)
+@router.delete("/{document_id}", status_code=status.HTTP_202_ACCEPTED)
 async def delete_document(
     document_id: UUID,
     current_user: UserOut = Depends(get_current_user),
     service: DocumentService = Depends(get_document_service),
 ):
-    """Delete a document by its ID"""
+    """Delete a document by its ID, it's hidden at once, its file is purged in the background"""
     try:
         await service.delete_document(user_id=current_user.id, document_id=document_id)
         # instead HTTP_204_NO_CONTENT, return an informative response
-        return {"message": f"Document with ID: {document_id} was successfully deleted"}
+        return {"message": f"Document with ID: {document_id} was deleted, its file is purged in the background"}
     except DocumentRetrieveError as e:
         logger.error(e)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
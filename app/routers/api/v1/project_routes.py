@@ -2,6 +2,7 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
+from app.domain.exceptions.domain_exceptions import InvalidCursorError
 from app.domain.exceptions.project_exceptions import (ProjectCreateError,
                                                       ProjectDeleteError,
                                                       ProjectNotFoundError,
@@ -11,27 +12,39 @@ from app.domain.exceptions.project_exceptions import (ProjectCreateError,
 from app.domain.exceptions.user_project_role_exceptions import (
     ProjectRoleAddByUsernameError, ProjectRoleAddNotAuthorizedError,
     ProjectRoleCreateError)
+from app.infrastructure.core.config import settings
 from app.infrastructure.core.exceptions import DatabaseError
 from app.infrastructure.core.logger import logger
 from app.routers.dependencies import (get_current_user, get_project_service,
                                       get_role_service_provider)
 from app.routers.schemas.auth_schemas import UserOut
-from app.routers.schemas.project_schemas import (ProjectCreateRequest,
+from app.routers.schemas.project_schemas import (ProjectBulkInviteRequest,
+                                                 ProjectBulkInviteResponse,
+                                                 ProjectCreateRequest,
                                                  ProjectFullDetails,
                                                  ProjectResponse,
+                                                 ProjectSummaryPage,
                                                  ProjectUpdateRequest)
 from app.services import ProjectService, UserProjectRoleService
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
 
-@router.get("/", response_model=list[ProjectResponse], summary="Show all projects", status_code=status.HTTP_200_OK)
+@router.get("/", response_model=ProjectSummaryPage, summary="Show all projects", status_code=status.HTTP_200_OK)
 async def list_all(
-    service: ProjectService = Depends(get_project_service), current_user: UserOut = Depends(get_current_user)
+    with_counts: bool = Query(False, description="Include the number of documents and participants"),
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size, description="Page size"),
+    cursor: str | None = Query(None, description="The next_cursor of the previous page"),
+    service: ProjectService = Depends(get_project_service),
+    current_user: UserOut = Depends(get_current_user),
 ):
-    """Show all projects that belong to the authenticated user"""
+    """Show a page of the projects that belong to the authenticated user"""
     try:
-        return service.get_all_projects(user_id=current_user.id)
+        return await service.get_all_projects(
+            user_id=current_user.id, with_counts=with_counts, limit=limit, cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
     except ProjectRetrieveError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
     except Exception as e:
@@ -48,7 +61,7 @@ async def create(
     """Create a project and add it to the user"""
     try:
         # return the created project
-        return service.add_project(name=form.name, description=form.description, user_id=current_user.id)
+        return await service.add_project(name=form.name, description=form.description, user_id=current_user.id)
     except ProjectCreateError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
     except DatabaseError as e:
@@ -67,7 +80,7 @@ async def get_project(
     """Get a project by id"""
     try:
         # return the retrieved project
-        return service.get_project(project_id=project_id, user_id=current_user.id)
+        return await service.get_project(project_id=project_id, user_id=current_user.id)
     except ProjectNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
     except ProjectPermissionError as e:
@@ -87,7 +100,7 @@ async def update(
     """Update a project by id"""
     try:
         # return the updated project
-        return service.update_project(project_id=project_id, user_id=current_user.id, data=project_data)
+        return await service.update_project(project_id=project_id, user_id=current_user.id, data=project_data)
     except ProjectNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
     except ProjectPermissionError as e:
@@ -99,17 +112,17 @@ async def update(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
 
 
-@router.delete("/{project_id}", summary="Delete project", status_code=status.HTTP_200_OK)
+@router.delete("/{project_id}", summary="Delete project", status_code=status.HTTP_202_ACCEPTED)
 async def delete(
     project_id: UUID,
     current_user: UserOut = Depends(get_current_user),
     service: ProjectService = Depends(get_project_service),
 ):
-    """Delete a project by id"""
+    """Delete a project by id, it's hidden at once, its documents and files are purged in the background"""
     try:
         await service.delete_project(project_id=project_id, user_id=current_user.id)
         # instead of 204 "No content", returning an informative response
-        return {"message": f"Project with ID: {project_id} was successfully deleted"}
+        return {"message": f"Project with ID: {project_id} was deleted, its files are purged in the background"}
     except ProjectNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
     except ProjectPermissionError as e:
@@ -131,7 +144,7 @@ async def invite_user(
 ):
     """Grant access to the project for a specific user."""
     try:
-        role_service.add_participant_by_username(project_id=project_id, username=username, current_user=current_user)
+        await role_service.add_participant_by_username(project_id=project_id, username=username, current_user=current_user)
         return {"message": f"user '{username}' has been invited to project {project_id}"}
     except ProjectRoleAddNotAuthorizedError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e)) from e
@@ -140,3 +153,29 @@ async def invite_user(
     except (ProjectRoleCreateError, Exception) as e:
         logger.error(e)
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+
+
+@router.post("/{project_id}/invite/bulk", response_model=ProjectBulkInviteResponse, status_code=status.HTTP_200_OK)
+async def invite_users(
+    project_id: UUID,
+    invite: ProjectBulkInviteRequest,
+    current_user: UserOut = Depends(get_current_user),
+    role_service: UserProjectRoleService = Depends(get_role_service_provider),
+):
+    """Grant access to the project for many users at once, the outcome is reported per username."""
+    if len(invite.usernames) > settings.max_batch_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may hold at most {settings.max_batch_size} items",
+        )
+
+    try:
+        results = await role_service.add_participants_by_usernames(
+            project_id=project_id, usernames=invite.usernames, current_user=current_user
+        )
+        return {"results": results}
+    except ProjectRoleAddNotAuthorizedError as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e)) from e
+    except (ProjectRoleCreateError, Exception) as e:
+        logger.error(e)
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
@@ -1,3 +1,5 @@
+from uuid import UUID
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
@@ -6,6 +8,7 @@ from app.domain.repositories.project_repository import ProjectRepository
 from app.domain.repositories.user_project_role_repository import \
     UserProjectRoleRepository
 from app.domain.repositories.user_repository import UserRepository
+from app.infrastructure.core.cache import user_cache
 from app.infrastructure.core.security import decode_access_token
 from app.routers.schemas.auth_schemas import UserOut
 from app.services import (AuthService, DocumentService, ProjectService,
@@ -52,7 +55,7 @@ def get_role_service_provider() -> UserProjectRoleService:
     return NotImplementedError
 
 
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme), user_repository: UserRepository = Depends(get_user_repository)
 ) -> UserOut:
     credentials_exception = HTTPException(
@@ -62,15 +65,21 @@ def get_current_user(
     )
     try:
         payload = decode_access_token(token)
-        user_id: str = payload.get("sub", "")
-        if not user_id:
+        if not payload.get("sub"):
             raise credentials_exception
+        user_id = UUID(payload["sub"])
+
+        # the token is verified above, only the user lookup is cached
+        cached_user = user_cache.get(user_id)
+        if cached_user is not None:
+            return cached_user
 
-        user = user_repository.get_by_id(user_id=user_id)
+        user = await user_repository.get_by_id(user_id=user_id)
         if user is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         # to not send password hash to api
-        return UserOut(id=user.id, username=user.username, email=user.email)
-        # return user
+        current_user = UserOut(id=user.id, username=user.username, email=user.email)
+        user_cache.set(user_id, current_user)
+        return current_user
     except Exception as e:
         raise credentials_exception from e
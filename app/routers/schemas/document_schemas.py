@@ -1,7 +1,9 @@
 from datetime import datetime
+from typing import Literal
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, field_serializer
+from pydantic import (BaseModel, ConfigDict, Field, field_serializer,
+                      model_validator)
 
 
 class DocumentSchema(BaseModel):
@@ -15,6 +17,9 @@ class DocumentSchema(BaseModel):
     created_at: datetime
     updated_at: datetime | None | None = None
     storage_backend: str
+    size: int | None = None
+    sha256: str | None = None
+    detected_content_type: str | None = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -29,11 +34,74 @@ class DocumentSchema(BaseModel):
         return None
 
 
+class DocumentPage(BaseModel):
+    """A page of the document listing, pass next_cursor as the cursor to get the next one"""
+
+    items: list[DocumentSchema]
+    next_cursor: str | None = None
+
+
 class DocumentDetailSchema(BaseModel):
     name: str | None | None = None
     description: str | None | None = None
 
 
+class DocumentBatchUpdateItem(BaseModel):
+    id: UUID
+    name: str | None = Field(default=None, max_length=100)
+    description: str | None = Field(default=None, max_length=300)
+
+
+class DocumentBatchRequest(BaseModel):
+    """Metadata updates and deletes applied to the documents of one project in a single transaction"""
+
+    updates: list[DocumentBatchUpdateItem] = []
+    deletes: list[UUID] = []
+
+    @model_validator(mode="after")
+    def check_unique_ids(self):
+        ids = [item.id for item in self.updates] + self.deletes
+        if len(ids) != len(set(ids)):
+            raise ValueError("A document may appear only once in a batch")
+        return self
+
+
+class DocumentBatchItemResult(BaseModel):
+    id: UUID
+    action: Literal["update", "delete"]
+    status: Literal["updated", "deleted", "not_found"]
+
+
+class DocumentBatchResponse(BaseModel):
+    results: list[DocumentBatchItemResult]
+
+
+class DocumentUploadRequest(BaseModel):
+    """The file a browser is about to upload directly to S3"""
+
+    file_name: str = Field(min_length=1, max_length=255)
+    content_type: str
+
+
+class DocumentUploadPolicy(BaseModel):
+    """A presigned POST, the browser posts the fields and then the file (as "file") to the url"""
+
+    url: str
+    fields: dict[str, str]
+    upload_id: UUID
+    file_name: str
+    storage_path: str
+    expires_in: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DocumentUploadCompleteRequest(BaseModel):
+    upload_id: UUID
+    name: str | None = Field(default=None, max_length=100)
+    description: str | None = Field(default=None, max_length=300)
+
+
 class DocumentFileUploadSchema(BaseModel):
     file_name: str
     storage_path: str
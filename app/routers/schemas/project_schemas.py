@@ -1,7 +1,8 @@
 from datetime import datetime
+from typing import Literal
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, field_serializer
+from pydantic import BaseModel, ConfigDict, Field, field_serializer
 
 
 class DocumentSchema(BaseModel):
@@ -34,6 +35,20 @@ class ProjectResponse(BaseModel):
         return value.strftime("%Y-%m-%d %H:%M:%S")
 
 
+class ProjectSummaryResponse(ProjectResponse):
+    """A response model for the project listing, the counts are only set when requested"""
+
+    document_count: int | None = None
+    participant_count: int | None = None
+
+
+class ProjectSummaryPage(BaseModel):
+    """A page of the project listing, pass next_cursor as the cursor to get the next one"""
+
+    items: list[ProjectSummaryResponse]
+    next_cursor: str | None = None
+
+
 class ProjectCreateRequest(BaseModel):
     """Request model for project creation."""
 
@@ -59,3 +74,18 @@ class UserProjectRoleSchema(BaseModel):
 class ProjectFullDetails(ProjectResponse):
     documents: list[DocumentSchema] = []
     participants: list[UserProjectRoleSchema]
+
+
+class ProjectBulkInviteRequest(BaseModel):
+    """The usernames to invite to a project as participants"""
+
+    usernames: list[str] = Field(min_length=1)
+
+
+class ProjectInviteResult(BaseModel):
+    username: str
+    status: Literal["invited", "already_participant", "not_found"]
+
+
+class ProjectBulkInviteResponse(BaseModel):
+    results: list[ProjectInviteResult]
@@ -1,6 +1,16 @@
 from app.services.auth_service import AuthService
+from app.services.blob_service import BlobService
 from app.services.document_service import DocumentService
 from app.services.project_service import ProjectService
+from app.services.purge_service import PurgeService, PurgeWorker
 from app.services.user_project_role_service import UserProjectRoleService
 
-__all__ = ["AuthService", "ProjectService", "DocumentService", "UserProjectRoleService"]
+__all__ = [
+    "AuthService",
+    "BlobService",
+    "ProjectService",
+    "DocumentService",
+    "UserProjectRoleService",
+    "PurgeService",
+    "PurgeWorker",
+]
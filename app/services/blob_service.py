@@ -0,0 +1,105 @@
+from uuid import UUID
+
+from fastapi import UploadFile
+
+from app.domain.enities.blob import Blob
+from app.domain.repositories.blob_repository import BlobRepository
+from app.domain.repositories.unit_of_work import UnitOfWork
+from app.domain.storage.document_storage import DocumentStorage, StoredFile
+from app.domain.storage.utils import digest_upload, filename_normalizer
+from app.infrastructure.core.config import settings
+from app.infrastructure.core.logger import logger
+
+
+class BlobService:
+    """
+    Stores and removes the documents' files. Without a repository every document gets its own file under its project.
+    With one the storage is content addressed: the files are keyed by their SHA-256 and reference counted,
+    an upload of known content writes nothing and a file is deleted with its last reference.
+    """
+
+    def __init__(self, storage: DocumentStorage, repo: BlobRepository | None = None, uow: UnitOfWork | None = None):
+        self.storage = storage
+        self.repo = repo
+        self.uow = uow
+
+    @property
+    def content_addressed(self) -> bool:
+        return self.repo is not None
+
+    async def store(self, project_id: UUID, uploaded_file: UploadFile) -> StoredFile:
+        """Save the uploaded file, within the caller's unit of work, the caller commits the reference"""
+        if not self.content_addressed:
+            return await self.storage.save(project_id=project_id, uploaded_file=uploaded_file)
+
+        # the spooled upload is hashed first, so the write can be skipped when the content is already stored
+        digest = await digest_upload(uploaded_file, chunk_size=settings.upload_chunk_size)
+        blob = await self.repo.acquire(
+            Blob(
+                sha256=digest.sha256,
+                storage_path=self.storage.blob_path(digest.sha256),
+                storage_backend=self.storage.storage_backend,
+                size=digest.size,
+            )
+        )
+        if blob.refcount == 1:
+            # the first reference
+            await self.storage.save_blob(storage_path=blob.storage_path, uploaded_file=uploaded_file)
+
+        return StoredFile(
+            file_name=filename_normalizer(uploaded_file.filename),
+            content_type=uploaded_file.content_type,
+            storage_path=blob.storage_path,
+            storage_backend=blob.storage_backend,
+            size=digest.size,
+            sha256=digest.sha256,
+            detected_content_type=digest.detected_content_type,
+        )
+
+    async def release(self, storage_paths: list[str]) -> list[str]:
+        """
+        Drop the references of the deleted documents' files, within the caller's unit of work.
+        Returns the paths to remove once the caller has committed: the unreferenced blobs and the untracked files.
+        """
+        if not self.content_addressed:
+            return list(storage_paths)
+        refcounts = await self.repo.release(storage_paths=storage_paths)
+        # the files uploaded before the content addressed layout was enabled are not tracked
+        return [path for path in dict.fromkeys(storage_paths) if refcounts.get(path, 0) <= 0]
+
+    async def replace(self, old_storage_path: str, new_storage_path: str) -> list[str]:
+        """Like release, for a document whose file was replaced by a new one"""
+        if old_storage_path == new_storage_path and not self.content_addressed:
+            # overwritten in place
+            return []
+        return await self.release([old_storage_path])
+
+    async def remove(self, storage_paths: list[str], strict: bool = False) -> None:
+        """
+        Delete the files returned by release, once the release is committed. A failed removal is only logged,
+        unless strict, then it's raised for the caller to retry.
+        A blob is re-checked under a row lock, an upload of the same content since the release has revived it.
+        """
+        if not storage_paths:
+            return
+
+        refcounts: dict[str, int] = {}
+        if self.content_addressed:
+            refcounts = await self.repo.lock(storage_paths=storage_paths)
+            storage_paths = [path for path in storage_paths if refcounts.get(path, 0) <= 0]
+
+        failure = None
+        try:
+            # in bulk, a project's thousands of files would otherwise be deleted one round trip at a time
+            await self.storage.remove_many(storage_paths=storage_paths)
+        except Exception as e:
+            logger.error(f"Failed to delete the files: {str(e)}")
+            failure = e
+
+        if self.content_addressed:
+            # a retry finds no blob row and removes the file regardless
+            await self.repo.delete_unreferenced(storage_paths=list(refcounts))
+            await self.uow.commit()
+
+        if strict and failure is not None:
+            raise failure
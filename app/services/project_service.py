@@ -1,9 +1,10 @@
 from datetime import UTC, datetime
 from uuid import UUID, uuid4
 
-from app.domain.enities import Project
+from app.domain.enities import Project, ProjectSummary
+from app.domain.enities.page import Page
+from app.domain.enities.purge_job import PurgeJob
 from app.domain.enities.user_project_role import RoleEnum
-from app.domain.exceptions.document_exceptions import DocumentFileDeleteError
 from app.domain.exceptions.domain_exceptions import DomainValidationError
 from app.domain.exceptions.project_exceptions import (ProjectCreateError,
                                                       ProjectDeleteError,
@@ -12,19 +13,38 @@ from app.domain.exceptions.project_exceptions import (ProjectCreateError,
                                                       ProjectRetrieveError,
                                                       ProjectUpdateError)
 from app.domain.repositories.project_repository import ProjectRepository
+from app.domain.repositories.purge_job_repository import PurgeJobRepository
+from app.domain.repositories.unit_of_work import UnitOfWork
 from app.domain.storage.document_storage import DocumentStorage
+from app.infrastructure.core.cache import role_cache
+from app.infrastructure.core.config import settings
 from app.infrastructure.core.exceptions import DatabaseError
+from app.infrastructure.core.pagination import build_page, decode_cursor
 from app.routers.schemas.project_schemas import ProjectUpdateRequest
+from app.services.blob_service import BlobService
 from app.services.user_project_role_service import UserProjectRoleService
 
 
 class ProjectService:
-    def __init__(self, repo: ProjectRepository, storage: DocumentStorage, role_service: UserProjectRoleService):
+    def __init__(
+        self,
+        repo: ProjectRepository,
+        storage: DocumentStorage,
+        role_service: UserProjectRoleService,
+        uow: UnitOfWork,
+        purge_jobs: PurgeJobRepository,
+        blob_service: BlobService | None = None,
+    ):
         self.repo = repo
         self.storage = storage
         self.role_service = role_service
+        self.uow = uow
+        # stores and removes the files, by default a file per document under its project
+        self.blob_service = blob_service or BlobService(storage)
+        # the queue of the background purge of the deleted projects
+        self.purge_jobs = purge_jobs
 
-    def add_project(self, name: str, description: str, user_id: UUID) -> Project:
+    async def add_project(self, name: str, description: str, user_id: UUID) -> Project:
         # name uniqueness is not enforced, so I don't check it
         try:
             project = Project(
@@ -32,43 +52,68 @@ class ProjectService:
             )
 
             # save the project to db
-            project = self.repo.add(project=project)
+            project = await self.repo.add(project=project)
 
             # add a role to the associated table after project is saved
-            self.role_service.add_role(project_id=project.id, user_id=user_id, role=RoleEnum.OWNER)
+            await self.role_service.add_role(project_id=project.id, user_id=user_id, role=RoleEnum.OWNER)
+
+            # the project and its owner role are committed together
+            await self.uow.commit()
             return project
         except DomainValidationError as e:
             raise ProjectCreateError(str(e)) from e
         except DatabaseError as e:
             raise ProjectCreateError(str(e)) from e
 
-    def get_all_projects(self, user_id: UUID) -> list[Project]:
-        """Returns all projects in which the user participates"""
+    async def get_all_projects(
+        self,
+        user_id: UUID,
+        with_counts: bool = False,
+        limit: int = settings.default_page_size,
+        cursor: str | None = None,
+    ) -> Page[ProjectSummary]:
+        """Returns a page of summaries of the projects in which the user participates"""
+        # raises InvalidCursorError
+        after = decode_cursor(cursor) if cursor else None
         try:
-            return self.repo.list_by_user(user_id=user_id)
+            # one extra row tells if there is a next page
+            summaries = await self.repo.list_summaries_by_user(
+                user_id=user_id, with_counts=with_counts, limit=limit + 1, after=after
+            )
+            return build_page(summaries, limit=limit)
         except DatabaseError as e:
             raise ProjectRetrieveError(str(e)) from e
 
-    def get_project(self, project_id: UUID, user_id: UUID) -> Project:
-        project = self.repo.get_by_id(project_id=project_id)
-        if project is None:
+    async def authorize(self, project_id: UUID, user_id: UUID, owner: bool = False) -> str:
+        """
+        Check the user's access to the project with a single indexed query, without loading the project.
+        Returns the user's role, raises ProjectNotFoundError or ProjectPermissionError.
+        """
+        project_exists, role = await self.role_service.get_project_access(project_id=project_id, user_id=user_id)
+        if not project_exists:
             raise ProjectNotFoundError(project_id=project_id)
 
-        # check if user is a participant in this project
-        if not self.is_project_participant(project=project, user_id=user_id):
+        # a participant has a role, an owner has the owner role
+        if role is None or (owner and role != RoleEnum.OWNER):
             raise ProjectPermissionError
+        return role
 
-        # all good - return project
-        return project
+    async def get_project(self, project_id: UUID, user_id: UUID) -> Project:
+        # the aggregate is loaded only for a participant
+        await self.authorize(project_id=project_id, user_id=user_id)
 
-    def update_project(self, project_id: UUID, user_id: UUID, data: ProjectUpdateRequest) -> Project:
-        project = self.repo.get_by_id(project_id=project_id)
+        project = await self.repo.get_by_id(project_id=project_id)
         if project is None:
             raise ProjectNotFoundError(project_id=project_id)
+        return project
 
-        # check if user is a participant in this project
-        if not self.is_project_participant(project=project, user_id=user_id):
-            raise ProjectPermissionError
+    async def update_project(self, project_id: UUID, user_id: UUID, data: ProjectUpdateRequest) -> Project:
+        await self.authorize(project_id=project_id, user_id=user_id)
+
+        # only the project's own columns are updated, the documents and participants aren't needed
+        project = await self.repo.get_details(project_id=project_id)
+        if project is None:
+            raise ProjectNotFoundError(project_id=project_id)
 
         # only include fields that were actually sent
         update_data = data.model_dump(exclude_unset=True)
@@ -78,49 +123,30 @@ class ProjectService:
 
         try:
             # save the changes
-            return self.repo.save(project)
+            project = await self.repo.save(project)
+            await self.uow.commit()
+            return project
         except DatabaseError as e:
             raise ProjectUpdateError(str(e)) from e
 
     async def delete_project(self, project_id: UUID, user_id: UUID) -> bool:
-        project = self.repo.get_by_id(project_id=project_id)
-
-        if project is None:
-            raise ProjectNotFoundError(project_id=project_id)
-
-        # check project ownership here, not in the repository
-        # if not project.is_owned_by(user_id=user_id):
-        #     raise ProjectPermissionError()
-
-        # check if user has owner rights
-        if not self.is_project_owner(project=project, user_id=user_id):
-            raise ProjectPermissionError
+        """
+        Soft delete the project, hidden at once along with its documents and roles. Its rows and files,
+        however many, are removed later by the purge worker, so the request doesn't wait for them.
+        """
+        # only an owner can delete the project
+        await self.authorize(project_id=project_id, user_id=user_id, owner=True)
 
         try:
-            # get all the paths to the documents
-            storage_paths = [doc.storage_path for doc in project.documents]
-
-            # delete the files from storage
-            for path in storage_paths:
-                # doc_service.delete_file(storage_path=path)
-                await self.storage.remove(storage_path=path)
-
-            # delete the project from the database
-            deleted = self.repo.delete(project_id=project_id)
-
-            if not deleted:
+            if not await self.repo.soft_delete(project_id=project_id):
                 raise ProjectDeleteError("Repository deletion returned false")
 
-            return deleted
-        except (DatabaseError, DocumentFileDeleteError) as e:
+            # queued in the same transaction, a committed deletion is always purged
+            await self.purge_jobs.enqueue(kind=PurgeJob.PROJECT, target_id=project_id)
+            await self.uow.commit()
+            # the project's roles went with it, the other workers find it deleted when they check a cached role
+            role_cache.invalidate_where(lambda key: key[1] == project_id)
+        except DatabaseError as e:
             raise ProjectDeleteError(str(e)) from e
 
-    @staticmethod
-    def is_project_owner(project: Project, user_id: UUID) -> bool:
-        """Check if given user has owner role on the project"""
-        return any([p.user_id == user_id and p.role == RoleEnum.OWNER for p in project.participants])
-
-    @staticmethod
-    def is_project_participant(project: Project, user_id: UUID) -> bool:
-        """Check if user is a participant on the project"""
-        return any([p.user_id == user_id and p.role is not None for p in project.participants])
+        return True
@@ -0,0 +1,153 @@
+import asyncio
+from collections import Counter
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from datetime import UTC, datetime, timedelta
+
+from app.domain.enities.purge_job import PurgeJob
+from app.domain.repositories.document_repository import DocumentRepository
+from app.domain.repositories.project_repository import ProjectRepository
+from app.domain.repositories.purge_job_repository import PurgeJobRepository
+from app.domain.repositories.unit_of_work import UnitOfWork
+from app.infrastructure.core.config import settings
+from app.infrastructure.core.logger import logger
+from app.services.blob_service import BlobService
+
+
+class PurgeService:
+    """
+    Removes the soft deleted projects and documents, claimed from the purge queue. A job deletes the rows first,
+    recording the files they pointed to, then removes the files batch by batch, recording what's left after each.
+    A failed job is retried with an exponential backoff and resumes where it stopped.
+
+    A re-upload can't lose its file to a purge: in the per project layout every upload is stored under a new name,
+    so a path recorded by a job is never written again, and a content addressed blob is re-checked under a row lock.
+    """
+
+    def __init__(
+        self,
+        jobs: PurgeJobRepository,
+        project_repo: ProjectRepository,
+        document_repo: DocumentRepository,
+        blob_service: BlobService,
+        uow: UnitOfWork,
+    ):
+        self.jobs = jobs
+        self.project_repo = project_repo
+        self.document_repo = document_repo
+        self.blob_service = blob_service
+        self.uow = uow
+
+    async def run_once(self, batch_size: int = settings.purge_batch_size) -> Counter:
+        """Claim and run a batch of jobs, returns the count of the claimed, purged, retried and failed ones"""
+        jobs = await self.jobs.claim(batch_size=batch_size, lease_seconds=settings.purge_lease_seconds)
+        # the lease is committed at once, the other workers skip these jobs from now on
+        await self.uow.commit()
+
+        outcome = Counter(claimed=len(jobs))
+        for job in jobs:
+            try:
+                await self._purge(job)
+                outcome["purged"] += 1
+            except Exception as e:
+                await self.uow.rollback()
+                outcome["retried" if await self._retry(job, e) else "failed"] += 1
+        return outcome
+
+    async def _purge(self, job: PurgeJob) -> None:
+        if job.storage_paths is None:
+            if job.kind == PurgeJob.PROJECT:
+                # its documents and, by the foreign keys, its roles go in the same two statements
+                storage_paths = await self.project_repo.delete(project_id=job.target_id) or []
+            else:
+                storage_path = await self.document_repo.purge(document_id=job.target_id)
+                storage_paths = [storage_path] if storage_path else []
+
+            job.storage_paths = await self.blob_service.release(storage_paths)
+            await self.jobs.set_storage_paths(job_id=job.id, storage_paths=job.storage_paths)
+            await self.uow.commit()
+
+        size = settings.purge_file_batch_size
+        while job.storage_paths:
+            batch, rest = job.storage_paths[:size], job.storage_paths[size:]
+            # a file a live document still points to is kept, a path written before the upload names were unique
+            referenced = await self.document_repo.referenced_paths(storage_paths=batch)
+            await self.blob_service.remove([path for path in batch if path not in referenced], strict=True)
+
+            job.storage_paths = rest
+            await self.jobs.set_storage_paths(job_id=job.id, storage_paths=rest)
+            await self.uow.commit()
+
+        await self.jobs.complete(job_id=job.id)
+        await self.uow.commit()
+
+    async def _retry(self, job: PurgeJob, error: Exception) -> bool:
+        """Put the job back with a backoff, False if it has run out of attempts"""
+        retry = job.attempts < settings.purge_max_attempts
+        delay = min(settings.purge_backoff_base * 2 ** (job.attempts - 1), settings.purge_backoff_max)
+        available_at = datetime.now(UTC) + timedelta(seconds=delay) if retry else None
+        logger.error(f"Purge of {job.kind} {job.target_id} failed, attempt {job.attempts}: {str(error)}")
+        try:
+            await self.jobs.retry(job_id=job.id, error=str(error), available_at=available_at)
+            await self.uow.commit()
+        except Exception as e:
+            # the lease runs out and the job is claimed again
+            logger.error(f"Failed to reschedule the purge job {job.id}: {str(e)}")
+        return retry
+
+
+class PurgeWorker:
+    """Runs the purge in the background of the app, a batch at a time, till it's stopped"""
+
+    def __init__(
+        self,
+        service_scope: Callable[[], AbstractAsyncContextManager[PurgeService]],
+        batch_size: int = settings.purge_batch_size,
+        poll_interval: float = settings.purge_poll_interval,
+    ):
+        # a PurgeService on a session of its own, for a single batch
+        self.service_scope = service_scope
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        # the jobs claimed, purged, retried and failed since the start
+        self.totals: Counter = Counter()
+        self.last_run_at: datetime | None = None
+        self._stopping = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop once the current batch is done"""
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+
+    async def run_once(self) -> Counter:
+        async with self.service_scope() as service:
+            outcome = await service.run_once(batch_size=self.batch_size)
+        self.totals.update(outcome)
+        self.last_run_at = datetime.now(UTC)
+        return outcome
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                outcome = await self.run_once()
+            except Exception as e:
+                logger.error(f"Purge run failed: {str(e)}")
+                outcome = Counter()
+
+            # a full batch, there are likely more ready jobs
+            if outcome["claimed"] >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+            except TimeoutError:
+                pass
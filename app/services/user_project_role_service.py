@@ -6,45 +6,55 @@ from app.domain.exceptions.user_project_role_exceptions import (
     ProjectRoleAlreadyAssignedError, ProjectRoleCreateError,
     ProjectRoleReadError)
 from app.domain.repositories.project_repository import ProjectRepository
+from app.domain.repositories.unit_of_work import UnitOfWork
 from app.domain.repositories.user_project_role_repository import \
     UserProjectRoleRepository
 from app.domain.repositories.user_repository import UserRepository
+from app.infrastructure.core.cache import role_cache
 from app.infrastructure.core.exceptions import DatabaseError
 from app.routers.schemas.auth_schemas import UserOut
 
 
 class UserProjectRoleService:
-    def __init__(self, repo: UserProjectRoleRepository, user_repo: UserRepository, project_repo=ProjectRepository):
+    def __init__(
+        self,
+        repo: UserProjectRoleRepository,
+        user_repo: UserRepository,
+        uow: UnitOfWork,
+        project_repo=ProjectRepository,
+    ):
         self.repo = repo
         self.user_repo = user_repo
+        self.uow = uow
         self.project_repo = project_repo
 
-    def add_role(self, project_id: UUID, user_id: UUID, role: RoleEnum = RoleEnum.PARTICIPANT):
+    async def add_role(self, project_id: UUID, user_id: UUID, role: RoleEnum = RoleEnum.PARTICIPANT):
+        """Add a role within the caller's unit of work, the caller commits it"""
         role_model = UserProjectRole(project_id=project_id, user_id=user_id, role=role)
         try:
-            return self.repo.add(role_model=role_model)
+            return await self.repo.add(role_model=role_model)
         except DatabaseError as e:
             raise ProjectRoleCreateError(project_id=project_id, role=str(role)) from e
 
-    def add_participant_by_username(self, project_id: UUID, username: str, current_user: UserOut):
+    async def add_participant_by_username(self, project_id: UUID, username: str, current_user: UserOut):
         """Invite a participant to a project"""
 
         role = RoleEnum.PARTICIPANT
 
         # check if the current user, has the owner rights on the project and is authorized to invite participants
-        current_user_role_on_project = self.repo.get_user_role_on_project(
+        current_user_role_on_project = await self.get_user_role_on_project(
             project_id=project_id, user_id=current_user.id
         )
         if current_user_role_on_project != RoleEnum.OWNER:
             raise ProjectRoleAddNotAuthorizedError(username=current_user.username)
 
         # check if the invited user exists
-        user = self.user_repo.get_by_username(username=username)
+        user = await self.user_repo.get_by_username(username=username)
         if user is None:
             raise ProjectRoleAddByUsernameError(username=username)
 
         # check if the invited participant is not already a participant of this project
-        project_role = self.repo.get_user_role_on_project(project_id=project_id, user_id=user.id)
+        project_role = await self.get_user_role_on_project(project_id=project_id, user_id=user.id)
         if project_role is not None:
             raise ProjectRoleAlreadyAssignedError(username=user.username)
 
@@ -53,13 +63,105 @@ class UserProjectRoleService:
 
         # save project role to database
         try:
-            self.repo.add(role_model=role_model)
+            await self.repo.add(role_model=role_model)
+            await self.uow.commit()
         except DatabaseError as e:
             raise ProjectRoleCreateError(project_id=project_id, role=role) from e
 
-    def get_user_role_on_project(self, project_id: UUID, user_id: UUID):
-        """Returns a user role by project"""
+    async def add_participants_by_usernames(
+        self, project_id: UUID, usernames: list[str], current_user: UserOut
+    ) -> list[dict]:
+        """
+        Invite many participants to a project with set based queries: one lookup of the users, one of their roles
+        and one multi-row insert, whatever the number of usernames. Reports the outcome per username.
+        """
+        role = RoleEnum.PARTICIPANT
+
+        # only the owner may invite participants
+        if await self.get_user_role_on_project(project_id=project_id, user_id=current_user.id) != RoleEnum.OWNER:
+            raise ProjectRoleAddNotAuthorizedError(username=current_user.username)
+
+        usernames = list(dict.fromkeys(usernames))
+        try:
+            users = {user.username: user.id for user in await self.user_repo.get_by_usernames(usernames=usernames)}
+            existing = await self.repo.get_project_roles(project_id=project_id, user_ids=list(users.values()))
+            candidates = [user_id for user_id in users.values() if user_id not in existing]
+            # a participant added concurrently is skipped by the insert, so it is not reported as invited
+            inserted = set(await self.repo.add_many(project_id=project_id, user_ids=candidates, role=role))
+            await self.uow.commit()
+        except DatabaseError as e:
+            raise ProjectRoleCreateError(project_id=project_id, role=role) from e
+
+        results = []
+        for username in usernames:
+            user_id = users.get(username)
+            if user_id is None:
+                status = "not_found"
+            elif user_id in inserted:
+                status = "invited"
+            else:
+                status = "already_participant"
+            results.append({"username": username, "status": status})
+        return results
+
+    async def get_project_access(self, project_id: UUID, user_id: UUID) -> tuple[bool, str | None]:
+        """
+        Returns whether the project exists and the user's role on it, with a single query,
+        or the cached role and a primary key lookup that the project is still live
+        """
+        role = role_cache.get((user_id, project_id))
+        if role is not None:
+            # a project soft deleted on another worker is only dropped from that worker's cache
+            if await self._live_project_ids(user_id=user_id, project_ids=[project_id]):
+                return True, role
+            role_cache.invalidate((user_id, project_id))
+            return False, None
         try:
-            self.repo.get_user_role_on_project(project_id=project_id, user_id=user_id)
+            project_exists, role = await self.repo.get_project_access(project_id=project_id, user_id=user_id)
         except DatabaseError as e:
             raise ProjectRoleReadError(user_id=user_id, project_id=project_id) from e
+        if role is not None:
+            role_cache.set((user_id, project_id), role)
+        return project_exists, role
+
+    async def get_user_role_on_project(self, project_id: UUID, user_id: UUID) -> str | None:
+        """Returns a user role by project"""
+        return (await self.get_roles_on_projects(user_id=user_id, project_ids=[project_id])).get(project_id)
+
+    async def get_roles_on_projects(self, user_id: UUID, project_ids: list[UUID]) -> dict[UUID, str]:
+        """
+        Returns the user's roles by project ID, the projects the user doesn't participate in are left out.
+        The roles missing from the cache are fetched with a single query, the projects of the cached ones
+        are checked to be still live with another.
+        """
+        roles: dict[UUID, str] = {}
+        missing = []
+        for project_id in dict.fromkeys(project_ids):
+            role = role_cache.get((user_id, project_id))
+            if role is None:
+                missing.append(project_id)
+            else:
+                roles[project_id] = role
+
+        if roles:
+            # only the roles are cached, a project soft deleted on another worker is still in this one's cache
+            live = await self._live_project_ids(user_id=user_id, project_ids=list(roles))
+            for project_id in [project_id for project_id in roles if project_id not in live]:
+                role_cache.invalidate((user_id, project_id))
+                del roles[project_id]
+
+        if missing:
+            try:
+                fetched = await self.repo.get_user_roles_on_projects(user_id=user_id, project_ids=missing)
+            except DatabaseError as e:
+                raise ProjectRoleReadError(user_id=user_id, project_id=missing[0]) from e
+            for project_id, role in fetched.items():
+                role_cache.set((user_id, project_id), role)
+            roles.update(fetched)
+        return roles
+
+    async def _live_project_ids(self, user_id: UUID, project_ids: list[UUID]) -> set[UUID]:
+        try:
+            return await self.repo.get_live_project_ids(project_ids=project_ids)
+        except DatabaseError as e:
+            raise ProjectRoleReadError(user_id=user_id, project_id=project_ids[0]) from e
@@ -0,0 +1,75 @@
+"""
+Concurrent login throughput versus the bcrypt worker pool size.
+
+Every round verifies `--logins` passwords at once, like that many simultaneous logins, and reports
+the logins per second and the worst event loop stall seen by a 10 ms ticker running next to them.
+The "inline" row is the old behaviour, bcrypt called directly on the event loop.
+
+    python -m scripts.bench_password_hashing --logins 64 --workers 1 2 4 8 --executor thread process
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from app.infrastructure.core.security import PasswordHasher, hash_password, verify_password
+
+TICK = 0.01
+
+
+async def _max_loop_stall(stop: asyncio.Event) -> float:
+    """The longest the event loop went without running this coroutine, above the tick interval"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        worst = max(worst, time.perf_counter() - started - TICK)
+    return worst
+
+
+async def _verify_inline(plain_password: str, hashed_password: str) -> bool:
+    return verify_password(plain_password, hashed_password)
+
+
+async def _round(verify, logins: int, hashed_password: str) -> tuple[float, float]:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_max_loop_stall(stop))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(verify("password", hashed_password) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    stall = await ticker
+    assert all(results)
+    return logins / elapsed, stall
+
+
+async def main(logins: int, workers: list[int], executors: list[str], max_pending: int):
+    hashed_password = hash_password("password")
+    print(f"{logins} concurrent logins, {os.cpu_count()} CPUs")
+    print(f"{'executor':<10}{'workers':>8}{'logins/s':>12}{'max stall ms':>15}")
+
+    throughput, stall = await _round(_verify_inline, logins, hashed_password)
+    print(f"{'inline':<10}{'-':>8}{throughput:>12.1f}{stall * 1000:>15.1f}")
+
+    for executor in executors:
+        for worker_count in workers:
+            hasher = PasswordHasher(executor=executor, workers=worker_count, max_pending=max_pending)
+            try:
+                # warm up, starts the workers (and imports the app in the spawned processes)
+                await asyncio.gather(*(hasher.verify("password", hashed_password) for _ in range(worker_count)))
+                throughput, stall = await _round(hasher.verify, logins, hashed_password)
+            finally:
+                hasher.shutdown()
+            print(f"{executor:<10}{worker_count:>8}{throughput:>12.1f}{stall * 1000:>15.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--executor", nargs="+", default=["thread", "process"], choices=["thread", "process"])
+    parser.add_argument("--max-pending", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, sorted(set(args.workers)), args.executor, args.max_pending))
@@ -0,0 +1,91 @@
+"""
+S3 download throughput at high concurrency, the thread-wrapped boto3 storage versus the native async one.
+
+Runs against a local moto server, start one with `moto_server -p 5000` (pip install "moto[server]"),
+or in this process with --local-server. Every download fetches and reads a whole object, all of them at once.
+The boto3 storage is capped by the default executor's threads, the async one by its connection pool.
+
+    python -m scripts.bench_s3_download --endpoint-url http://localhost:5000 --concurrency 200 --size-kb 256
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+
+from app.infrastructure.core.config import settings
+
+
+async def _download_all(storage, keys: list[str]) -> list[float]:
+    """Downloads every key at once, returns the latency of each download"""
+
+    async def download(key: str) -> float:
+        started = time.perf_counter()
+        s3_object = await storage.download(key)
+        await storage.read_body(s3_object)
+        return time.perf_counter() - started
+
+    return await asyncio.gather(*(download(key) for key in keys))
+
+
+async def main(concurrency: int, size_kb: int, objects: int, pool: int):
+    from app.infrastructure.storage.async_s3_document_storage import \
+        AsyncS3DocumentStorage
+    from app.infrastructure.storage.s3_document_storage import \
+        S3DocumentStorage
+
+    threaded = S3DocumentStorage()
+    keys = [f"bench/object-{index}" for index in range(objects)]
+    body = os.urandom(size_kb * 1024)
+    for key in keys:
+        threaded.client.put_object(Bucket=threaded.bucket_name, Key=key, Body=body)
+    requests = [keys[index % objects] for index in range(concurrency)]
+
+    print(f"{concurrency} concurrent downloads of {size_kb} KB, pool of {pool} connections")
+    print(f"{'client':>10}{'total s':>10}{'MB/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, storage in (("threaded", threaded), ("async", AsyncS3DocumentStorage(max_pool_connections=pool))):
+        # warm up the connections
+        await _download_all(storage, requests[:pool])
+        started = time.perf_counter()
+        latencies = sorted(await _download_all(storage, requests))
+        elapsed = time.perf_counter() - started
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(
+            f"{name:>10}{elapsed:>10.2f}{concurrency * size_kb / 1024 / elapsed:>10.1f}"
+            f"{statistics.median(latencies) * 1000:>10.1f}{p95 * 1000:>10.1f}"
+        )
+        await storage.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint-url", default="http://localhost:5000")
+    parser.add_argument("--local-server", action="store_true", help="start a moto server in this process")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=256)
+    parser.add_argument("--objects", type=int, default=20, help="distinct objects the downloads are spread over")
+    parser.add_argument("--pool", type=int, default=settings.s3_max_pool_connections, help="connection pool size")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    server = None
+    if args.local_server:
+        from moto.server import ThreadedMotoServer
+
+        # the server's request log would drown the results
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        server = ThreadedMotoServer(port=0, verbose=False)
+        server.start()
+        host, port = server.get_host_and_port()
+        args.endpoint_url = f"http://{host}:{port}"
+
+    settings.aws_endpoint_url = args.endpoint_url
+    settings.s3_max_pool_connections = args.pool
+    try:
+        asyncio.run(main(args.concurrency, args.size_kb, args.objects, args.pool))
+    finally:
+        if server is not None:
+            server.stop()
@@ -0,0 +1,72 @@
+"""
+Single stream S3 download proxying, botocore's 1 KiB iter_chunks hopping to the threadpool per chunk
+versus the large-chunk read-ahead adapter of S3DocumentStorage.iter_body.
+
+Reports the throughput and the process CPU time spent per GB served. Runs in process against a mocked S3,
+or against a moto server with --endpoint-url (start one with `moto_server -p 5000`).
+
+    python -m scripts.bench_s3_stream --size-mb 100 --chunk-kb 256
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from starlette.concurrency import iterate_in_threadpool
+
+from app.infrastructure.core.config import settings
+
+MB = 1024 * 1024
+KEY = "bench/stream.bin"
+
+
+async def _consume(chunks) -> int:
+    """Drains the stream as StreamingResponse would, returns the bytes served"""
+    served = 0
+    async for chunk in chunks:
+        served += len(chunk)
+    return served
+
+
+async def main(size_mb: int):
+    from app.infrastructure.storage.s3_document_storage import \
+        S3DocumentStorage
+
+    storage = S3DocumentStorage()
+    storage.client.put_object(Bucket=storage.bucket_name, Key=KEY, Body=os.urandom(size_mb * MB))
+
+    def thread_per_kib(s3_object):
+        # what download_document used to hand to StreamingResponse
+        return iterate_in_threadpool(s3_object["Body"].iter_chunks())
+
+    print(f"{size_mb} MB, {settings.s3_download_chunk_size // 1024} KB chunks, {settings.s3_download_read_ahead} ahead")
+    print(f"{'adapter':>14}{'MB/s':>10}{'CPU s/GB':>10}")
+    for name, iter_body in (("1 KiB threads", thread_per_kib), ("read-ahead", storage.iter_body)):
+        s3_object = await storage.download(KEY)
+        started, cpu_started = time.perf_counter(), time.process_time()
+        served = await _consume(iter_body(s3_object))
+        elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+        print(f"{name:>14}{served / MB / elapsed:>10.1f}{cpu / (served / 1024**3):>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint-url", default=None, help="a moto server, in process mock if omitted")
+    parser.add_argument("--size-mb", type=int, default=100)
+    parser.add_argument("--chunk-kb", type=int, default=settings.s3_download_chunk_size // 1024)
+    parser.add_argument("--read-ahead", type=int, default=settings.s3_download_read_ahead)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    settings.s3_download_chunk_size = args.chunk_kb * 1024
+    settings.s3_download_read_ahead = args.read_ahead
+    if args.endpoint_url:
+        settings.aws_endpoint_url = args.endpoint_url
+        asyncio.run(main(args.size_mb))
+    else:
+        from moto import mock_aws
+
+        with mock_aws():
+            asyncio.run(main(args.size_mb))
@@ -0,0 +1,97 @@
+"""
+S3 upload throughput, the old blocking upload_fileobj versus the non-blocking multipart path of S3DocumentStorage.
+
+Runs against a local moto server, start one with `moto_server -p 5000` (pip install "moto[server]"),
+or in process with --in-process. Next to every upload a 10 ms ticker records the worst event loop stall,
+the blocking upload freezes the loop for the whole transfer.
+
+    python -m scripts.bench_s3_upload --endpoint-url http://localhost:5000 --sizes 1 50 500
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from contextlib import nullcontext
+from uuid import uuid4
+
+from fastapi import UploadFile
+
+from app.infrastructure.core.config import settings
+
+TICK = 0.01
+MB = 1024 * 1024
+
+
+async def _max_loop_stall(stop: asyncio.Event) -> float:
+    """The longest the event loop went without running this coroutine, above the tick interval"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        worst = max(worst, time.perf_counter() - started - TICK)
+    return worst
+
+
+async def _blocking_upload(storage, project_id, uploaded_file: UploadFile):
+    # what S3DocumentStorage.save used to do, a synchronous transfer on the event loop
+    storage.client.upload_fileobj(uploaded_file.file, storage.bucket_name, f"{project_id.hex}/{uploaded_file.filename}")
+
+
+async def _timed(upload, storage, path: str) -> tuple[float, float]:
+    with open(path, "rb") as file:
+        uploaded_file = UploadFile(filename=os.path.basename(path), file=file, headers={"content-type": "application/pdf"})
+        stop = asyncio.Event()
+        ticker = asyncio.create_task(_max_loop_stall(stop))
+        await asyncio.sleep(0)
+        started = time.perf_counter()
+        await upload(storage, uuid4(), uploaded_file)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        return elapsed, await ticker
+
+
+async def main(sizes: list[int], part_size: int, part_concurrency: int):
+    from app.infrastructure.storage.s3_document_storage import S3DocumentStorage
+
+    storage = S3DocumentStorage(part_size=part_size * MB, part_concurrency=part_concurrency)
+
+    async def multipart_upload(storage, project_id, uploaded_file):
+        await storage.save(project_id, uploaded_file)
+
+    print(f"part size {storage.part_size // MB} MB, {storage.part_concurrency} parts at once")
+    print(f"{'size MB':>8}{'method':>12}{'MB/s':>10}{'max stall ms':>15}")
+    for size in sizes:
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as file:
+            # written in 1 MB blocks, so a 500 MB file doesn't need 500 MB of memory
+            for _ in range(size):
+                file.write(os.urandom(MB))
+            file.flush()
+
+            for method, upload in (("blocking", _blocking_upload), ("multipart", multipart_upload)):
+                elapsed, stall = await _timed(upload, storage, file.name)
+                print(f"{size:>8}{method:>12}{size / elapsed:>10.1f}{stall * 1000:>15.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint-url", default="http://localhost:5000")
+    parser.add_argument("--in-process", action="store_true", help="mock S3 in this process instead of a server")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 50, 500], help="file sizes in MB")
+    parser.add_argument("--part-size", type=int, default=settings.s3_part_size // MB, help="in MB")
+    parser.add_argument("--part-concurrency", type=int, default=settings.s3_part_concurrency)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    if args.in_process:
+        from moto import mock_aws
+
+        mock = mock_aws()
+    else:
+        settings.aws_endpoint_url = args.endpoint_url
+        mock = nullcontext()
+
+    with mock:
+        asyncio.run(main(args.sizes, args.part_size, args.part_concurrency))
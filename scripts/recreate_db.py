@@ -1,13 +1,18 @@
-from app.infrastructure.core.database import Base, engine
+from sqlalchemy import text
 
+import app.infrastructure.orm  # noqa: F401  registers the tables on Base.metadata
+from app.infrastructure.core.database import Base, engine
+from app.infrastructure.core.migrations import upgrade_database
 
 
 def run():
     print("Dropping existing database tables...")
     Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
 
     print("Creating new database tables...")
-    Base.metadata.create_all(bind=engine)
+    upgrade_database()
 
     print("Database tables recreated successfully.")
 
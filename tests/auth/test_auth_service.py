@@ -1,3 +1,4 @@
+import asyncio
 import os
 from datetime import datetime, timedelta, timezone
 
@@ -6,7 +7,7 @@ import pytest
 from dotenv import load_dotenv
 from passlib.context import CryptContext
 
-from app.infrastructure.core.security import create_access_token, hash_password, verify_password
+from app.infrastructure.core.security import PasswordHasher, create_access_token, hash_password, verify_password
 
 load_dotenv()
 
@@ -59,3 +60,43 @@ def test_create_access_token(token_secret_key, token_expire_minutes):
     assert result.get("sub") == "test"
     # The token's expiration is within the expected
     assert result.get("exp") <= int(test_expire.timestamp())
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_runs_in_the_worker_pool():
+    hasher = PasswordHasher(executor="thread", workers=2, max_pending=2)
+    try:
+        hashed_password = await hasher.hash("password2")
+        assert await hasher.verify("password2", hashed_password) is True
+        assert await hasher.verify("wrong", hashed_password) is False
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_does_not_block_the_event_loop():
+    hasher = PasswordHasher(executor="thread", workers=1, max_pending=1)
+    hashed_password = hash_password("password3")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.001)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        # more calls than max_pending, the extra ones wait for a slot
+        results = await asyncio.gather(*(hasher.verify("password3", hashed_password) for _ in range(3)))
+    finally:
+        task.cancel()
+        hasher.shutdown()
+    assert results == [True, True, True]
+    # the loop kept running other tasks while bcrypt was hashing
+    assert ticks > 0
+
+
+def test_password_hasher_rejects_an_unknown_executor():
+    with pytest.raises(ValueError):
+        PasswordHasher(executor="gpu")
@@ -0,0 +1,33 @@
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+
+from app.domain.enities.user import User
+from app.infrastructure.core.cache import user_cache
+from app.routers import dependencies
+from app.routers.dependencies import get_current_user
+
+
+@pytest.mark.asyncio
+async def test_current_user_is_cached_by_user_id(monkeypatch):
+    user = User(id=uuid4(), username="user", email="user@a.com", password_hash="hash")
+    repo = AsyncMock()
+    repo.get_by_id.return_value = user
+    token = "token"
+    monkeypatch.setattr(dependencies, "decode_access_token", lambda token: {"sub": str(user.id)})
+    hits = user_cache.hits
+
+    first = await get_current_user(token=token, user_repository=repo)
+    second = await get_current_user(token=token, user_repository=repo)
+
+    assert first == second
+    assert first.id == user.id
+    # only the first request queries the database
+    repo.get_by_id.assert_awaited_once_with(user_id=user.id)
+    assert user_cache.hits == hits + 1
+
+    # once invalidated, the user is loaded again
+    user_cache.invalidate(user.id)
+    await get_current_user(token=token, user_repository=repo)
+    assert repo.get_by_id.await_count == 2
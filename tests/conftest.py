@@ -0,0 +1,63 @@
+from contextlib import contextmanager
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.infrastructure.core.database import Base
+
+
+def enforce_foreign_keys(engine):
+    """SQLite ignores the foreign keys, and so their ON DELETE CASCADE, unless asked per connection"""
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
+@contextmanager
+def _count_queries(engine):
+    """Count the statements sent to the database"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def count_queries():
+    """with count_queries(engine) as statements: the statements sent to the database in the block"""
+    return _count_queries
+
+
+@pytest.fixture
+def db_session():
+    """A sync session bound to a fresh in-memory SQLite database"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    enforce_foreign_keys(engine)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def async_db_session():
+    """An async session bound to a fresh in-memory SQLite database"""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    enforce_foreign_keys(engine.sync_engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
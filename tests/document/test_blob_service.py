@@ -0,0 +1,78 @@
+import io
+from pathlib import Path
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from fastapi import UploadFile
+
+from app.infrastructure.orm import BlobORM
+from app.infrastructure.sqlalchemy_blob_repository import \
+    SQLAlchemyBlobRepository
+from app.infrastructure.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+from app.infrastructure.storage.file_system_document_storage import \
+    FileSystemDocumentStorage
+from app.infrastructure.threaded_repository import ThreadedRepository
+from app.services.blob_service import BlobService
+
+
+def upload(filename: str, content: bytes) -> UploadFile:
+    return UploadFile(filename=filename, file=io.BytesIO(content), headers={"content-type": "application/pdf"})
+
+
+@pytest.fixture
+def blob_service(db_session, tmp_path):
+    return BlobService(
+        FileSystemDocumentStorage(upload_dir=str(tmp_path)),
+        repo=ThreadedRepository(SQLAlchemyBlobRepository(db_session)),
+        uow=ThreadedRepository(SQLAlchemyUnitOfWork(db_session)),
+    )
+
+
+@pytest.mark.asyncio
+async def test_identical_content_is_stored_once(blob_service, db_session):
+    content = b"%PDF-1.7 same content"
+    blob_service.storage.save_blob = AsyncMock(wraps=blob_service.storage.save_blob)
+
+    first = await blob_service.store(uuid4(), upload("a.pdf", content))
+    second = await blob_service.store(uuid4(), upload("renamed.pdf", content))
+    db_session.commit()
+
+    assert first.storage_path == second.storage_path
+    assert (first.file_name, second.file_name) == ("a.pdf", "renamed.pdf")
+    # the second upload wrote nothing
+    blob_service.storage.save_blob.assert_awaited_once()
+    assert Path(first.storage_path).read_bytes() == content
+    assert db_session.query(BlobORM).one().refcount == 2
+
+
+@pytest.mark.asyncio
+async def test_blob_is_removed_with_its_last_reference(blob_service, db_session, tmp_path):
+    stored = await blob_service.store(uuid4(), upload("a.pdf", b"%PDF-1.7 content"))
+    await blob_service.store(uuid4(), upload("b.pdf", b"%PDF-1.7 content"))
+    db_session.commit()
+
+    stale = await blob_service.release([stored.storage_path])
+    db_session.commit()
+    await blob_service.remove(stale)
+    assert stale == []
+    assert Path(stored.storage_path).exists()
+
+    stale = await blob_service.release([stored.storage_path])
+    db_session.commit()
+    await blob_service.remove(stale)
+    assert stale == [stored.storage_path]
+    assert not Path(stored.storage_path).exists()
+    assert db_session.query(BlobORM).count() == 0
+
+
+@pytest.mark.asyncio
+async def test_untracked_files_are_released_as_before(blob_service, tmp_path):
+    legacy = tmp_path / "project" / "old.pdf"
+    legacy.parent.mkdir()
+    legacy.write_bytes(b"old")
+
+    stale = await blob_service.release([str(legacy)])
+    await blob_service.remove(stale)
+
+    assert not legacy.exists()
@@ -0,0 +1,169 @@
+import base64
+import json
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from moto import mock_aws
+
+from app.domain.exceptions.document_exceptions import (
+    DocumentCreateError, DocumentFileSaveError,
+    DocumentUnsupportedStorageBackendError)
+from app.infrastructure.core.exceptions import DatabaseError
+from app.infrastructure.storage.file_system_document_storage import \
+    FileSystemDocumentStorage
+from app.infrastructure.storage.s3_document_storage import S3DocumentStorage
+from app.services.blob_service import BlobService
+from app.services.document_service import DocumentService
+
+
+@pytest.fixture
+def s3_storage(monkeypatch):
+    with mock_aws():
+        monkeypatch.setattr("app.infrastructure.core.config.settings.aws_s3_bucket_name", "test-bucket")
+        yield S3DocumentStorage()
+
+
+def service_for(storage) -> DocumentService:
+    repo = AsyncMock()
+    repo.get_by_filename.return_value = None
+    repo.create.side_effect = lambda project_id, document: document
+    return DocumentService(
+        repo=repo,
+        storage=storage,
+        project_service=AsyncMock(),
+        uow=AsyncMock(),
+        purge_jobs=AsyncMock(),
+        blob_service=BlobService(storage),
+    )
+
+
+def stage(s3_storage, upload, content: bytes, content_type: str = "image/png") -> None:
+    """What the browser's POST leaves in the bucket"""
+    s3_storage.client.put_object(
+        Bucket=s3_storage.bucket_name,
+        Key=upload.storage_path,
+        Body=content,
+        ContentType=content_type,
+        Metadata={"file-name": upload.file_name},
+    )
+
+
+def object_keys(s3_storage) -> list[str]:
+    response = s3_storage.client.list_objects_v2(Bucket=s3_storage.bucket_name)
+    return [item["Key"] for item in response.get("Contents", [])]
+
+
+@pytest.mark.asyncio
+async def test_presigned_post_goes_to_a_staging_key(s3_storage):
+    project_id = uuid4()
+    service = service_for(s3_storage)
+
+    upload = await service.create_upload(
+        project_id=project_id, user_id=uuid4(), file_name="My Doc.PDF", content_type="image/png"
+    )
+
+    assert upload.file_name == "my_doc.pdf"
+    assert upload.storage_path == f"uploads/{project_id.hex}/{upload.upload_id.hex}"
+    assert upload.fields["key"] == upload.storage_path
+    policy = json.loads(base64.b64decode(upload.fields["policy"]))
+    assert {"Content-Type": "image/png"} in policy["conditions"]
+    assert {"x-amz-meta-file-name": "my_doc.pdf"} in policy["conditions"]
+    assert ["content-length-range", 1, 5 * 1024 * 1024] in policy["conditions"]
+    service.project_service.authorize.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_complete_upload_moves_the_file_and_creates_the_document(s3_storage):
+    project_id = uuid4()
+    service = service_for(s3_storage)
+    upload = await service.create_upload(
+        project_id=project_id, user_id=uuid4(), file_name="scan.png", content_type="image/png"
+    )
+    content = b"\x89PNG\r\n\x1a\n data"
+    stage(s3_storage, upload, content)
+
+    details = {"name": "scan", "description": None}
+    document = await service.complete_upload(
+        project_id=project_id, user_id=uuid4(), upload_id=upload.upload_id, details=details
+    )
+
+    assert document.storage_path.startswith(f"{project_id.hex}/") and document.storage_path.endswith("_scan.png")
+    assert document.storage_backend == "s3"
+    assert document.size == len(content)
+    assert document.detected_content_type == "image/png"
+    assert document.sha256 is None
+    assert object_keys(s3_storage) == [document.storage_path]
+    service.uow.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_a_rejected_upload_leaves_the_live_file_alone(s3_storage, monkeypatch):
+    project_id = uuid4()
+    service = service_for(s3_storage)
+    live_key = f"{project_id.hex}/scan.png"
+    s3_storage.client.put_object(Bucket=s3_storage.bucket_name, Key=live_key, Body=b"current")
+    upload = await service.create_upload(
+        project_id=project_id, user_id=uuid4(), file_name="scan.png", content_type="image/png"
+    )
+    stage(s3_storage, upload, b"replacement")
+    # staged before the limit was lowered
+    monkeypatch.setattr("app.infrastructure.core.config.settings.allowed_types", ["application/pdf"])
+
+    with pytest.raises(DocumentFileSaveError):
+        await service.complete_upload(project_id=project_id, user_id=uuid4(), upload_id=upload.upload_id, details={})
+
+    assert object_keys(s3_storage) == [live_key]
+    live = s3_storage.client.get_object(Bucket=s3_storage.bucket_name, Key=live_key)
+    assert live["Body"].read() == b"current"
+    service.repo.save.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_the_file_of_an_unrecorded_upload_is_removed(s3_storage):
+    project_id = uuid4()
+    service = service_for(s3_storage)
+    service.repo.create.side_effect = DatabaseError("connection lost")
+    upload = await service.create_upload(
+        project_id=project_id, user_id=uuid4(), file_name="scan.png", content_type="image/png"
+    )
+    stage(s3_storage, upload, b"\x89PNG\r\n\x1a\n data")
+
+    with pytest.raises(DocumentCreateError):
+        await service.complete_upload(project_id=project_id, user_id=uuid4(), upload_id=upload.upload_id, details={})
+
+    assert object_keys(s3_storage) == []
+
+
+@pytest.mark.asyncio
+async def test_complete_upload_without_a_staged_upload(s3_storage):
+    project_id = uuid4()
+    service = service_for(s3_storage)
+    # an existing document's file, completing its name without uploading must not re-record it
+    s3_storage.client.put_object(Bucket=s3_storage.bucket_name, Key=f"{project_id.hex}/scan.png", Body=b"current")
+
+    with pytest.raises(DocumentFileSaveError):
+        await service.complete_upload(project_id=project_id, user_id=uuid4(), upload_id=uuid4(), details={})
+    service.repo.get_by_filename.assert_not_awaited()
+    service.repo.create.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_an_upload_staged_in_another_project_is_not_found(s3_storage):
+    service = service_for(s3_storage)
+    upload = await service.create_upload(
+        project_id=uuid4(), user_id=uuid4(), file_name="scan.png", content_type="image/png"
+    )
+    stage(s3_storage, upload, b"\x89PNG\r\n\x1a\n data")
+
+    with pytest.raises(DocumentFileSaveError):
+        await service.complete_upload(project_id=uuid4(), user_id=uuid4(), upload_id=upload.upload_id, details={})
+    assert object_keys(s3_storage) == [upload.storage_path]
+
+
+@pytest.mark.asyncio
+async def test_direct_uploads_need_s3(tmp_path):
+    service = service_for(FileSystemDocumentStorage(upload_dir=str(tmp_path)))
+
+    with pytest.raises(DocumentUnsupportedStorageBackendError):
+        await service.create_upload(project_id=uuid4(), user_id=uuid4(), file_name="a.png", content_type="image/png")
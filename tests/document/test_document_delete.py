@@ -0,0 +1,51 @@
+from unittest.mock import AsyncMock, Mock
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.domain.enities.user_project_role import RoleEnum
+from app.main import app
+from app.routers.dependencies import get_current_user, get_document_service
+from app.routers.schemas.auth_schemas import UserOut
+from app.services.document_service import DocumentService
+
+
+@pytest.fixture
+def service():
+    repo = AsyncMock()
+    repo.get_with_role.return_value = (Mock(), RoleEnum.OWNER)
+    repo.soft_delete.return_value = True
+    service = DocumentService(
+        repo=repo, storage=Mock(), project_service=AsyncMock(), uow=AsyncMock(), purge_jobs=AsyncMock()
+    )
+    user = UserOut(id=uuid4(), email="owner@example.com", username="owner")
+
+    providers = dict(app.dependency_overrides)
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_document_service] = lambda: service
+    yield service
+    app.dependency_overrides = providers
+
+
+def test_delete_document_is_soft_and_queues_the_purge(service):
+    document_id = uuid4()
+
+    response = TestClient(app).delete(f"/projects/{uuid4()}/documents/{document_id}")
+
+    assert response.status_code == 202
+    # hidden and queued in one transaction, the row and the file are left to the purge worker
+    service.repo.soft_delete.assert_awaited_once_with(document_id=document_id)
+    service.purge_jobs.enqueue.assert_awaited_once_with(kind="document", target_id=document_id)
+    service.uow.commit.assert_awaited_once()
+    service.repo.delete.assert_not_called()
+
+
+def test_delete_document_needs_the_owner(service):
+    service.repo.get_with_role.return_value = (Mock(), RoleEnum.PARTICIPANT)
+
+    response = TestClient(app).delete(f"/projects/{uuid4()}/documents/{uuid4()}")
+
+    assert response.status_code == 400
+    service.repo.soft_delete.assert_not_called()
+    service.purge_jobs.enqueue.assert_not_called()
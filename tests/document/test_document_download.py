@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from moto import mock_aws
+
+from app.domain.enities.document import Document
+from app.domain.exceptions.document_exceptions import \
+    DocumentRangeNotSatisfiableError
+from app.infrastructure.storage.s3_document_storage import S3DocumentStorage
+from app.services.document_service import DocumentService
+
+CONTENT = b"%PDF-1.7 " + bytes(range(256)) * 4
+
+
+async def send_response(response, headers: dict | None = None) -> tuple[int, dict, bytes]:
+    """Runs the ASGI response, returns its status, headers and body"""
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    }
+    messages = []
+
+    async def receive():
+        # the client stays connected
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    await response(scope, receive, send)
+    start = messages[0]
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, body
+
+
+def service_for(document: Document, storage=None) -> DocumentService:
+    service = DocumentService(
+        repo=None, storage=storage, project_service=None, uow=None, purge_jobs=None, blob_service=AsyncMock()
+    )
+    service.get_document = AsyncMock(return_value=document)
+    return service
+
+
+def document_at(storage_path: str, storage_backend: str, sha256: str | None) -> Document:
+    return Document(
+        id=uuid4(),
+        file_name="doc.pdf",
+        project_id=uuid4(),
+        content_type="application/pdf",
+        storage_path=storage_path,
+        created_at=datetime.now(UTC),
+        storage_backend=storage_backend,
+        size=len(CONTENT),
+        sha256=sha256,
+    )
+
+
+@pytest.fixture
+def local_document(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(CONTENT)
+    return document_at(str(path), "local", hashlib.sha256(CONTENT).hexdigest())
+
+
+@pytest.fixture
+def s3_storage(monkeypatch):
+    with mock_aws():
+        monkeypatch.setattr("app.infrastructure.core.config.settings.aws_s3_bucket_name", "test-bucket")
+        storage = S3DocumentStorage()
+        storage.client.put_object(Bucket=storage.bucket_name, Key="p/doc.pdf", Body=CONTENT)
+        yield storage
+
+
+@pytest.mark.asyncio
+async def test_unchanged_document_is_not_modified(local_document):
+    service = service_for(local_document)
+    etag = f'"{local_document.sha256}"'
+
+    response = await service.download_document(uuid4(), local_document.id, if_none_match=f'"other", {etag}')
+    status, headers, body = await send_response(response)
+
+    assert (status, headers["etag"], body) == (304, etag, b"")
+
+
+@pytest.mark.asyncio
+async def test_local_range(local_document):
+    service = service_for(local_document)
+    etag = f'"{local_document.sha256}"'
+
+    response = await service.download_document(uuid4(), local_document.id, range_header="bytes=10-19")
+    status, headers, body = await send_response(response, {"Range": "bytes=10-19"})
+    assert (status, body, headers["etag"]) == (206, CONTENT[10:20], etag)
+    assert headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+
+    # the file changed since the client's copy, If-Range asks for all of it
+    response = await service.download_document(uuid4(), local_document.id)
+    status, _, body = await send_response(response, {"Range": "bytes=10-19", "If-Range": '"stale"'})
+    assert (status, body) == (200, CONTENT)
+
+
+@pytest.mark.asyncio
+async def test_s3_single_range_is_forwarded(s3_storage):
+    document = document_at("p/doc.pdf", "s3", hashlib.sha256(CONTENT).hexdigest())
+    service = service_for(document, s3_storage)
+
+    response = await service.download_document(uuid4(), document.id, range_header="bytes=-100")
+    status, headers, body = await send_response(response)
+
+    assert (status, body) == (206, CONTENT[-100:])
+    assert headers["content-range"] == f"bytes {len(CONTENT) - 100}-{len(CONTENT) - 1}/{len(CONTENT)}"
+    assert headers["etag"] == f'"{document.sha256}"'
+
+
+@pytest.mark.asyncio
+async def test_s3_multipart_ranges(s3_storage):
+    # a legacy document, the size comes from S3
+    document = document_at("p/doc.pdf", "s3", None)
+    document.size = None
+    service = service_for(document, s3_storage)
+
+    response = await service.download_document(uuid4(), document.id, range_header="bytes=0-4, 100-109")
+    status, headers, body = await send_response(response)
+
+    assert status == 206
+    assert headers["content-type"].startswith("multipart/byteranges; boundary=")
+    assert int(headers["content-length"]) == len(body)
+    assert CONTENT[0:5] in body and CONTENT[100:110] in body
+    assert f"Content-Range: bytes 100-109/{len(CONTENT)}".encode() in body
+
+
+@pytest.mark.asyncio
+async def test_s3_too_many_ranges_get_the_whole_file(s3_storage, monkeypatch):
+    monkeypatch.setattr("app.infrastructure.core.config.settings.max_byte_ranges", 2)
+    document = document_at("p/doc.pdf", "s3", None)
+    service = service_for(document, s3_storage)
+
+    # the first two overlap, merged into one they fit the limit
+    response = await service.download_document(uuid4(), document.id, range_header="bytes=0-9, 5-14, 100-109")
+    status, _, body = await send_response(response)
+    assert status == 206
+    assert CONTENT[0:15] in body and CONTENT[100:110] in body
+
+    response = await service.download_document(uuid4(), document.id, range_header="bytes=0-9, 50-59, 100-109")
+    status, _, body = await send_response(response)
+    assert (status, body) == (200, CONTENT)
+
+
+@pytest.mark.asyncio
+async def test_s3_unsatisfiable_range(s3_storage):
+    document = document_at("p/doc.pdf", "s3", None)
+    service = service_for(document, s3_storage)
+
+    with pytest.raises(DocumentRangeNotSatisfiableError) as exc_info:
+        await service.download_document(uuid4(), document.id, range_header=f"bytes={len(CONTENT)}-")
+    assert exc_info.value.size == len(CONTENT)
+
+
+@pytest.mark.asyncio
+async def test_s3_redirect_mode(s3_storage, monkeypatch):
+    monkeypatch.setattr("app.infrastructure.core.config.settings.s3_download_mode", "redirect")
+    document = document_at("p/doc.pdf", "s3", hashlib.sha256(CONTENT).hexdigest())
+    service = service_for(document, s3_storage)
+
+    response = await service.download_document(uuid4(), document.id)
+    status, headers, _ = await send_response(response)
+
+    assert status == 307
+    assert headers["location"].startswith("https://")
+    assert "p/doc.pdf" in headers["location"] and "response-content-disposition" in headers["location"]
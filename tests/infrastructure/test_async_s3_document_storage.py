@@ -0,0 +1,94 @@
+import hashlib
+import io
+import os
+from uuid import uuid4
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import UploadFile
+from moto.server import ThreadedMotoServer
+
+from app.infrastructure.storage.async_s3_document_storage import \
+    AsyncS3DocumentStorage
+
+
+@pytest.fixture(scope="module")
+def moto_server():
+    """A local moto server, the in process mock doesn't patch aiobotocore's HTTP client"""
+    server = ThreadedMotoServer(port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    yield f"http://{host}:{port}"
+    server.stop()
+
+
+@pytest_asyncio.fixture
+async def storage(moto_server, monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setattr("app.infrastructure.core.config.settings.aws_endpoint_url", moto_server)
+    monkeypatch.setattr("app.infrastructure.core.config.settings.aws_s3_bucket_name", f"test-{uuid4().hex}")
+
+    storage = AsyncS3DocumentStorage(max_pool_connections=4)
+    yield storage
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_save_download_and_remove(storage):
+    content = b"%PDF-1.7 " + os.urandom(4096)
+    upload = UploadFile(filename="doc.pdf", file=io.BytesIO(content), headers={"content-type": "application/pdf"})
+
+    stored = await storage.save(uuid4(), upload)
+    assert stored.sha256 == hashlib.sha256(content).hexdigest()
+
+    s3_object = await storage.download(stored.storage_path)
+    assert b"".join([chunk async for chunk in storage.iter_body(s3_object)]) == content
+
+    s3_object = await storage.download(stored.storage_path, byte_range=(0, 7))
+    assert await storage.read_body(s3_object) == b"%PDF-1.7"
+
+    await storage.remove(stored.storage_path)
+    response = storage.client.list_objects_v2(Bucket=storage.bucket_name)
+    assert "Contents" not in response
+
+
+@pytest.mark.asyncio
+async def test_multipart_upload(storage):
+    storage.part_size = storage.MIN_PART_SIZE
+    content = b"%PDF-" + os.urandom(2 * storage.MIN_PART_SIZE + 1024)
+    upload = UploadFile(filename="big.pdf", file=io.BytesIO(content), headers={"content-type": "application/pdf"})
+
+    stored = await storage.save(uuid4(), upload)
+
+    assert (await storage.head(stored.storage_path))["ContentLength"] == len(content)
+    assert stored.size == len(content)
+
+
+@pytest.mark.asyncio
+async def test_stat_upload_without_a_staged_upload(storage):
+    assert await storage.stat_upload(uuid4(), uuid4()) is None
+
+
+@pytest.mark.asyncio
+async def test_a_posted_upload_is_staged_then_promoted(storage):
+    project_id = uuid4()
+    content = b"%PDF-1.7 " + os.urandom(1024)
+    upload = storage.create_presigned_upload(
+        project_id, "Report.PDF", "application/pdf", max_size=len(content), expires_in=60
+    )
+    # the browser's form POST
+    response = httpx.post(upload.url, data=upload.fields, files={"file": ("Report.PDF", content)})
+    assert response.status_code == 204
+
+    staged = await storage.stat_upload(project_id, upload.upload_id)
+    assert (staged.file_name, staged.size, staged.content_type) == ("report.pdf", len(content), "application/pdf")
+    assert staged.detected_content_type == "application/pdf"
+
+    stored = await storage.promote_upload(project_id, staged)
+
+    assert stored.storage_path.startswith(f"{project_id.hex}/") and stored.storage_path.endswith("_report.pdf")
+    assert await storage.stat_upload(project_id, upload.upload_id) is None
+    s3_object = await storage.download(stored.storage_path)
+    assert await storage.read_body(s3_object) == content
@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.domain.enities import Project
+from app.domain.enities.user_project_role import RoleEnum, UserProjectRole
+from app.infrastructure import (AsyncSQLAlchemyProjectRepository,
+                                AsyncSQLAlchemyUserProjectRoleRepository)
+from app.infrastructure.orm import DocumentORM, UserORM
+
+
+@pytest.mark.asyncio
+async def test_add_and_list_by_user(async_db_session):
+    user = UserORM(id=uuid4(), username="owner", email="owner@a.com", password_hash="hash")
+    async_db_session.add(user)
+    await async_db_session.commit()
+
+    repo = AsyncSQLAlchemyProjectRepository(async_db_session)
+    role_repo = AsyncSQLAlchemyUserProjectRoleRepository(async_db_session)
+
+    project = Project(id=uuid4(), name="test", description="desc", owner=user.id, created_at=datetime.now(timezone.utc))
+    created = await repo.add(project)
+    await role_repo.add(UserProjectRole(user_id=user.id, project_id=created.id, role=RoleEnum.OWNER))
+
+    async_db_session.add(
+        DocumentORM(
+            file_name="file.png",
+            project_id=created.id,
+            content_type="image/png",
+            storage_path="documents/file.png",
+            storage_backend="local",
+        )
+    )
+    await async_db_session.commit()
+    # drop the identity map so the relationships have to be loaded again
+    async_db_session.expunge_all()
+
+    projects = await repo.list_by_user(user_id=user.id)
+
+    assert [p.id for p in projects] == [created.id]
+    assert [d.file_name for d in projects[0].documents] == ["file.png"]
+    assert [(p.username, p.role) for p in projects[0].participants] == [("owner", RoleEnum.OWNER)]
+    assert await role_repo.get_user_role_on_project(project_id=created.id, user_id=user.id) == RoleEnum.OWNER
+
+
+@pytest.mark.asyncio
+async def test_get_by_id_not_found(async_db_session):
+    repo = AsyncSQLAlchemyProjectRepository(async_db_session)
+
+    assert await repo.get_by_id(project_id=uuid4()) is None
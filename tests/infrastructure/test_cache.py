@@ -0,0 +1,40 @@
+from app.infrastructure.core import cache as cache_module
+from app.infrastructure.core.cache import TTLCache
+
+
+def test_hits_misses_and_invalidation():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+    assert cache.stats() == {"hits": 1, "misses": 2, "size": 0}
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # "a" is used, so "b" is the least recently used one
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_entries_expire(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now)
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+
+    now += 59
+    assert cache.get("a") == 1
+    now += 2
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
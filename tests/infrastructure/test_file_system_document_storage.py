@@ -1,8 +1,12 @@
+import asyncio
+import hashlib
 import io, pytest
+from pathlib import Path
 from uuid import uuid4
 
 from fastapi import UploadFile
 
+from app.domain.storage.utils import sniff_content_type
 from app.infrastructure.storage.file_system_document_storage import FileSystemDocumentStorage
 
 
@@ -19,17 +23,99 @@ async def test_save(tmp_path, storage):
     file_content = b"\x89PNG\r\n"
     upload = UploadFile(filename="test.png", file=io.BytesIO(file_content), headers={"content-type": "image/png"})
 
-    file_name, ctype, path, backend = await storage.save(project_id, upload)
+    stored = await storage.save(project_id, upload)
 
-    assert file_name == "test.png"
-    assert ctype == "image/png"
-    assert backend == "local"
+    assert stored.file_name == "test.png"
+    assert stored.content_type == "image/png"
+    assert stored.storage_backend == "local"
 
-    with open(path, "rb") as file:
+    with open(stored.storage_path, "rb") as file:
         content = file.read()
     assert content == file_content
 
 
+@pytest.mark.asyncio
+async def test_save_streams_in_chunks(tmp_path, storage):
+    storage.upload_dir = tmp_path
+    storage.chunk_size = 1024
+
+    file_content = b"%PDF-1.7\n" + bytes(range(256)) * 40
+    upload = UploadFile(filename="report.pdf", file=io.BytesIO(file_content), headers={"content-type": "application/pdf"})
+    reads = []
+    read = upload.read
+
+    async def spy(size=-1):
+        reads.append(size)
+        return await read(size)
+
+    upload.read = spy
+
+    stored = await storage.save(uuid4(), upload)
+
+    # the file is never read whole
+    assert set(reads) == {1024}
+    assert stored.size == len(file_content)
+    assert stored.sha256 == hashlib.sha256(file_content).hexdigest()
+    assert stored.detected_content_type == "application/pdf"
+    assert Path(stored.storage_path).read_bytes() == file_content
+    assert list(Path(stored.storage_path).parent.iterdir()) == [Path(stored.storage_path)]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_to_one_blob_dont_collide(tmp_path, storage):
+    storage.upload_dir = tmp_path
+    storage.chunk_size = 4
+    file_content = b"%PDF-1.7\n" * 8
+    path = storage.blob_path(hashlib.sha256(file_content).hexdigest())
+
+    def upload():
+        upload = UploadFile(filename="report.pdf", file=io.BytesIO(file_content))
+        read = upload.read
+
+        async def interleaved(size=-1):
+            # hand over to the other write between chunks
+            await asyncio.sleep(0)
+            return await read(size)
+
+        upload.read = interleaved
+        return upload
+
+    await asyncio.gather(storage.save_blob(path, upload()), storage.save_blob(path, upload()))
+
+    assert Path(path).read_bytes() == file_content
+    assert list(Path(path).parent.iterdir()) == [Path(path)]
+
+
+@pytest.mark.asyncio
+async def test_a_failed_write_leaves_no_partial_file(tmp_path, storage):
+    storage.upload_dir = tmp_path
+    upload = UploadFile(filename="report.pdf", file=io.BytesIO(b"%PDF-1.7\n"))
+
+    async def broken(size=-1):
+        raise OSError("connection reset")
+
+    upload.read = broken
+
+    with pytest.raises(OSError):
+        await storage.save(uuid4(), upload)
+
+    assert [path for path in tmp_path.rglob("*") if path.is_file()] == []
+
+
+@pytest.mark.parametrize(
+    "head, content_type",
+    [
+        (b"\x89PNG\r\n\x1a\n\x00\x00", "image/png"),
+        (b"\xff\xd8\xff\xe0\x00\x10JFIF", "image/jpeg"),
+        (b"%PDF-1.4", "application/pdf"),
+        (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "image/webp"),
+        (b"plain text", None),
+    ],
+)
+def test_sniff_content_type(head, content_type):
+    assert sniff_content_type(head) == content_type
+
+
 @pytest.mark.asyncio
 async def test_remove_image(tmp_path, storage):
     storage.upload_dir = tmp_path
@@ -55,4 +141,19 @@ async def test_remove_image(tmp_path, storage):
     assert not file_path.exists()
 
     # Assert: parent directory is removed if empty
-    assert not project_dir.exists()
\ No newline at end of file
+    assert not project_dir.exists()
+
+@pytest.mark.asyncio
+async def test_remove_many(tmp_path, storage):
+    emptied, kept = tmp_path / uuid4().hex, tmp_path / uuid4().hex
+    emptied.mkdir()
+    kept.mkdir()
+    paths = [emptied / f"{index}.pdf" for index in range(50)] + [kept / "a.pdf"]
+    for path in paths + [kept / "b.pdf"]:
+        path.write_bytes(b"%PDF-1.7")
+
+    # an already deleted file is not an error
+    await storage.remove_many([str(path) for path in paths] + [str(emptied / "gone.pdf")])
+
+    assert not emptied.exists()
+    assert [path.name for path in kept.iterdir()] == ["b.pdf"]
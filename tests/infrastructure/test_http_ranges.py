@@ -0,0 +1,75 @@
+import pytest
+
+from app.infrastructure.core.http_ranges import (etag_matches,
+                                                 multipart_byteranges,
+                                                 parse_range_header,
+                                                 strong_etag)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-9", [(0, 9)]),
+        ("bytes=90-", [(90, 99)]),
+        ("bytes=-10", [(90, 99)]),
+        ("bytes=95-200", [(95, 99)]),
+        ("bytes=0-0, 50-59", [(0, 0), (50, 59)]),
+        # sorted, the overlapping and adjacent ranges merged
+        ("bytes=50-59, 0-0", [(0, 0), (50, 59)]),
+        ("bytes=0-9, 5-19, 20-29, -10", [(0, 29), (90, 99)]),
+        ("bytes=0-9, 0-9, 0-9", [(0, 9)]),
+        ("bytes=-500", [(0, 99)]),
+        # nothing inside the file
+        ("bytes=100-", []),
+        # malformed headers are ignored
+        (None, None),
+        ("items=0-9", None),
+        ("bytes=9-0", None),
+        ("bytes=-", None),
+        ("bytes=a-b", None),
+    ],
+)
+def test_parse_range_header(header, expected):
+    assert parse_range_header(header, size=100) == expected
+
+
+def test_too_many_ranges_are_ignored():
+    header = "bytes=" + ", ".join(f"{start}-{start}" for start in range(0, 40, 2))
+
+    assert len(parse_range_header(header, size=100)) == 20
+    assert parse_range_header(header, size=100, max_ranges=16) is None
+    # merged first, a thousand copies of one range are a single range
+    assert parse_range_header("bytes=" + ", ".join(["0-9"] * 1000), size=100, max_ranges=16) == [(0, 9)]
+
+
+def test_etag_matches():
+    etag = strong_etag("abc")
+    assert etag == '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"x", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"x"', etag)
+    assert not etag_matches("*", None)
+    assert strong_etag(None) is None
+
+
+@pytest.mark.asyncio
+async def test_multipart_byteranges():
+    content = b"0123456789"
+
+    async def read_range(start, end):
+        async def chunks():
+            yield content[start : end + 1]
+
+        return chunks()
+
+    content_length, body = multipart_byteranges(
+        [(0, 1), (5, 9)], size=len(content), content_type="text/plain", boundary="b", read_range=read_range
+    )
+    data = b"".join([chunk async for chunk in body])
+
+    assert len(data) == content_length
+    assert data == (
+        b"--b\r\nContent-Type: text/plain\r\nContent-Range: bytes 0-1/10\r\n\r\n01\r\n"
+        b"--b\r\nContent-Type: text/plain\r\nContent-Range: bytes 5-9/10\r\n\r\n56789\r\n--b--\r\n"
+    )
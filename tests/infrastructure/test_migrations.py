@@ -0,0 +1,39 @@
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect
+
+from app.infrastructure.core.database import Base
+from app.infrastructure.core.migrations import (BASELINE_REVISION, alembic_config,
+                                               upgrade_database)
+
+
+def test_migrations_build_the_schema_of_the_models():
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        upgrade_database(connection)
+
+        # SQLite reflects UUID columns as NUMERIC, so only tables, columns, indexes and constraints are compared
+        context = MigrationContext.configure(connection, opts={"compare_type": False})
+        assert compare_metadata(context, Base.metadata) == []
+        connection.commit()
+
+        command.downgrade(alembic_config(connection), "base")
+        assert inspect(connection).get_table_names() == ["alembic_version"]
+    engine.dispose()
+
+
+def test_a_database_built_by_create_all_is_stamped_before_the_upgrade():
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        # the initial schema, as create_all built it before the migrations existed
+        command.upgrade(alembic_config(connection), BASELINE_REVISION)
+        connection.exec_driver_sql("DROP TABLE alembic_version")
+        connection.commit()
+
+        upgrade_database(connection)
+
+        context = MigrationContext.configure(connection)
+        assert context.get_current_revision() == ScriptDirectory.from_config(alembic_config()).get_current_head()
+    engine.dispose()
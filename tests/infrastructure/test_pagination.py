@@ -0,0 +1,40 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.domain.exceptions.domain_exceptions import InvalidCursorError
+from app.infrastructure.core.pagination import (build_page, decode_cursor,
+                                                encode_cursor)
+
+
+@dataclass
+class Item:
+    id: UUID
+    created_at: datetime
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+    item_id = uuid4()
+
+    assert decode_cursor(encode_cursor(created_at=created_at, item_id=item_id)) == (created_at, item_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "W10", "WyJhIiwgImIiXQ"])
+def test_decode_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_build_page():
+    items = [Item(id=uuid4(), created_at=datetime.now(timezone.utc)) for _ in range(3)]
+
+    last_page = build_page(items, limit=3)
+    assert last_page.items == items
+    assert last_page.next_cursor is None
+
+    page = build_page(items, limit=2)
+    assert page.items == items[:2]
+    assert decode_cursor(page.next_cursor) == (items[1].created_at, items[1].id)
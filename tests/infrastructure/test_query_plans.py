@@ -0,0 +1,167 @@
+import random
+import re
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.infrastructure import (SQLAlchemyProjectRepository,
+                                SQLAlchemyUserRepository)
+from app.infrastructure.core.database import Base
+from app.infrastructure.core.migrations import upgrade_database
+from app.infrastructure.orm import (DocumentORM, ProjectORM, UserORM,
+                                    UserProjectRoleORM)
+from app.infrastructure.sqlalchemy_documet_repository import \
+    SQLAlchemyDocumentRepository
+from app.infrastructure.sqlalchemy_user_project_role_repository import \
+    SQLAlchemyUserProjectRoleRepository
+
+USERS, PROJECTS, PARTICIPANTS, DOCUMENTS = 50, 200, 5, 20
+
+# "SCAN documents" is a full table scan, "SCAN documents USING INDEX ..." walks a whole index
+FULL_SCAN = re.compile(r"^SCAN (\w+)")
+
+
+@pytest.fixture(scope="module")
+def connection():
+    """A database built by the migrations (not create_all), seeded and analyzed"""
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        upgrade_database(connection)
+
+        random.seed(7)
+        with Session(bind=connection) as session:
+            users = [
+                UserORM(id=uuid4(), username=f"user{u}", email=f"user{u}@a.com", password_hash="hash")
+                for u in range(USERS)
+            ]
+            session.add_all(users)
+            for p in range(PROJECTS):
+                owner, *participants = random.sample(users, PARTICIPANTS + 1)
+                project = ProjectORM(id=uuid4(), name=f"project{p}", description="desc", owner_id=owner.id)
+                session.add(project)
+                session.add(UserProjectRoleORM(user_id=owner.id, project_id=project.id, role="owner"))
+                session.add_all(
+                    UserProjectRoleORM(user_id=user.id, project_id=project.id, role="participant")
+                    for user in participants
+                )
+                session.add_all(
+                    DocumentORM(
+                        file_name=f"file{d}.png",
+                        project_id=project.id,
+                        content_type="image/png",
+                        storage_path=f"documents/file{d}.png",
+                        storage_backend="local",
+                    )
+                    for d in range(DOCUMENTS)
+                )
+            session.commit()
+
+        connection.exec_driver_sql("ANALYZE")
+        connection.commit()
+        yield connection
+    engine.dispose()
+
+
+@pytest.fixture
+def session(connection):
+    with Session(bind=connection) as session:
+        yield session
+        session.rollback()
+
+
+@pytest.fixture
+def sample(session):
+    """A participant, one of their projects and a document in it"""
+    role = session.query(UserProjectRoleORM).filter(UserProjectRoleORM.role == "participant").first()
+    document = session.query(DocumentORM).filter(DocumentORM.project_id == role.project_id).first()
+    user = session.get(UserORM, role.user_id)
+    return user, role.project_id, document
+
+
+def full_scans(session: Session, call) -> list[tuple[str, str]]:
+    """Run `call`, then EXPLAIN every statement it sent and return the (statement, plan row) of the full scans"""
+    connection = session.connection()
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", before_cursor_execute)
+    try:
+        call()
+    finally:
+        event.remove(connection, "before_cursor_execute", before_cursor_execute)
+
+    assert statements, "the call sent no statements"
+    tables = set(Base.metadata.tables)
+    scans = []
+    for statement, parameters in statements:
+        for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+            match = FULL_SCAN.match(row.detail)
+            if match and match.group(1) in tables:
+                scans.append((statement, row.detail))
+    return scans
+
+
+HOT_QUERIES = {
+    "user.get_by_id": lambda s, user, project_id, document: SQLAlchemyUserRepository(s).get_by_id(user.id),
+    "user.get_by_username": lambda s, user, *_: SQLAlchemyUserRepository(s).get_by_username(user.username),
+    "user.get_by_email": lambda s, user, *_: SQLAlchemyUserRepository(s).get_by_email(user.email),
+    "project.list_by_user": lambda s, user, *_: SQLAlchemyProjectRepository(s).list_by_user(user.id),
+    "project.list_summaries_by_user": lambda s, user, *_: SQLAlchemyProjectRepository(s).list_summaries_by_user(
+        user.id, with_counts=True, limit=10
+    ),
+    "project.get_by_id": lambda s, user, project_id, document: SQLAlchemyProjectRepository(s).get_by_id(project_id),
+    "project.get_details": lambda s, user, project_id, document: SQLAlchemyProjectRepository(s).get_details(
+        project_id
+    ),
+    "project.list_document_paths": lambda s, user, project_id, document: SQLAlchemyProjectRepository(
+        s
+    ).list_document_paths(project_id),
+    "document.list_by_project": lambda s, user, project_id, document: SQLAlchemyDocumentRepository(
+        s
+    ).list_by_project(user_id=user.id, project_id=project_id, limit=10, after=(document.created_at, document.id)),
+    "document.get_by_filename": lambda s, user, project_id, document: SQLAlchemyDocumentRepository(
+        s
+    ).get_by_filename(project_id=project_id, file_name=document.file_name),
+    "document.get_by_id": lambda s, user, project_id, document: SQLAlchemyDocumentRepository(s).get_by_id(
+        user_id=user.id, document_id=document.id
+    ),
+    "document.get_with_role": lambda s, user, project_id, document: SQLAlchemyDocumentRepository(s).get_with_role(
+        user_id=user.id, document_id=document.id
+    ),
+    "document.update_many": lambda s, user, project_id, document: SQLAlchemyDocumentRepository(s).update_many(
+        project_id=project_id, updates=[{"id": document.id, "name": "renamed", "description": None}]
+    ),
+    "document.delete_many": lambda s, user, project_id, document: SQLAlchemyDocumentRepository(s).delete_many(
+        project_id=project_id, document_ids=[document.id]
+    ),
+    "role.get_user_role_on_project": lambda s, user, project_id, document: SQLAlchemyUserProjectRoleRepository(
+        s
+    ).get_user_role_on_project(project_id=project_id, user_id=user.id),
+    "role.get_project_access": lambda s, user, project_id, document: SQLAlchemyUserProjectRoleRepository(
+        s
+    ).get_project_access(project_id=project_id, user_id=user.id),
+    "role.get_user_roles_on_projects": lambda s, user, project_id, document: SQLAlchemyUserProjectRoleRepository(
+        s
+    ).get_user_roles_on_projects(user_id=user.id, project_ids=[project_id, uuid4()]),
+    "role.get_live_project_ids": lambda s, user, project_id, document: SQLAlchemyUserProjectRoleRepository(
+        s
+    ).get_live_project_ids(project_ids=[project_id, uuid4()]),
+    "role.get_project_roles": lambda s, user, project_id, document: SQLAlchemyUserProjectRoleRepository(
+        s
+    ).get_project_roles(project_id=project_id, user_ids=[user.id, uuid4()]),
+    "user.get_by_usernames": lambda s, user, project_id, document: SQLAlchemyUserRepository(s).get_by_usernames(
+        usernames=[user.username, "nobody"]
+    ),
+}
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_queries_use_an_index(session, sample, name):
+    user, project_id, document = sample
+    session.expunge_all()
+
+    assert full_scans(session, lambda: HOT_QUERIES[name](session, user, project_id, document)) == []
@@ -0,0 +1,100 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.infrastructure.core.database import Base
+from app.infrastructure.core.routing_session import (RoutingSession,
+                                                     stick_to_primary)
+from app.infrastructure.orm import UserORM
+from app.infrastructure.sqlalchemy_user_repository import \
+    SQLAlchemyUserRepository
+
+
+def new_user(username: str) -> UserORM:
+    return UserORM(id=uuid4(), username=username, email=f"{username}@a.com", password_hash="hash")
+
+
+@pytest.fixture
+def engines(tmp_path):
+    """A primary and a replica, two separate SQLite files, so it's visible where a statement went"""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        Base.metadata.create_all(engine)
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def seed(engine, username: str):
+    with sessionmaker(bind=engine)() as session:
+        session.add(new_user(username))
+        session.commit()
+
+
+def test_reads_go_to_the_replica(engines):
+    primary, replica = engines
+    seed(replica, "on_replica")
+
+    with sessionmaker(class_=RoutingSession, primary=primary, replicas=[replica])() as session:
+        repo = SQLAlchemyUserRepository(session)
+        assert repo.get_by_username("on_replica") is not None
+
+
+def test_session_sticks_to_the_primary_after_a_write(engines):
+    primary, replica = engines
+    seed(replica, "on_replica")
+
+    with sessionmaker(class_=RoutingSession, primary=primary, replicas=[replica])() as session:
+        session.add(new_user("written"))
+        session.commit()
+
+        # read-your-writes: the replica doesn't have the new row, the primary does
+        assert session.scalar(select(UserORM).filter(UserORM.username == "written")) is not None
+        assert session.scalar(select(UserORM).filter(UserORM.username == "on_replica")) is None
+
+
+def test_stick_to_primary_routes_the_following_reads(engines):
+    primary, replica = engines
+    seed(primary, "on_primary")
+
+    with sessionmaker(class_=RoutingSession, primary=primary, replicas=[replica])() as session:
+        stick_to_primary(session)
+        assert session.scalar(select(UserORM).filter(UserORM.username == "on_primary")) is not None
+
+
+def test_without_replicas_everything_goes_to_the_primary(engines):
+    primary, _ = engines
+    seed(primary, "on_primary")
+
+    with sessionmaker(class_=RoutingSession, primary=primary)() as session:
+        assert session.scalar(select(UserORM).filter(UserORM.username == "on_primary")) is not None
+
+
+@pytest.mark.asyncio
+async def test_async_session_routing(tmp_path):
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(
+        sync_session_class=RoutingSession,
+        expire_on_commit=False,
+        primary=primary.sync_engine,
+        replicas=[replica.sync_engine],
+    )
+    async with session_factory() as session:
+        session.add(new_user("written"))
+        await session.commit()
+
+    async with session_factory() as session:
+        # a fresh request reads from the replica, which hasn't got the row
+        assert await session.scalar(select(UserORM).filter(UserORM.username == "written")) is None
+
+    await primary.dispose()
+    await replica.dispose()
@@ -1,8 +1,12 @@
+import hashlib
 import io
+import os
 import pytest
+from unittest.mock import MagicMock
 from uuid import uuid4
 from moto import mock_aws
 from fastapi import UploadFile
+from app.infrastructure.core.cache import presigned_url_cache
 from app.infrastructure.storage.s3_document_storage import S3DocumentStorage
 
 
@@ -23,12 +27,12 @@ async def test_save(storage):
     project_id = uuid4()
     upload = UploadFile(filename="test.png", file=io.BytesIO(b"\x89PNG\r\n"), headers={"content-type": "image/png"})
 
-    file_name, ctype, key, backend = await storage.save(project_id, upload)
+    stored = await storage.save(project_id, upload)
 
-    assert file_name == "test.png"
-    assert ctype == "image/png"
-    assert backend == "s3"
-    assert storage.client.get_object(Bucket=storage.bucket_name, Key=key)["Body"].read() == b"\x89PNG\r\n"
+    assert stored.file_name == "test.png"
+    assert stored.content_type == "image/png"
+    assert stored.storage_backend == "s3"
+    assert storage.client.get_object(Bucket=storage.bucket_name, Key=stored.storage_path)["Body"].read() == b"\x89PNG\r\n"
 
 
 @pytest.mark.asyncio
@@ -64,3 +68,79 @@ async def test_remove(storage):
     response = storage.client.list_objects_v2(Bucket=storage.bucket_name, Prefix=parent_prefix, MaxKeys=1)
 
     assert "Contents" not in response  # no objects left
+
+
+@pytest.mark.asyncio
+async def test_save_large_file_as_multipart_upload(storage):
+    storage.part_size = storage.MIN_PART_SIZE
+    content = b"%PDF-" + os.urandom(2 * storage.MIN_PART_SIZE + 1024)
+    upload = UploadFile(filename="big.pdf", file=io.BytesIO(content), headers={"content-type": "application/pdf"})
+    sent_parts = []
+    upload_part = storage.client.upload_part
+
+    def spy(**kwargs):
+        sent_parts.append(kwargs["PartNumber"])
+        return upload_part(**kwargs)
+
+    storage.client.upload_part = spy
+
+    stored = await storage.save(uuid4(), upload)
+
+    assert sorted(sent_parts) == [1, 2, 3]
+    assert stored.size == len(content)
+    assert stored.sha256 == hashlib.sha256(content).hexdigest()
+    assert stored.detected_content_type == "application/pdf"
+    assert storage.client.get_object(Bucket=storage.bucket_name, Key=stored.storage_path)["Body"].read() == content
+
+
+@pytest.mark.asyncio
+async def test_failed_multipart_upload_is_aborted(storage):
+    storage.part_size = storage.MIN_PART_SIZE
+    upload = UploadFile(
+        filename="big.pdf", file=io.BytesIO(os.urandom(2 * storage.MIN_PART_SIZE)), headers={"content-type": "application/pdf"}
+    )
+    upload_part = storage.client.upload_part
+
+    def fail_second_part(**kwargs):
+        if kwargs["PartNumber"] == 2:
+            raise ConnectionError("connection reset")
+        return upload_part(**kwargs)
+
+    storage.client.upload_part = fail_second_part
+
+    with pytest.raises(ConnectionError):
+        await storage.save(uuid4(), upload)
+
+    # no orphaned multipart upload is left behind
+    assert "Uploads" not in storage.client.list_multipart_uploads(Bucket=storage.bucket_name)
+
+
+def test_download_url_is_cached(storage):
+    presigned_url_cache.clear()
+    storage.client.generate_presigned_url = MagicMock(wraps=storage.client.generate_presigned_url)
+
+    first = storage.get_download_url("p/doc.pdf", file_name="doc.pdf", content_type="application/pdf")
+    second = storage.get_download_url("p/doc.pdf", file_name="doc.pdf", content_type="application/pdf")
+    renamed = storage.get_download_url("p/doc.pdf", file_name="renamed.pdf", content_type="application/pdf")
+
+    assert first == second != renamed
+    # signed once per file name
+    assert storage.client.generate_presigned_url.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_remove_many_in_batches(storage):
+    storage.DELETE_BATCH_SIZE = 2
+    keys = [f"project/{index}.pdf" for index in range(5)]
+    for key in keys + ["other/kept.pdf"]:
+        storage.client.put_object(Bucket=storage.bucket_name, Key=key, Body=b"%PDF-1.7")
+    storage.client.delete_objects = MagicMock(wraps=storage.client.delete_objects)
+    storage.client.list_objects_v2 = MagicMock(wraps=storage.client.list_objects_v2)
+
+    await storage.remove_many(keys)
+
+    assert storage.client.delete_objects.call_count == 3
+    # the project prefix is checked once, not once per file
+    assert storage.client.list_objects_v2.call_count == 1
+    remaining = storage.client.list_objects_v2(Bucket=storage.bucket_name)["Contents"]
+    assert [item["Key"] for item in remaining] == ["other/kept.pdf"]
@@ -0,0 +1,43 @@
+from app.domain.enities.blob import Blob
+from app.infrastructure.orm import BlobORM
+from app.infrastructure.sqlalchemy_blob_repository import \
+    SQLAlchemyBlobRepository
+
+
+def blob(sha256: str, storage_path: str | None = None) -> Blob:
+    return Blob(sha256=sha256, storage_path=storage_path or f"blobs/{sha256}", storage_backend="local", size=10)
+
+
+def test_acquire_counts_the_references(db_session):
+    repo = SQLAlchemyBlobRepository(db_session)
+
+    assert repo.acquire(blob("a" * 64)).refcount == 1
+    # the known content keeps its stored path
+    acquired = repo.acquire(blob("a" * 64, storage_path="elsewhere"))
+    assert (acquired.refcount, acquired.storage_path) == (2, f"blobs/{'a' * 64}")
+
+
+def test_release_and_delete_unreferenced(db_session):
+    repo = SQLAlchemyBlobRepository(db_session)
+    shared, single = blob("a" * 64), blob("b" * 64)
+    for item in (shared, shared, shared, single):
+        repo.acquire(item)
+
+    # a path listed twice drops two references, unknown paths are ignored
+    refcounts = repo.release([shared.storage_path, shared.storage_path, single.storage_path, "untracked"])
+    assert refcounts == {shared.storage_path: 1, single.storage_path: 0}
+
+    assert repo.lock([shared.storage_path, single.storage_path]) == refcounts
+    repo.delete_unreferenced([shared.storage_path, single.storage_path])
+    db_session.commit()
+    assert [row.sha256 for row in db_session.query(BlobORM)] == [shared.sha256]
+
+
+def test_unreferenced_blob_is_taken_over_by_a_new_upload(db_session):
+    repo = SQLAlchemyBlobRepository(db_session)
+    repo.acquire(blob("a" * 64))
+    repo.release([blob("a" * 64).storage_path])
+
+    # the file may be gone already, the new upload has to write it again, at its own path
+    acquired = repo.acquire(blob("a" * 64, storage_path="s3/blobs/a"))
+    assert (acquired.refcount, acquired.storage_path) == (1, "s3/blobs/a")
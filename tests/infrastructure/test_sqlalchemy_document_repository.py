@@ -0,0 +1,114 @@
+from uuid import uuid4
+
+from app.infrastructure.orm import (DocumentORM, ProjectORM, UserORM,
+                                    UserProjectRoleORM)
+from app.infrastructure.sqlalchemy_documet_repository import \
+    SQLAlchemyDocumentRepository
+
+
+def seed_project(session, documents: int):
+    """A project with documents, owned by a user, and a user outside the project"""
+    owner = UserORM(id=uuid4(), username="owner", email="owner@a.com", password_hash="hash")
+    outsider = UserORM(id=uuid4(), username="outsider", email="outsider@a.com", password_hash="hash")
+    project = ProjectORM(id=uuid4(), name="project", description="desc", owner_id=owner.id)
+    session.add_all([owner, outsider, project])
+    session.add(UserProjectRoleORM(user_id=owner.id, project_id=project.id, role="owner"))
+    session.add_all(
+        DocumentORM(
+            id=uuid4(),
+            file_name=f"file{d}.png",
+            project_id=project.id,
+            content_type="image/png",
+            storage_path=f"documents/file{d}.png",
+            storage_backend="local",
+        )
+        for d in range(documents)
+    )
+    session.commit()
+    return owner.id, outsider.id, project.id
+
+
+def test_list_by_project_keyset_pagination(db_session):
+    owner_id, outsider_id, project_id = seed_project(db_session, documents=7)
+    repo = SQLAlchemyDocumentRepository(db_session)
+
+    expected = [(d.created_at, d.id) for d in repo.list_by_project(user_id=owner_id, project_id=project_id)]
+    assert len(expected) == 7
+    assert expected == sorted(expected)
+
+    seen, after = [], None
+    while True:
+        page = repo.list_by_project(user_id=owner_id, project_id=project_id, limit=3, after=after)
+        if not page:
+            break
+        seen += [(d.created_at, d.id) for d in page]
+        after = seen[-1]
+
+    assert seen == expected
+    assert repo.list_by_project(user_id=outsider_id, project_id=project_id) == []
+
+
+def test_update_many_and_delete_many_stay_in_the_project(db_session):
+    owner_id, _, project_id = seed_project(db_session, documents=3)
+    other_project_id = uuid4()
+    repo = SQLAlchemyDocumentRepository(db_session)
+    first, second, third = repo.list_by_project(user_id=owner_id, project_id=project_id)
+
+    updated = repo.update_many(
+        project_id=project_id,
+        updates=[
+            {"id": first.id, "name": "renamed", "description": None},
+            {"id": second.id, "name": None, "description": "described"},
+            {"id": uuid4(), "name": "missing", "description": None},
+        ],
+    )
+    assert set(updated) == {first.id, second.id}
+    # a foreign project ID matches nothing
+    assert repo.update_many(project_id=other_project_id, updates=[{"id": third.id, "name": "x"}]) == []
+
+    deleted = repo.delete_many(project_id=project_id, document_ids=[third.id, uuid4()])
+    assert deleted == [(third.id, third.storage_path)]
+    db_session.commit()
+
+    by_id = {d.id: d for d in repo.list_by_project(user_id=owner_id, project_id=project_id)}
+    assert set(by_id) == {first.id, second.id}
+    assert (by_id[first.id].name, by_id[first.id].description) == ("renamed", first.description)
+    assert by_id[second.id].description == "described"
+
+
+def test_get_with_role_is_a_single_query(db_session, count_queries):
+    owner_id, outsider_id, project_id = seed_project(db_session, documents=1)
+    document_id = db_session.query(DocumentORM.id).scalar()
+    db_session.expunge_all()
+    repo = SQLAlchemyDocumentRepository(db_session)
+
+    with count_queries(db_session.get_bind()) as statements:
+        document, role = repo.get_with_role(user_id=owner_id, document_id=document_id)
+    assert len(statements) == 1
+    assert (document.id, document.project_id, role) == (document_id, project_id, "owner")
+
+    # the document is found, but the outsider has no role on its project
+    assert repo.get_with_role(user_id=outsider_id, document_id=document_id)[1] is None
+    assert repo.get_with_role(user_id=owner_id, document_id=uuid4()) is None
+
+
+def test_soft_deleted_document_is_hidden_till_purged(db_session):
+    owner_id, _, project_id = seed_project(db_session, documents=2)
+    repo = SQLAlchemyDocumentRepository(db_session)
+    deleted, kept = repo.list_by_project(user_id=owner_id, project_id=project_id)
+
+    assert repo.soft_delete(document_id=deleted.id) is True
+    db_session.commit()
+
+    assert [d.id for d in repo.list_by_project(user_id=owner_id, project_id=project_id)] == [kept.id]
+    assert repo.get_with_role(user_id=owner_id, document_id=deleted.id) is None
+    assert repo.get_by_filename(project_id=project_id, file_name=deleted.file_name) is None
+    assert repo.delete_many(project_id=project_id, document_ids=[deleted.id]) == []
+    assert repo.soft_delete(document_id=deleted.id) is False
+    # only the live documents still point to their files
+    assert repo.referenced_paths([deleted.storage_path, kept.storage_path]) == {kept.storage_path}
+
+    # only a soft deleted document is purged, once
+    assert repo.purge(document_id=kept.id) is None
+    assert repo.purge(document_id=deleted.id) == deleted.storage_path
+    assert repo.purge(document_id=deleted.id) is None
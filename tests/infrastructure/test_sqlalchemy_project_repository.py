@@ -0,0 +1,186 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+
+from app.infrastructure import (AsyncSQLAlchemyProjectRepository,
+                                SQLAlchemyProjectRepository)
+from app.infrastructure.orm import (DocumentORM, ProjectORM, UserORM,
+                                    UserProjectRoleORM)
+from app.infrastructure.sqlalchemy_documet_repository import \
+    SQLAlchemyDocumentRepository
+from app.infrastructure.sqlalchemy_user_project_role_repository import \
+    SQLAlchemyUserProjectRoleRepository
+
+
+def seed(session, projects: int, documents: int, participants: int) -> UserORM:
+    """Create a user participating in `projects` projects, each with documents and extra participants"""
+    user = UserORM(id=uuid4(), username="owner", email="owner@a.com", password_hash="hash")
+    session.add(user)
+    members = [
+        UserORM(id=uuid4(), username=f"member{i}", email=f"member{i}@a.com", password_hash="hash")
+        for i in range(participants)
+    ]
+    session.add_all(members)
+
+    for p in range(projects):
+        project = ProjectORM(id=uuid4(), name=f"project{p}", description="desc", owner_id=user.id)
+        session.add(project)
+        session.add(UserProjectRoleORM(user_id=user.id, project_id=project.id, role="owner"))
+        for member in members:
+            session.add(UserProjectRoleORM(user_id=member.id, project_id=project.id, role="participant"))
+        for d in range(documents):
+            session.add(
+                DocumentORM(
+                    file_name=f"file{d}.png",
+                    project_id=project.id,
+                    content_type="image/png",
+                    storage_path=f"documents/file{d}.png",
+                    storage_backend="local",
+                )
+            )
+    return user
+
+
+@pytest.mark.parametrize("projects,documents,participants", [(1, 1, 0), (5, 10, 4)])
+def test_list_by_user_query_count_is_constant(db_session, projects, documents, participants, count_queries):
+    user_id = seed(db_session, projects=projects, documents=documents, participants=participants).id
+    db_session.commit()
+    db_session.expunge_all()
+
+    repo = SQLAlchemyProjectRepository(db_session)
+    with count_queries(db_session.get_bind()) as statements:
+        result = repo.list_by_user(user_id=user_id)
+
+    assert len(result) == projects
+    assert all(len(project.documents) == documents for project in result)
+    assert all(len(project.participants) == participants + 1 for project in result)
+    # projects + documents + participants joined with users
+    assert len(statements) == 3
+
+
+@pytest.mark.parametrize("documents,participants", [(1, 0), (10, 4)])
+def test_get_by_id_query_count_is_constant(db_session, documents, participants, count_queries):
+    seed(db_session, projects=1, documents=documents, participants=participants)
+    db_session.commit()
+    project_id = db_session.query(ProjectORM.id).scalar()
+    db_session.expunge_all()
+
+    repo = SQLAlchemyProjectRepository(db_session)
+    with count_queries(db_session.get_bind()) as statements:
+        project = repo.get_by_id(project_id=project_id)
+
+    assert len(project.documents) == documents
+    assert {p.username for p in project.participants} == {"owner", *(f"member{i}" for i in range(participants))}
+    # project joined with participants and users + documents
+    assert len(statements) == 2
+
+
+@pytest.mark.parametrize("documents,participants", [(1, 0), (50, 4)])
+def test_delete_statement_count_is_constant(db_session, documents, participants, count_queries):
+    seed(db_session, projects=2, documents=documents, participants=participants)
+    db_session.commit()
+    project_id, kept_id = [row.id for row in db_session.query(ProjectORM.id)]
+    # the aggregate is in the session, it must not be walked to delete the children
+    SQLAlchemyProjectRepository(db_session).get_by_id(project_id=project_id)
+
+    with count_queries(db_session.get_bind()) as statements:
+        storage_paths = SQLAlchemyProjectRepository(db_session).delete(project_id=project_id)
+    db_session.commit()
+
+    assert sorted(storage_paths) == sorted(f"documents/file{d}.png" for d in range(documents))
+    # DELETE ... RETURNING of the documents + the project, the roles go with it by ON DELETE CASCADE
+    assert len(statements) == 2
+    assert db_session.query(UserProjectRoleORM).filter_by(project_id=project_id).count() == 0
+    assert db_session.query(DocumentORM).filter_by(project_id=kept_id).count() == documents
+    assert SQLAlchemyProjectRepository(db_session).delete(project_id=project_id) is None
+
+
+@pytest.mark.asyncio
+async def test_async_delete(async_db_session):
+    await async_db_session.run_sync(lambda session: seed(session, projects=1, documents=3, participants=2))
+    await async_db_session.commit()
+    project_id = (await async_db_session.scalars(ProjectORM.__table__.select())).first()
+
+    storage_paths = await AsyncSQLAlchemyProjectRepository(async_db_session).delete(project_id=project_id)
+    await async_db_session.commit()
+
+    assert len(storage_paths) == 3
+    assert (await async_db_session.scalars(UserProjectRoleORM.__table__.select())).all() == []
+
+
+@pytest.mark.asyncio
+async def test_async_list_by_user_query_count_is_constant(async_db_session, count_queries):
+    user = await async_db_session.run_sync(lambda session: seed(session, projects=5, documents=10, participants=4))
+    await async_db_session.commit()
+    async_db_session.expunge_all()
+
+    repo = AsyncSQLAlchemyProjectRepository(async_db_session)
+    with count_queries(async_db_session.bind.sync_engine) as statements:
+        result = await repo.list_by_user(user_id=user.id)
+
+    assert len(result) == 5
+    assert len(statements) == 3
+
+
+@pytest.mark.parametrize("with_counts", [False, True])
+def test_list_summaries_by_user_is_a_single_query(db_session, with_counts, count_queries):
+    user_id = seed(db_session, projects=3, documents=10, participants=2).id
+    # a project the user doesn't participate in
+    db_session.add(ProjectORM(id=uuid4(), name="other", description="desc", owner_id=user_id))
+    db_session.commit()
+
+    repo = SQLAlchemyProjectRepository(db_session)
+    with count_queries(db_session.get_bind()) as statements:
+        summaries = repo.list_summaries_by_user(user_id=user_id, with_counts=with_counts)
+
+    assert sorted(s.name for s in summaries) == ["project0", "project1", "project2"]
+    assert len(statements) == 1
+    if with_counts:
+        assert {(s.document_count, s.participant_count) for s in summaries} == {(10, 3)}
+    else:
+        assert {(s.document_count, s.participant_count) for s in summaries} == {(None, None)}
+
+
+def test_list_summaries_by_user_keyset_pagination(db_session):
+    user_id = seed(db_session, projects=5, documents=0, participants=0).id
+    db_session.commit()
+
+    repo = SQLAlchemyProjectRepository(db_session)
+    expected = [(s.created_at, s.id) for s in repo.list_summaries_by_user(user_id=user_id)]
+    assert expected == sorted(expected)
+
+    seen, after = [], None
+    while True:
+        page = repo.list_summaries_by_user(user_id=user_id, limit=2, after=after)
+        if not page:
+            break
+        seen += [(s.created_at, s.id) for s in page]
+        after = seen[-1]
+
+    assert seen == expected
+
+
+def test_soft_deleted_project_is_hidden(db_session, count_queries):
+    user_id = seed(db_session, projects=2, documents=2, participants=0).id
+    db_session.commit()
+    repo = SQLAlchemyProjectRepository(db_session)
+    deleted, kept = repo.list_summaries_by_user(user_id=user_id)
+
+    with count_queries(db_session.get_bind()) as statements:
+        assert repo.soft_delete(project_id=deleted.id) is True
+    db_session.commit()
+
+    # a single row is stamped, whatever the size of the project
+    assert len(statements) == 1
+    assert [s.id for s in repo.list_summaries_by_user(user_id=user_id, with_counts=True)] == [kept.id]
+    assert repo.get_by_id(project_id=deleted.id) is None
+    assert SQLAlchemyUserProjectRoleRepository(db_session).get_project_access(
+        project_id=deleted.id, user_id=user_id
+    ) == (False, "owner")
+    document_id = db_session.scalar(select(DocumentORM.id).where(DocumentORM.project_id == deleted.id).limit(1))
+    assert SQLAlchemyDocumentRepository(db_session).get_with_role(user_id=user_id, document_id=document_id) is None
+    assert repo.soft_delete(project_id=deleted.id) is False
+
+    # the purge worker still deletes it along with its documents
+    assert len(repo.delete(project_id=deleted.id)) == 2
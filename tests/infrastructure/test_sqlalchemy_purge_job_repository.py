@@ -0,0 +1,53 @@
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.infrastructure.sqlalchemy_purge_job_repository import \
+    SQLAlchemyPurgeJobRepository
+
+
+def test_claim_statement_skips_the_locked_jobs():
+    statement = SQLAlchemyPurgeJobRepository._claim_statement(batch_size=10, lease_seconds=60, now=datetime.now(UTC))
+    assert "FOR UPDATE SKIP LOCKED" in str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_claimed_jobs_are_leased(db_session):
+    repo = SQLAlchemyPurgeJobRepository(db_session)
+    targets = [uuid4() for _ in range(3)]
+    for target_id in targets:
+        repo.enqueue(kind="project", target_id=target_id)
+    db_session.commit()
+
+    first = repo.claim(batch_size=2, lease_seconds=60)
+    db_session.commit()
+    second = repo.claim(batch_size=2, lease_seconds=60)
+    db_session.commit()
+
+    # the oldest first, a leased job isn't claimed again
+    assert [job.target_id for job in first + second] == targets
+    assert {job.attempts for job in first + second} == {1}
+    assert repo.claim(batch_size=2, lease_seconds=60) == []
+
+
+def test_retry_and_stats(db_session):
+    repo = SQLAlchemyPurgeJobRepository(db_session)
+    for _ in range(3):
+        repo.enqueue(kind="document", target_id=uuid4())
+    db_session.commit()
+    assert (repo.stats().depth, repo.stats().ready, repo.stats().failed) == (3, 3, 0)
+
+    retried, failed = repo.claim(batch_size=2, lease_seconds=60)
+    repo.retry(job_id=retried.id, error="timeout", available_at=datetime.now(UTC) + timedelta(minutes=1))
+    repo.retry(job_id=failed.id, error="gone for good", available_at=None)
+    repo.set_storage_paths(job_id=retried.id, storage_paths=["documents/a.png"])
+    db_session.commit()
+
+    stats = repo.stats()
+    assert (stats.depth, stats.ready, stats.failed) == (2, 1, 1)
+    assert stats.lag_seconds >= 0
+
+    [remaining] = repo.claim(batch_size=2, lease_seconds=60)
+    repo.complete(job_id=remaining.id)
+    db_session.commit()
+    assert (repo.stats().depth, repo.stats().failed) == (1, 1)
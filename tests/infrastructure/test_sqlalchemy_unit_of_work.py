@@ -0,0 +1,45 @@
+from uuid import uuid4
+
+import pytest
+
+from app.domain.enities.user import User
+from app.infrastructure.async_sqlalchemy_unit_of_work import \
+    AsyncSQLAlchemyUnitOfWork
+from app.infrastructure.async_sqlalchemy_user_repository import \
+    AsyncSQLAlchemyUserRepository
+from app.infrastructure.orm import UserORM
+from app.infrastructure.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+from app.infrastructure.sqlalchemy_user_repository import \
+    SQLAlchemyUserRepository
+
+
+def make_user(username: str) -> User:
+    return User(id=uuid4(), username=username, email=f"{username}@a.com", password_hash="hash")
+
+
+def test_repositories_only_flush_until_commit(db_session):
+    repo = SQLAlchemyUserRepository(db_session)
+    uow = SQLAlchemyUnitOfWork(db_session)
+
+    kept = repo.create(make_user("kept"))
+    uow.commit()
+    repo.create(make_user("discarded"))
+    uow.rollback()
+
+    assert [u.id for u in db_session.query(UserORM).all()] == [kept.id]
+
+
+@pytest.mark.asyncio
+async def test_async_repositories_only_flush_until_commit(async_db_session):
+    repo = AsyncSQLAlchemyUserRepository(async_db_session)
+    uow = AsyncSQLAlchemyUnitOfWork(async_db_session)
+
+    first = await repo.create(make_user("first"))
+    second = await repo.create(make_user("second"))
+    await uow.commit()
+    await repo.create(make_user("discarded"))
+    await uow.rollback()
+
+    assert (await repo.get_by_username("first")).id == first.id
+    assert (await repo.get_by_username("second")).id == second.id
+    assert await repo.get_by_username("discarded") is None
@@ -0,0 +1,86 @@
+from datetime import UTC, datetime
+from uuid import uuid4
+
+from app.domain.enities.user_project_role import UserProjectRole
+from app.infrastructure.core.cache import role_cache
+from app.infrastructure.orm import ProjectORM, UserORM, UserProjectRoleORM
+from app.infrastructure.sqlalchemy_user_project_role_repository import \
+    SQLAlchemyUserProjectRoleRepository
+
+
+def test_get_project_access(db_session):
+    owner = UserORM(id=uuid4(), username="owner", email="owner@a.com", password_hash="hash")
+    outsider = UserORM(id=uuid4(), username="outsider", email="outsider@a.com", password_hash="hash")
+    project = ProjectORM(id=uuid4(), name="project", description="desc", owner_id=owner.id)
+    db_session.add_all([owner, outsider, project])
+    db_session.add(UserProjectRoleORM(user_id=owner.id, project_id=project.id, role="owner"))
+    db_session.commit()
+
+    repo = SQLAlchemyUserProjectRoleRepository(db_session)
+    assert repo.get_project_access(project_id=project.id, user_id=owner.id) == (True, "owner")
+    assert repo.get_project_access(project_id=project.id, user_id=outsider.id) == (True, None)
+    assert repo.get_project_access(project_id=uuid4(), user_id=owner.id) == (False, None)
+
+
+def test_get_user_roles_on_projects(db_session):
+    user = UserORM(id=uuid4(), username="user", email="user@a.com", password_hash="hash")
+    owned = ProjectORM(id=uuid4(), name="owned", description="desc", owner_id=user.id)
+    joined = ProjectORM(id=uuid4(), name="joined", description="desc", owner_id=user.id)
+    other = ProjectORM(id=uuid4(), name="other", description="desc", owner_id=user.id)
+    db_session.add_all([user, owned, joined, other])
+    db_session.add(UserProjectRoleORM(user_id=user.id, project_id=owned.id, role="owner"))
+    db_session.add(UserProjectRoleORM(user_id=user.id, project_id=joined.id, role="participant"))
+    db_session.commit()
+
+    repo = SQLAlchemyUserProjectRoleRepository(db_session)
+    roles = repo.get_user_roles_on_projects(user_id=user.id, project_ids=[owned.id, joined.id, other.id])
+    assert roles == {owned.id: "owner", joined.id: "participant"}
+    assert repo.get_user_roles_on_projects(user_id=user.id, project_ids=[]) == {}
+
+
+def test_soft_deleted_projects_grant_no_role(db_session):
+    user = UserORM(id=uuid4(), username="user", email="user@a.com", password_hash="hash")
+    live = ProjectORM(id=uuid4(), name="live", description="desc", owner_id=user.id)
+    deleted = ProjectORM(id=uuid4(), name="deleted", description="desc", owner_id=user.id, deleted_at=datetime.now(UTC))
+    db_session.add_all([user, live, deleted])
+    db_session.add(UserProjectRoleORM(user_id=user.id, project_id=live.id, role="owner"))
+    db_session.add(UserProjectRoleORM(user_id=user.id, project_id=deleted.id, role="owner"))
+    db_session.commit()
+
+    repo = SQLAlchemyUserProjectRoleRepository(db_session)
+    assert repo.get_user_roles_on_projects(user_id=user.id, project_ids=[live.id, deleted.id]) == {live.id: "owner"}
+    assert repo.get_live_project_ids(project_ids=[live.id, deleted.id, uuid4()]) == {live.id}
+    assert repo.get_live_project_ids(project_ids=[]) == set()
+
+
+def test_add_invalidates_the_cached_role(db_session):
+    user = UserORM(id=uuid4(), username="user", email="user@a.com", password_hash="hash")
+    project = ProjectORM(id=uuid4(), name="project", description="desc", owner_id=user.id)
+    db_session.add_all([user, project])
+    db_session.commit()
+    role_cache.set((user.id, project.id), "participant")
+
+    SQLAlchemyUserProjectRoleRepository(db_session).add(
+        UserProjectRole(project_id=project.id, user_id=user.id, role="owner")
+    )
+
+    assert role_cache.get((user.id, project.id)) is None
+
+
+def test_add_many_skips_the_existing_roles(db_session):
+    owner = UserORM(id=uuid4(), username="owner", email="owner@a.com", password_hash="hash")
+    invited = UserORM(id=uuid4(), username="invited", email="invited@a.com", password_hash="hash")
+    project = ProjectORM(id=uuid4(), name="project", description="desc", owner_id=owner.id)
+    db_session.add_all([owner, invited, project])
+    db_session.add(UserProjectRoleORM(user_id=owner.id, project_id=project.id, role="owner"))
+    db_session.commit()
+
+    repo = SQLAlchemyUserProjectRoleRepository(db_session)
+    inserted = repo.add_many(project_id=project.id, user_ids=[owner.id, invited.id], role="participant")
+    db_session.commit()
+
+    assert inserted == [invited.id]
+    assert repo.get_project_roles(project_id=project.id, user_ids=[owner.id, invited.id, uuid4()]) == {
+        owner.id: "owner",
+        invited.id: "participant",
+    }
@@ -0,0 +1,125 @@
+import asyncio
+import io
+import time
+
+import pytest
+from starlette.requests import ClientDisconnect
+
+from app.infrastructure.core.streaming import (ClosingStreamingResponse,
+                                               stream_body)
+
+
+class Body:
+    """An S3 body, counting its reads"""
+
+    def __init__(self, content: bytes):
+        self.file = io.BytesIO(content)
+        self.reads = 0
+        self.closed = False
+
+    async def read(self, size: int) -> bytes:
+        self.reads += 1
+        return self.file.read(size)
+
+    async def close(self):
+        self.closed = True
+
+
+def stream(body: Body, chunk_size: int = 4, read_ahead: int = 2):
+    return stream_body(read=body.read, close=body.close, chunk_size=chunk_size, read_ahead=read_ahead)
+
+
+@pytest.mark.asyncio
+async def test_stream_body_in_chunks():
+    body = Body(b"0123456789")
+
+    assert [chunk async for chunk in stream(body)] == [b"0123", b"4567", b"89"]
+    assert body.closed
+
+
+@pytest.mark.asyncio
+async def test_read_ahead_is_bounded():
+    body = Body(bytes(100))
+    chunks = stream(body, chunk_size=1, read_ahead=3)
+
+    await anext(chunks)
+    await asyncio.sleep(0.01)
+
+    # the chunk handed out, three buffered and the one waiting for room
+    assert body.reads == 5
+    await chunks.aclose()
+
+
+@pytest.mark.asyncio
+async def test_abandoned_stream_closes_the_body():
+    body = Body(bytes(100))
+    chunks = stream(body)
+
+    await anext(chunks)
+    await chunks.aclose()
+
+    assert body.closed
+
+
+@pytest.mark.asyncio
+async def test_body_is_closed_after_the_read_in_flight():
+    events = []
+    reading = asyncio.Event()
+
+    def blocking_read(size):
+        events.append("reading")
+        time.sleep(0.05)
+        events.append("read")
+        return bytes(size)
+
+    async def read(size):
+        reading.set()
+        # a boto3 body, cancelling the producer doesn't stop the read in its worker thread
+        return await asyncio.to_thread(blocking_read, size)
+
+    async def close():
+        events.append("close")
+
+    chunks = stream_body(read=read, close=close, chunk_size=4, read_ahead=1)
+    await anext(chunks)
+    # abandoned while the producer is in the middle of a read
+    reading.clear()
+    await reading.wait()
+    await chunks.aclose()
+
+    assert events[-3:] == ["reading", "read", "close"]
+
+
+@pytest.mark.asyncio
+async def test_read_error_is_raised_and_the_body_closed():
+    body = Body(b"")
+
+    async def fail(size):
+        raise ConnectionError("reset")
+
+    with pytest.raises(ConnectionError):
+        async for _ in stream_body(read=fail, close=body.close, chunk_size=4, read_ahead=2):
+            pass
+    assert body.closed
+
+
+@pytest.mark.asyncio
+async def test_response_closes_the_body_on_disconnect():
+    body = Body(bytes(100))
+    response = ClosingStreamingResponse(stream(body))
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+    sent = []
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if len(sent) == 2:
+            # the client went away after the first chunk
+            raise OSError("disconnected")
+        sent.append(message)
+
+    with pytest.raises(ClientDisconnect):
+        await response(scope, receive, send)
+    assert body.closed
+    assert body.reads < 100 // 4
@@ -0,0 +1,27 @@
+import threading
+
+import pytest
+
+from app.infrastructure.threaded_repository import ThreadedRepository
+
+
+class FakeRepository:
+    def get_thread(self):
+        return threading.get_ident()
+
+    @staticmethod
+    def to_domain_entity(value):
+        return value
+
+
+@pytest.mark.asyncio
+async def test_methods_run_in_worker_thread():
+    repo = ThreadedRepository(FakeRepository())
+
+    assert await repo.get_thread() != threading.get_ident()
+
+
+def test_static_methods_are_not_wrapped():
+    repo = ThreadedRepository(FakeRepository())
+
+    assert repo.to_domain_entity("value") == "value"
@@ -2,18 +2,24 @@ from datetime import datetime, timezone
 from unittest.mock import Mock, AsyncMock
 from uuid import uuid4
 from app.domain.enities import Project
-from app.domain.enities.document import Document
 from app.domain.enities.user_project_role import RoleEnum
+from app.domain.exceptions.project_exceptions import ProjectNotFoundError, ProjectPermissionError
 import pytest
+from app.infrastructure.core.config import settings
 from app.services.project_service import ProjectService
 
 
-def test_add_project():
-    mock_repo = Mock()
+@pytest.mark.asyncio
+async def test_add_project():
+    mock_repo = AsyncMock()
     mock_storage = Mock()
-    mock_role_service = Mock()
+    mock_role_service = AsyncMock()
 
-    service = ProjectService(repo=mock_repo, storage=mock_storage, role_service=mock_role_service)
+    mock_uow = AsyncMock()
+
+    service = ProjectService(
+        repo=mock_repo, storage=mock_storage, role_service=mock_role_service, uow=mock_uow, purge_jobs=AsyncMock()
+    )
 
     user_id = uuid4()
     test_project = Project(
@@ -28,7 +34,7 @@ def test_add_project():
     mock_repo.add.return_value = test_project
 
     # act
-    result = service.add_project(name="test_name", description="test_description", user_id=user_id)
+    result = await service.add_project(name="test_name", description="test_description", user_id=user_id)
 
     # check project
     assert result == test_project
@@ -37,15 +43,22 @@ def test_add_project():
     assert result.owner == user_id
 
     # check method calls
-    mock_repo.add.assert_called_once()
-    mock_role_service.add_role.assert_called_once_with(project_id=test_project.id, user_id=user_id, role=RoleEnum.OWNER)
+    mock_repo.add.assert_awaited_once()
+    mock_role_service.add_role.assert_awaited_once_with(project_id=test_project.id, user_id=user_id, role=RoleEnum.OWNER)
+    # the project and the owner role are committed together
+    mock_uow.commit.assert_awaited_once()
 
-def test_get_all_projects():
-    mock_repo = Mock()
+@pytest.mark.asyncio
+async def test_get_all_projects():
+    mock_repo = AsyncMock()
     mock_storage = Mock()
     mock_role_service = Mock()
 
-    service = ProjectService(repo=mock_repo, storage=mock_storage, role_service=mock_role_service)
+    mock_uow = AsyncMock()
+
+    service = ProjectService(
+        repo=mock_repo, storage=mock_storage, role_service=mock_role_service, uow=mock_uow, purge_jobs=AsyncMock()
+    )
     user_id = uuid4()
 
     test_project = Project(
@@ -63,22 +76,29 @@ def test_get_all_projects():
         created_at=datetime.now(timezone.utc)
     )
 
-    mock_repo.list_by_user.return_value = [test_project, test_project2]
+    mock_repo.list_summaries_by_user.return_value = [test_project, test_project2]
 
     # act
-    result = service.get_all_projects(user_id=user_id)
+    result = await service.get_all_projects(user_id=user_id)
 
-    assert isinstance(result, list)
-    assert result == [test_project, test_project2]
-    assert mock_repo.list_by_user.call_count == 1
+    assert result.items == [test_project, test_project2]
+    assert result.next_cursor is None
+    mock_repo.list_summaries_by_user.assert_awaited_once_with(
+        user_id=user_id, with_counts=False, limit=settings.default_page_size + 1, after=None
+    )
 
 
-def test_get_project():
-    mock_repo = Mock()
+@pytest.mark.asyncio
+async def test_get_project():
+    mock_repo = AsyncMock()
     mock_storage = Mock()
     mock_role_service = Mock()
 
-    service = ProjectService(repo=mock_repo, storage=mock_storage, role_service=mock_role_service)
+    mock_uow = AsyncMock()
+
+    service = ProjectService(
+        repo=mock_repo, storage=mock_storage, role_service=mock_role_service, uow=mock_uow, purge_jobs=AsyncMock()
+    )
     user_id = uuid4()
     project_id = uuid4()
 
@@ -90,44 +110,64 @@ def test_get_project():
         created_at=datetime.now(timezone.utc)
     )
 
-    # repo returns a project
+    # repo returns a project, the user is a participant
     mock_repo.get_by_id.return_value = test_project
-    service.is_project_participant = Mock(return_value=True)
+    mock_role_service.get_project_access = AsyncMock(return_value=(True, RoleEnum.PARTICIPANT))
 
-    result = service.get_project(project_id=project_id, user_id=user_id)
+    result = await service.get_project(project_id=project_id, user_id=user_id)
 
     assert result == test_project
     assert result.id == project_id
     assert mock_repo.get_by_id.call_count == 1
-    service.is_project_participant.assert_called_once_with(project=test_project, user_id=user_id)
+    mock_role_service.get_project_access.assert_awaited_once_with(project_id=project_id, user_id=user_id)
+
+
+@pytest.mark.asyncio
+async def test_get_project_checks_access_before_loading():
+    mock_repo = AsyncMock()
+    mock_role_service = Mock()
+    service = ProjectService(
+        repo=mock_repo, storage=Mock(), role_service=mock_role_service, uow=AsyncMock(), purge_jobs=AsyncMock()
+    )
+
+    # missing project
+    mock_role_service.get_project_access = AsyncMock(return_value=(False, None))
+    with pytest.raises(ProjectNotFoundError):
+        await service.get_project(project_id=uuid4(), user_id=uuid4())
+
+    # not a participant
+    mock_role_service.get_project_access = AsyncMock(return_value=(True, None))
+    with pytest.raises(ProjectPermissionError):
+        await service.get_project(project_id=uuid4(), user_id=uuid4())
+
+    # the aggregate is never loaded for a caller without access
+    mock_repo.get_by_id.assert_not_called()
 
 @pytest.mark.asyncio
 async def test_delete_project():
-    mock_repo = Mock()
+    mock_repo = AsyncMock()
     mock_storage = AsyncMock()
     mock_role_service = Mock()
+    mock_purge_jobs = AsyncMock()
 
-    service = ProjectService(repo=mock_repo, storage=mock_storage, role_service=mock_role_service)
-    user_id = uuid4()
-    project_id = uuid4()
+    mock_uow = AsyncMock()
 
-    test_project = Project(
-        id=project_id,
-        name="Test Project",
-        description="desc of test project",
-        owner=user_id,
-        created_at=datetime.now(timezone.utc),
-        documents=[Document(id=uuid4(), project_id=project_id, content_type="image/jpg", created_at=datetime.now(timezone.utc),
-                            storage_path="documents/file.jpg", file_name="file.jpg", storage_backend="local")],
+    service = ProjectService(
+        repo=mock_repo, storage=mock_storage, role_service=mock_role_service, uow=mock_uow, purge_jobs=mock_purge_jobs
     )
+    user_id = uuid4()
+    project_id = uuid4()
 
-    mock_repo.get_by_id.return_value = test_project
-    service.is_project_owner = Mock(return_value=True)
-    mock_repo.delete.return_value = True
+    mock_role_service.get_project_access = AsyncMock(return_value=(True, RoleEnum.OWNER))
+    mock_repo.soft_delete.return_value = True
 
     result = await service.delete_project(project_id=project_id, user_id=user_id)
 
     assert result is True
-    mock_repo.get_by_id.assert_called_once_with(project_id=project_id)
-    mock_storage.remove.assert_awaited_once_with(storage_path="documents/file.jpg")
+    # the project is only hidden, its rows and files are left to the purge worker
+    mock_repo.soft_delete.assert_awaited_once_with(project_id=project_id)
+    mock_repo.delete.assert_not_called()
+    mock_storage.remove_many.assert_not_called()
+    mock_purge_jobs.enqueue.assert_awaited_once_with(kind="project", target_id=project_id)
+    mock_uow.commit.assert_awaited_once()
 
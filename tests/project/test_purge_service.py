@@ -0,0 +1,180 @@
+import io
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from fastapi import UploadFile
+
+from app.domain.exceptions.document_exceptions import DocumentFileDeleteError
+from app.infrastructure.core.config import settings
+from app.infrastructure.orm import (DocumentORM, ProjectORM, PurgeJobORM,
+                                    UserORM, UserProjectRoleORM)
+from app.infrastructure.sqlalchemy_documet_repository import \
+    SQLAlchemyDocumentRepository
+from app.infrastructure.sqlalchemy_project_repository import \
+    SQLAlchemyProjectRepository
+from app.infrastructure.sqlalchemy_purge_job_repository import \
+    SQLAlchemyPurgeJobRepository
+from app.infrastructure.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+from app.infrastructure.storage.file_system_document_storage import \
+    FileSystemDocumentStorage
+from app.infrastructure.threaded_repository import ThreadedRepository
+from app.services.blob_service import BlobService
+from app.services.purge_service import PurgeService, PurgeWorker
+
+
+@pytest.fixture
+def purge_service(db_session, tmp_path):
+    return PurgeService(
+        jobs=ThreadedRepository(SQLAlchemyPurgeJobRepository(db_session)),
+        project_repo=ThreadedRepository(SQLAlchemyProjectRepository(db_session)),
+        document_repo=ThreadedRepository(SQLAlchemyDocumentRepository(db_session)),
+        blob_service=BlobService(FileSystemDocumentStorage(upload_dir=str(tmp_path))),
+        uow=ThreadedRepository(SQLAlchemyUnitOfWork(db_session)),
+    )
+
+
+def seed_deleted_project(session, tmp_path, files: int):
+    """A soft deleted project with a file per document, queued for the purge"""
+    owner = UserORM(id=uuid4(), username="owner", email="owner@a.com", password_hash="hash")
+    project = ProjectORM(id=uuid4(), name="project", description="desc", owner_id=owner.id)
+    session.add_all([owner, project])
+    session.add(UserProjectRoleORM(user_id=owner.id, project_id=project.id, role="owner"))
+    (tmp_path / project.id.hex).mkdir()
+    paths = []
+    for d in range(files):
+        path = tmp_path / project.id.hex / f"file{d}.png"
+        path.write_bytes(b"content")
+        paths.append(path)
+        session.add(
+            DocumentORM(
+                file_name=path.name,
+                project_id=project.id,
+                content_type="image/png",
+                storage_path=str(path),
+                storage_backend="local",
+            )
+        )
+    session.flush()
+    SQLAlchemyProjectRepository(session).soft_delete(project_id=project.id)
+    SQLAlchemyPurgeJobRepository(session).enqueue(kind="project", target_id=project.id)
+    session.commit()
+    return owner.id, project.id, paths
+
+
+@pytest.mark.asyncio
+async def test_project_is_purged_in_file_batches(purge_service, db_session, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "purge_file_batch_size", 2)
+    _, project_id, paths = seed_deleted_project(db_session, tmp_path, files=3)
+    purge_service.blob_service.storage.remove_many = AsyncMock(
+        wraps=purge_service.blob_service.storage.remove_many
+    )
+
+    outcome = await purge_service.run_once()
+
+    assert (outcome["claimed"], outcome["purged"]) == (1, 1)
+    assert purge_service.blob_service.storage.remove_many.await_count == 2
+    assert not any(path.exists() for path in paths)
+    assert db_session.get(ProjectORM, project_id) is None
+    assert db_session.query(DocumentORM).count() == 0
+    assert db_session.query(UserProjectRoleORM).count() == 0
+    assert db_session.query(PurgeJobORM).count() == 0
+
+
+@pytest.mark.asyncio
+async def test_file_of_a_live_document_is_kept(purge_service, db_session, tmp_path):
+    owner_id, _, paths = seed_deleted_project(db_session, tmp_path, files=2)
+    # e.g. uploaded again under the same name since the deletion
+    live = ProjectORM(id=uuid4(), name="live", description="desc", owner_id=owner_id)
+    db_session.add(live)
+    db_session.add(
+        DocumentORM(
+            file_name=paths[0].name,
+            project_id=live.id,
+            content_type="image/png",
+            storage_path=str(paths[0]),
+            storage_backend="local",
+        )
+    )
+    db_session.commit()
+
+    await purge_service.run_once()
+
+    assert paths[0].exists()
+    assert not paths[1].exists()
+
+
+@pytest.mark.asyncio
+async def test_reupload_under_the_purged_name_keeps_its_file(purge_service, db_session, tmp_path):
+    owner_id, _, _ = seed_deleted_project(db_session, tmp_path, files=0)
+    project = ProjectORM(id=uuid4(), name="live", description="desc", owner_id=owner_id)
+    db_session.add(project)
+    storage = purge_service.blob_service.storage
+    deleted = await storage.save(project.id, UploadFile(filename="scan.png", file=io.BytesIO(b"old")))
+    document = DocumentORM(
+        file_name=deleted.file_name,
+        project_id=project.id,
+        content_type="image/png",
+        storage_path=deleted.storage_path,
+        storage_backend="local",
+    )
+    db_session.add(document)
+    db_session.flush()
+    SQLAlchemyDocumentRepository(db_session).soft_delete(document_id=document.id)
+    SQLAlchemyPurgeJobRepository(db_session).enqueue(kind="document", target_id=document.id)
+    db_session.commit()
+
+    # the re-upload's file is written, its row is not committed yet when the purge runs
+    reuploaded = await storage.save(project.id, UploadFile(filename="scan.png", file=io.BytesIO(b"new")))
+    await purge_service.run_once()
+
+    assert reuploaded.storage_path != deleted.storage_path
+    assert Path(reuploaded.storage_path).read_bytes() == b"new"
+    assert not Path(deleted.storage_path).exists()
+
+
+@pytest.mark.asyncio
+async def test_failed_purge_is_retried_with_backoff(purge_service, db_session, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "purge_max_attempts", 2)
+    _, project_id, paths = seed_deleted_project(db_session, tmp_path, files=2)
+    storage = purge_service.blob_service.storage
+    remove_many = storage.remove_many
+    storage.remove_many = AsyncMock(side_effect=DocumentFileDeleteError("storage is down"))
+
+    outcome = await purge_service.run_once()
+
+    job = db_session.query(PurgeJobORM).one()
+    assert outcome["retried"] == 1
+    assert job.attempts == 1
+    assert "storage is down" in job.last_error
+    assert job.available_at.replace(tzinfo=UTC) > datetime.now(UTC)
+    # the rows are gone, the files are left for the retry
+    assert db_session.get(ProjectORM, project_id) is None
+    assert sorted(job.storage_paths) == sorted(map(str, paths))
+
+    # ready again, and failing again, it has run out of attempts
+    job.available_at = datetime.now(UTC)
+    db_session.commit()
+    outcome = await purge_service.run_once()
+    db_session.refresh(job)
+    assert outcome["failed"] == 1
+    assert job.available_at is None
+
+    # the retry resumes with the files
+    job.available_at = datetime.now(UTC)
+    db_session.commit()
+    storage.remove_many = remove_many
+
+    @asynccontextmanager
+    async def service_scope():
+        yield purge_service
+
+    worker = PurgeWorker(service_scope)
+    outcome = await worker.run_once()
+    assert outcome["purged"] == 1
+    assert worker.totals["purged"] == 1
+    assert not any(path.exists() for path in paths)
+    assert db_session.query(PurgeJobORM).count() == 0
@@ -0,0 +1,117 @@
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+
+from app.domain.enities.user import User
+from app.domain.enities.user_project_role import RoleEnum
+from app.domain.exceptions.user_project_role_exceptions import ProjectRoleAddNotAuthorizedError
+from app.infrastructure.core.cache import role_cache
+from app.routers.schemas.auth_schemas import UserOut
+from app.services.user_project_role_service import UserProjectRoleService
+
+
+@pytest.mark.asyncio
+async def test_roles_are_fetched_once_and_then_served_from_the_cache():
+    user_id, owned, joined, other = uuid4(), uuid4(), uuid4(), uuid4()
+    mock_repo = AsyncMock()
+    mock_repo.get_user_roles_on_projects.return_value = {owned: RoleEnum.OWNER, joined: RoleEnum.PARTICIPANT}
+    mock_repo.get_live_project_ids.return_value = {owned, joined}
+    service = UserProjectRoleService(mock_repo, user_repo=AsyncMock(), uow=AsyncMock())
+
+    roles = await service.get_roles_on_projects(user_id=user_id, project_ids=[owned, joined, other])
+    assert roles == {owned: RoleEnum.OWNER, joined: RoleEnum.PARTICIPANT}
+    mock_repo.get_user_roles_on_projects.assert_awaited_once_with(user_id=user_id, project_ids=[owned, joined, other])
+
+    # the cached roles take no role query, only a check that their projects are live
+    mock_repo.get_user_roles_on_projects.reset_mock()
+    mock_repo.get_user_roles_on_projects.return_value = {}
+    roles = await service.get_roles_on_projects(user_id=user_id, project_ids=[owned, joined, other])
+    assert roles == {owned: RoleEnum.OWNER, joined: RoleEnum.PARTICIPANT}
+    mock_repo.get_user_roles_on_projects.assert_awaited_once_with(user_id=user_id, project_ids=[other])
+    mock_repo.get_live_project_ids.assert_awaited_once_with(project_ids=[owned, joined])
+
+    assert await service.get_project_access(project_id=owned, user_id=user_id) == (True, RoleEnum.OWNER)
+    mock_repo.get_project_access.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_a_cached_role_on_a_project_deleted_elsewhere_grants_nothing():
+    user_id, project_id = uuid4(), uuid4()
+    mock_repo = AsyncMock()
+    mock_repo.get_project_access.return_value = (True, RoleEnum.OWNER)
+    service = UserProjectRoleService(mock_repo, user_repo=AsyncMock(), uow=AsyncMock())
+    assert await service.get_project_access(project_id=project_id, user_id=user_id) == (True, RoleEnum.OWNER)
+
+    # soft deleted by another worker, this worker's cache still holds the role
+    mock_repo.get_live_project_ids.return_value = set()
+    mock_repo.get_user_roles_on_projects.return_value = {}
+
+    assert await service.get_roles_on_projects(user_id=user_id, project_ids=[project_id]) == {}
+    assert role_cache.get((user_id, project_id)) is None
+    role_cache.set((user_id, project_id), RoleEnum.OWNER)
+    assert await service.get_project_access(project_id=project_id, user_id=user_id) == (False, None)
+    assert role_cache.get((user_id, project_id)) is None
+
+
+@pytest.mark.asyncio
+async def test_project_access_caches_only_participants():
+    user_id, project_id = uuid4(), uuid4()
+    mock_repo = AsyncMock()
+    mock_repo.get_project_access.return_value = (True, None)
+    service = UserProjectRoleService(mock_repo, user_repo=AsyncMock(), uow=AsyncMock())
+
+    assert await service.get_project_access(project_id=project_id, user_id=user_id) == (True, None)
+    assert role_cache.get((user_id, project_id)) is None
+
+    mock_repo.get_project_access.return_value = (True, RoleEnum.PARTICIPANT)
+    assert await service.get_project_access(project_id=project_id, user_id=user_id) == (True, RoleEnum.PARTICIPANT)
+    assert await service.get_project_access(project_id=project_id, user_id=user_id) == (True, RoleEnum.PARTICIPANT)
+    assert mock_repo.get_project_access.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_invite_reports_every_username():
+    project_id, owner_id, invited_id, member_id, raced_id = uuid4(), uuid4(), uuid4(), uuid4(), uuid4()
+    mock_repo = AsyncMock()
+    mock_repo.get_user_roles_on_projects.return_value = {project_id: RoleEnum.OWNER}
+    mock_repo.get_project_roles.return_value = {member_id: RoleEnum.PARTICIPANT}
+    # "raced" was added by a concurrent request, between the role lookup and the insert
+    mock_repo.add_many.return_value = [invited_id]
+    mock_user_repo = AsyncMock()
+    mock_user_repo.get_by_usernames.return_value = [
+        User(id=invited_id, username="invited", email="invited@a.com", password_hash="hash"),
+        User(id=member_id, username="member", email="member@a.com", password_hash="hash"),
+        User(id=raced_id, username="raced", email="raced@a.com", password_hash="hash"),
+    ]
+    mock_uow = AsyncMock()
+    service = UserProjectRoleService(mock_repo, user_repo=mock_user_repo, uow=mock_uow)
+    current_user = UserOut(id=owner_id, username="owner", email="owner@a.com")
+
+    results = await service.add_participants_by_usernames(
+        project_id=project_id, usernames=["invited", "member", "nobody", "raced", "invited"], current_user=current_user
+    )
+
+    assert results == [
+        {"username": "invited", "status": "invited"},
+        {"username": "member", "status": "already_participant"},
+        {"username": "nobody", "status": "not_found"},
+        {"username": "raced", "status": "already_participant"},
+    ]
+    mock_user_repo.get_by_usernames.assert_awaited_once_with(usernames=["invited", "member", "nobody", "raced"])
+    mock_repo.add_many.assert_awaited_once_with(
+        project_id=project_id, user_ids=[invited_id, raced_id], role=RoleEnum.PARTICIPANT
+    )
+    mock_uow.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_bulk_invite_requires_the_owner():
+    mock_repo = AsyncMock()
+    mock_repo.get_user_roles_on_projects.return_value = {}
+    service = UserProjectRoleService(mock_repo, user_repo=AsyncMock(), uow=AsyncMock())
+    current_user = UserOut(id=uuid4(), username="outsider", email="outsider@a.com")
+
+    with pytest.raises(ProjectRoleAddNotAuthorizedError):
+        await service.add_participants_by_usernames(project_id=uuid4(), usernames=["a"], current_user=current_user)
+    mock_repo.add_many.assert_not_awaited()
@@ -1,11 +1,38 @@
+from uuid import uuid4
+
+import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.routers.dependencies import get_current_user
+from app.routers.schemas.auth_schemas import UserOut
 
 client = TestClient(app)
 
 
+@pytest.fixture
+def signed_in():
+    user = UserOut(id=uuid4(), email="ops@example.com", username="ops")
+    providers = dict(app.dependency_overrides)
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield user
+    app.dependency_overrides = providers
+
+
 def test_server_is_up():
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"status": "healthy", "message": "server is up"}
+
+
+def test_cache_metrics(signed_in):
+    response = client.get("/metrics/cache")
+    assert response.status_code == 200
+    assert set(response.json()) == {"users", "roles", "presigned_urls"}
+    assert set(response.json()["users"]) == {"hits", "misses", "size"}
+
+
+@pytest.mark.parametrize("path", ["/metrics/cache", "/metrics/purge"])
+def test_metrics_need_a_signed_in_user(path):
+    response = client.get(path)
+    assert response.status_code == 401